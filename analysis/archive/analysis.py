@@ -1,4 +1,5 @@
 import os
+import sys
 from pathlib import Path
 import pandas as pd
 import matplotlib
@@ -6,6 +7,9 @@ matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 import numpy as np
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from harness.catalog import latest_run_dir
+
 # Defaults for result directories
 MCP_DIR = Path(os.getenv("MCP_RESULTS_DIR", "/home/exouser/client/mcp/benchmark_results"))
 REST_DIR = Path(os.getenv("REST_RESULTS_DIR", "/home/exouser/client/rest/benchmark_results"))
@@ -14,14 +18,6 @@ DB_DIR = Path(os.getenv("DB_RESULTS_DIR", "/home/exouser/client/db/benchmark_res
 OUTPUT_DIR = Path(os.getenv("ANALYSIS_OUTPUT_DIR", "/home/exouser/client/analysis/outputs"))
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
-def latest_run_dir(root: Path) -> Path:
-    if not root.exists():
-        raise FileNotFoundError(f"Directory does not exist: {root}")
-    run_dirs = [p for p in root.iterdir() if p.is_dir() and p.name.startswith("run_")]
-    if not run_dirs:
-        return root
-    return sorted(run_dirs)[-1]
-
 def read_durations(run_dir: Path, filename: str) -> pd.Series | None:
     """Return durations (seconds) from a CSV that is either [start,end] or [duration]."""
     path = run_dir / filename
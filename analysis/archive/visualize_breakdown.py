@@ -1,4 +1,5 @@
 import os
+import sys
 from pathlib import Path
 import pandas as pd
 import matplotlib
@@ -6,6 +7,9 @@ matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 import numpy as np
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from harness.catalog import latest_run_dir
+
 # Configure matplotlib for publication-quality figures
 plt.rcParams.update({
     # Font settings - professional serif fonts
@@ -79,15 +83,6 @@ COLORS = {
     'white': '#ffffff',      # Background
 }
 
-def latest_run_dir(root: Path) -> Path:
-    """Find the most recent run directory."""
-    if not root.exists():
-        raise FileNotFoundError(f"Directory does not exist: {root}")
-    run_dirs = [p for p in root.iterdir() if p.is_dir() and p.name.startswith("run_")]
-    if not run_dirs:
-        return root
-    return sorted(run_dirs)[-1]
-
 def read_latency_breakdown(csv_path: Path) -> pd.DataFrame:
     """Read the detailed latency breakdown CSV."""
     if not csv_path.exists():
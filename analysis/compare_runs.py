@@ -0,0 +1,43 @@
+import sys
+import pandas as pd
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from harness.catalog import CATALOG_NAME, RunCatalog
+
+# Results directory holding the catalog.sqlite the clients write
+RESULTS_DIR = Path('/home/exouser/client/interleave/benchmark_results')
+SUMMARY_COLUMNS = ['run_id', 'started_at', 'host', 'client', 'protocol', 'operation', 'requests', 'mean_ms',
+                   'p50_ms', 'p90_ms', 'p99_ms', 'max_ms']
+
+def load_catalog_results(results_dir: Path, **filters) -> pd.DataFrame:
+    """Summary stats of every indexed results file matching column=value filters, newest run first."""
+    catalog = RunCatalog(results_dir)
+    rows = catalog.results(**filters)
+    catalog.close()
+    return pd.DataFrame(rows, columns=SUMMARY_COLUMNS + ['results_file', 'columnar_file', 'metadata'])
+
+def compare_runs(results: pd.DataFrame, statistic: str = 'p99_ms') -> pd.DataFrame:
+    """One row per run, one column per (protocol, operation), holding `statistic`.
+
+    Runs with several files per pair (connection modes, transports) show the first.
+    """
+    return results.pivot_table(index=['started_at', 'run_id'], columns=['protocol', 'operation'],
+                               values=statistic, aggfunc='first').sort_index(ascending=False)
+
+def main():
+    results_dir = Path(sys.argv[1]) if len(sys.argv) > 1 else RESULTS_DIR
+    statistic = sys.argv[2] if len(sys.argv) > 2 else 'p99_ms'
+    if not (results_dir / CATALOG_NAME).exists():
+        print(f"No catalog in {results_dir}; runs are indexed by the clients as they finish")
+        return
+    results = load_catalog_results(results_dir)
+    if results.empty:
+        print(f"No runs indexed in {results_dir}")
+        return
+    print(f"{results['run_id'].nunique()} runs, {len(results)} results files indexed in {results_dir}")
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print(compare_runs(results, statistic).round(2))
+
+if __name__ == '__main__':
+    main()
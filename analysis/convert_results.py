@@ -0,0 +1,58 @@
+import csv
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from harness.schema import convert_csv
+
+# Results written before the unified schema, converted in place
+RESULTS_DIRS = [Path(__file__).resolve().parent.parent / 'rest' / 'benchmark_results',
+                Path(__file__).resolve().parent.parent / 'mcp' / 'benchmark_results']
+
+def legacy_headers(csv_path: Path):
+    """["total_time"] for the headerless layered MCP timing files, whose first row is
+    already a value; None for files that name their columns."""
+    with open(csv_path, newline='') as f:
+        first_row = next(csv.reader(f), [])
+    if len(first_row) != 1:
+        return None
+    try:
+        float(first_row[0])
+    except ValueError:
+        return None
+    return ['total_time']
+
+def legacy_units(csv_path: Path, headerless: bool = False) -> dict:
+    """Units of the unitless legacy columns: database/*.csv hold milliseconds, the
+    phase and MCP timing files in run_*/ and the headerless layered MCP files
+    (database/ included) seconds."""
+    unit = 'ms' if 'database' in csv_path.parts and not headerless else 's'
+    return {'total_time': unit, 'timestamp': 's', 'dns_lookup': unit, 'socket_creation': unit,
+            'tcp_connect': unit, 'ssl_context_creation': unit, 'ssl_handshake': unit, 'request_send': unit,
+            'time_to_first_byte': unit, 'response_read': unit, 'socket_close': unit, 'server_processing': unit}
+
+def convert_legacy(csv_path: Path, npy_path: Path = None) -> Path:
+    """Write the .npy and schema for a legacy results CSV (next to it unless `npy_path` is given)."""
+    headers = legacy_headers(csv_path)
+    return convert_csv(csv_path, units=legacy_units(csv_path, headers is not None), headers=headers,
+                       metadata={'converted': True}, npy_path=npy_path)
+
+def convert_dir(results_dir: Path) -> None:
+    """Write the .npy and schema for every results CSV under `results_dir` that lacks one."""
+    for csv_path in sorted(results_dir.rglob('*.csv')):
+        if csv_path.with_suffix('.npy').exists():
+            continue
+        try:
+            npy_path = convert_legacy(csv_path)
+        except ValueError as e:
+            # Summaries and other per-run tables are not per-request results
+            print(f"Skipping {csv_path}: {e}")
+            continue
+        print(f"Converted {csv_path} -> {npy_path.name}")
+
+def main():
+    for results_dir in [Path(arg) for arg in sys.argv[1:]] or RESULTS_DIRS:
+        convert_dir(results_dir)
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,30 @@
+import sys
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 from pathlib import Path
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from harness.hdr import HdrHistogram
+
 def read_latency_data(file_path: Path) -> pd.DataFrame:
+    """Load a results file, from its columnar .npy copy when the client wrote one."""
+    npy_path = file_path.with_suffix('.npy')
+    if npy_path.exists():
+        return pd.DataFrame(np.load(npy_path))
     return pd.read_csv(file_path)
 
+def print_latency_percentiles(label: str, csv_path: Path) -> None:
+    """Print tail latencies from the HDR histogram the clients save next to each CSV."""
+    hdr_path = csv_path.with_suffix('.hdr')
+    if not hdr_path.exists():
+        print(f"{label}: no histogram at {hdr_path}")
+        return
+    summary = HdrHistogram.load(hdr_path).summary_ms()
+    print(f"{label}: n={summary['count']}, mean={summary['mean_ms']:.2f}ms, p50={summary['p50_ms']:.2f}ms, "
+          f"p90={summary['p90_ms']:.2f}ms, p99={summary['p99_ms']:.2f}ms, p99.9={summary['p99.9_ms']:.2f}ms")
+
 def plot_latency_comparison(rest_data: pd.DataFrame, mcp_data: pd.DataFrame, layered_mcp_data: pd.DataFrame) -> None:
     plt.figure(figsize=(5, 4))
     
@@ -29,10 +47,17 @@ def plot_latency_comparison(rest_data: pd.DataFrame, mcp_data: pd.DataFrame, lay
     plt.savefig('rtt_comparison.png')
 
 def main():
-    rest_data = read_latency_data(Path('/home/exouser/client/rest/benchmark_results/run_2025_10_24/get_modelcard.csv'))
-    mcp_data = read_latency_data(Path('/home/exouser/client/mcp/benchmark_results/run_2025_10_24/native/get_modelcard.csv'))
-    layered_mcp_data = read_latency_data(Path('/home/exouser/client/mcp/benchmark_results/run_2025_10_24/layered/get_modelcard.csv'))
+    rest_path = Path('/home/exouser/client/rest/benchmark_results/run_2025_10_24/get_modelcard.csv')
+    mcp_path = Path('/home/exouser/client/mcp/benchmark_results/run_2025_10_24/native/get_modelcard.csv')
+    layered_mcp_path = Path('/home/exouser/client/mcp/benchmark_results/run_2025_10_24/layered/get_modelcard.csv')
+    rest_data = read_latency_data(rest_path)
+    mcp_data = read_latency_data(mcp_path)
+    layered_mcp_data = read_latency_data(layered_mcp_path)
     plot_latency_comparison(rest_data, mcp_data, layered_mcp_data)
 
+    print_latency_percentiles('REST', rest_path)
+    print_latency_percentiles('MCP Native', mcp_path)
+    print_latency_percentiles('MCP Layered', layered_mcp_path)
+
 if __name__ == '__main__':
     main()
\ No newline at end of file
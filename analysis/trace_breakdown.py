@@ -0,0 +1,68 @@
+import json
+import sys
+import pandas as pd
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from harness.schema import schema_path
+from harness.tracing import BREAKDOWN_HEADERS, HOPS, join_spans, load_spans
+
+# Run made with TRACE_CONTEXT=1 (interleave, rest or mcp client), and the span logs its servers wrote
+RUN_DIR = Path('/home/exouser/client/interleave/benchmark_results/run_2025_10_24')
+SPAN_LOG_DIR = Path('/home/exouser/client/traces')
+
+def traced_results(run_dir: Path) -> dict:
+    """{(protocol, operation): (results CSV, trace id prefix)} for the traced results under `run_dir`.
+
+    The prefix is read from each results file's schema metadata; interleaved
+    runs written before it was stored there fall back to interleaved_summary.csv.
+    """
+    traced = {}
+    for csv_path in sorted(run_dir.rglob('*.csv')):
+        sidecar = schema_path(csv_path.with_suffix('.npy'))
+        if not sidecar.exists():
+            continue
+        metadata = json.loads(sidecar.read_text())['metadata']
+        if metadata.get('trace_prefix'):
+            # Connection modes and transports of one run share a prefix; keep the first file
+            traced.setdefault((metadata['protocol'], metadata['operation']), (csv_path, metadata['trace_prefix']))
+    summary_file = run_dir / 'interleaved_summary.csv'
+    if summary_file.exists():
+        summary = pd.read_csv(summary_file, dtype={'trace_prefix': str})
+        for row in summary.dropna(subset=['trace_prefix']).itertuples():
+            traced.setdefault((row.protocol, row.operation),
+                              (run_dir / f"{row.protocol}_{row.operation}.csv", row.trace_prefix))
+    return traced
+
+def load_trace_breakdowns(run_dir: Path, span_log_dir: Path) -> dict:
+    """Join each traced (protocol, operation) results CSV with the span logs by trace id.
+
+    Returns {(protocol, operation): DataFrame of BREAKDOWN_HEADERS rows}.
+    """
+    traced = traced_results(run_dir)
+    if not traced:
+        return {}
+    spans = load_spans(sorted(span_log_dir.glob('*.jsonl')))
+    return {key: pd.DataFrame(join_spans(csv_path, prefix, spans), columns=BREAKDOWN_HEADERS)
+            for key, (csv_path, prefix) in traced.items()}
+
+def print_breakdown(protocol: str, operation: str, breakdown: pd.DataFrame) -> None:
+    """Print the mean and p99 time per hop over the joined requests."""
+    print(f"{protocol} {operation}: {len(breakdown)} requests joined, total mean={breakdown['total_ms'].mean():.2f}ms")
+    for column in ['network_ms'] + [f"{hop}_ms" for hop in HOPS]:
+        values = breakdown[column].dropna()
+        if not values.empty:
+            print(f"  {column[:-3]}: mean={values.mean():.2f}ms, p99={values.quantile(0.99):.2f}ms")
+
+def main():
+    run_dir = Path(sys.argv[1]) if len(sys.argv) > 1 else RUN_DIR
+    span_log_dir = Path(sys.argv[2]) if len(sys.argv) > 2 else SPAN_LOG_DIR
+    breakdowns = load_trace_breakdowns(run_dir, span_log_dir)
+    if not breakdowns:
+        print(f"No traced results in {run_dir}; run a client with TRACE_CONTEXT=1")
+    for (protocol, operation), breakdown in breakdowns.items():
+        breakdown.to_csv(run_dir / f"{protocol}_{operation}_trace_breakdown.csv", index=False)
+        print_breakdown(protocol, operation, breakdown)
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,18 @@
+import hashlib
+import sys
+import tempfile
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from harness.catalog import latest_run_dir
+from harness.hdr import HdrHistogram
+from harness.schema import column_unit, load_columns
+from convert_results import convert_legacy
+from trace_breakdown import load_trace_breakdowns
+
 # =============================================================================
 # CONFIGURATION
 # =============================================================================
@@ -92,65 +102,100 @@ PLOT_CONFIG = {
     }
 }
 
+# Benchmark result directories
+REST_DIR = Path("/home/exouser/client/rest/benchmark_results")
+MCP_DIR = Path("/home/exouser/client/mcp/benchmark_results")
+LAYERED_MCP_DIR = Path("/home/exouser/client/layered_mcp/benchmark_results")
+# Runs of database/client.py; they stand in for a server's database timings
+# when the server did not record its own
+DATABASE_DIR = Path("/home/exouser/client/database/benchmark_results/database")
+# Legacy CSVs without a .npy are converted into this cache, not next to the
+# committed results
+CONVERTED_DIR = Path(tempfile.gettempdir()) / "patra_converted_results"
+# Traced runs (interleave, or rest/mcp with TRACE_CONTEXT=1) and server span
+# logs; when present, the breakdown is joined per request instead of
+# subtracting mean times
+TRACE_RUN_DIR = Path("/home/exouser/client/interleave/benchmark_results")
+TRACE_LOG_DIR = Path("/home/exouser/client/traces")
+TRACED_SYSTEMS = {'rest': 'rest', 'native': 'native_mcp', 'layered': 'layered_mcp'}
+
 # =============================================================================
 # UTILITY FUNCTIONS
 # =============================================================================
 
-def latest_run_dir(root: Path) -> Path:
-    """Find the most recent benchmark run directory."""
-    if not root.exists():
-        raise FileNotFoundError(f"Directory does not exist: {root}")
-    run_dirs = [p for p in root.iterdir() if p.is_dir() and p.name.startswith("run_")]
-    if not run_dirs:
-        return root
-    return sorted(run_dirs)[-1]
+def database_dir(server_dir):
+    """The server's own database timings, or the database client's if it has none."""
+    own = server_dir / "database"
+    return own if own.exists() else DATABASE_DIR
+
+def load_latencies(csv_path):
+    """Per-request latencies of a results file as a total_time column in milliseconds.
+
+    Read from the file's .npy through its schema, so the unit comes from the
+    column name; legacy CSVs without one are converted into CONVERTED_DIR
+    first, keyed by path and modification so an edited CSV is converted again.
+    """
+    npy_path = csv_path.with_suffix(".npy")
+    if not npy_path.exists():
+        stat = csv_path.stat()
+        key = hashlib.sha1(f"{csv_path.resolve()}:{stat.st_mtime_ns}:{stat.st_size}".encode()).hexdigest()[:16]
+        npy_path = CONVERTED_DIR / f"{csv_path.stem}_{key}.npy"
+        if not npy_path.exists():
+            CONVERTED_DIR.mkdir(parents=True, exist_ok=True)
+            convert_legacy(csv_path, npy_path)
+    columns = load_columns(npy_path)
+    names = [name for name in columns if name == "response_time_ms" or name.startswith("total_time_")]
+    if not names:
+        raise ValueError(f"No latency column in {npy_path}: {', '.join(columns)}")
+    to_ms = {'s': 1000.0, 'ms': 1.0, 'us': 0.001}[column_unit(names[0])]
+    return pd.DataFrame({'total_time': np.asarray(columns[names[0]]) * to_ms})
 
 def load_benchmark_data():
-    """Load all benchmark data from CSV files."""
+    """Load all benchmark data, in milliseconds."""
     # Define directory paths
-    REST_DIR = Path("/home/exouser/client/rest/benchmark_results")
-    REST_DB_DIR = REST_DIR / "database"
-
-    MCP_DIR = Path("/home/exouser/client/mcp/benchmark_results")
-    MCP_DB_DIR = MCP_DIR / "database"
-    
-    LAYERED_MCP_DIR = Path("/home/exouser/client/layered_mcp/benchmark_results")
+    REST_DB_DIR = database_dir(REST_DIR)
+    MCP_DB_DIR = database_dir(MCP_DIR)
     LAYERED_MCP_DB_DIR = LAYERED_MCP_DIR / "database"
     LAYERED_MCP_REST_DIR = LAYERED_MCP_DIR / "rest"
     
     # Load get_modelcard data
     get_modelcard_data = {
-        'rest_db': pd.read_csv(latest_run_dir(REST_DB_DIR) / "get_modelcard.csv"),
-        'rest_total': pd.read_csv(latest_run_dir(REST_DIR) / "get_modelcard.csv"),
-        'mcp_db': pd.read_csv(latest_run_dir(MCP_DB_DIR) / "get_modelcard.csv"),
-        'mcp_total': pd.read_csv(latest_run_dir(MCP_DIR) / "get_modelcard.csv"),
-        'layered_mcp_db': pd.read_csv(latest_run_dir(LAYERED_MCP_DB_DIR) / "get_modelcard.csv", 
-                                   header=None, names=['total_time']),
-        'layered_mcp_rest': pd.read_csv(latest_run_dir(LAYERED_MCP_REST_DIR) / "get_modelcard.csv", 
-                                    header=None, names=['total_time']),
-        'layered_mcp_total': pd.read_csv(latest_run_dir(LAYERED_MCP_DIR) / "get_modelcard.csv")
+        'rest_db': load_latencies(latest_run_dir(REST_DB_DIR) / "get_modelcard.csv"),
+        'rest_total': load_latencies(latest_run_dir(REST_DIR) / "get_modelcard.csv"),
+        'mcp_db': load_latencies(latest_run_dir(MCP_DB_DIR) / "get_modelcard.csv"),
+        'mcp_total': load_latencies(latest_run_dir(MCP_DIR) / "get_modelcard.csv"),
+        'layered_mcp_db': load_latencies(latest_run_dir(LAYERED_MCP_DB_DIR) / "get_modelcard.csv"),
+        'layered_mcp_rest': load_latencies(latest_run_dir(LAYERED_MCP_REST_DIR) / "get_modelcard.csv"),
+        'layered_mcp_total': load_latencies(latest_run_dir(LAYERED_MCP_DIR) / "get_modelcard.csv")
     }
     
     # Load search_modelcards data
     search_modelcards_data = {
-        'rest_db': pd.read_csv(latest_run_dir(REST_DB_DIR) / "search_modelcard.csv"),
-        'rest_total': pd.read_csv(latest_run_dir(REST_DIR) / "search_modelcards.csv"),
-        'mcp_db': pd.read_csv(latest_run_dir(MCP_DB_DIR) / "search_modelcard.csv"),
-        'mcp_total': pd.read_csv(latest_run_dir(MCP_DIR) / "search_modelcards.csv"),
-        'layered_mcp_db': pd.read_csv(latest_run_dir(LAYERED_MCP_DB_DIR) / "search_modelcard.csv", 
-                                  header=None, names=['total_time']),
-        'layered_mcp_rest': pd.read_csv(latest_run_dir(LAYERED_MCP_REST_DIR) / "search_modelcard.csv", 
-                                    header=None, names=['total_time']),
-        'layered_mcp_total': pd.read_csv(latest_run_dir(LAYERED_MCP_DIR) / "search_modelcards.csv")
+        'rest_db': load_latencies(latest_run_dir(REST_DB_DIR) / "search_modelcard.csv"),
+        'rest_total': load_latencies(latest_run_dir(REST_DIR) / "search_modelcards.csv"),
+        'mcp_db': load_latencies(latest_run_dir(MCP_DB_DIR) / "search_modelcard.csv"),
+        'mcp_total': load_latencies(latest_run_dir(MCP_DIR) / "search_modelcards.csv"),
+        'layered_mcp_db': load_latencies(latest_run_dir(LAYERED_MCP_DB_DIR) / "search_modelcard.csv"),
+        'layered_mcp_rest': load_latencies(latest_run_dir(LAYERED_MCP_REST_DIR) / "search_modelcard.csv"),
+        'layered_mcp_total': load_latencies(latest_run_dir(LAYERED_MCP_DIR) / "search_modelcards.csv")
     }
     
     return get_modelcard_data, search_modelcards_data
 
-def convert_to_milliseconds(data_dict):
-    """Convert all total_time columns from seconds to milliseconds."""
-    for key, df in data_dict.items():
-        if 'total' in key and 'db' not in key:
-            df["total_time"] = df["total_time"] * 1000.0
+def load_latency_histograms(operation):
+    """Load the HDR histograms saved next to each end-to-end results CSV.
+
+    The MCP client writes both servers into one run, under native/ and
+    layered/. Systems whose latest run has no histogram (older CSV-only runs)
+    are skipped.
+    """
+    mcp_run = latest_run_dir(MCP_DIR)
+    hdr_paths = {
+        'rest': latest_run_dir(REST_DIR) / f"{operation}.hdr",
+        'native_mcp': mcp_run / "native" / f"{operation}.hdr",
+        'layered_mcp': mcp_run / "layered" / f"{operation}.hdr",
+    }
+    return {system: HdrHistogram.load(path) for system, path in hdr_paths.items() if path.exists()}
 
 def calculate_metrics(data_dict):
     """Calculate performance metrics from benchmark data."""
@@ -166,8 +211,8 @@ def calculate_metrics(data_dict):
     
     # Layered MCP metrics
     layered_mcp_total = data_dict['layered_mcp_total']["total_time"].mean()
-    layered_mcp_db = data_dict['layered_mcp_db']["total_time"].mean() * 1000.0
-    layered_mcp_rest = data_dict['layered_mcp_rest']["total_time"].mean() * 1000.0
+    layered_mcp_db = data_dict['layered_mcp_db']["total_time"].mean()
+    layered_mcp_rest = data_dict['layered_mcp_rest']["total_time"].mean()
     layered_mcp_net = layered_mcp_total - layered_mcp_rest
     
     return {
@@ -199,6 +244,42 @@ def calculate_standard_deviations(data_dict):
         'layered_mcp': {'db_std': layered_mcp_db_std, 'rest_std': layered_mcp_rest_std, 'net_std': layered_mcp_net_std}
     }
 
+def load_traced_breakdowns():
+    """Per-request hop breakdowns of the latest traced runs, or {} if there are none.
+
+    An interleaved run takes precedence over separate rest and mcp runs for
+    the (protocol, operation) pairs it covers.
+    """
+    if not TRACE_LOG_DIR.exists():
+        return {}
+    breakdowns = {}
+    for results_dir in (REST_DIR, MCP_DIR, TRACE_RUN_DIR):
+        if results_dir.exists():
+            breakdowns.update(load_trace_breakdowns(latest_run_dir(results_dir), TRACE_LOG_DIR))
+    return breakdowns
+
+def calculate_traced_metrics(breakdowns, operation):
+    """Metrics and standard deviations from requests joined by trace id.
+
+    Returns None unless every system has traced requests for `operation`.
+    """
+    frames = {system: breakdowns.get((protocol, operation)) for protocol, system in TRACED_SYSTEMS.items()}
+    if any(frame is None or frame.empty for frame in frames.values()):
+        return None
+    metrics, std_devs = {}, {}
+    for system, frame in frames.items():
+        total = frame['total_ms']
+        db = frame['db_ms'].fillna(0.0)
+        # Everything above the database for REST and native MCP; above REST for layered MCP
+        rest = frame['rest_ms'].fillna(0.0) if system == 'layered_mcp' else None
+        net = total - db - (rest if rest is not None else 0.0)
+        metrics[system] = {'total': total.mean(), 'db': db.mean(), 'net': net.mean()}
+        std_devs[system] = {'db_std': db.std(), 'net_std': net.std()}
+        if rest is not None:
+            metrics[system]['rest'] = rest.mean()
+            std_devs[system]['rest_std'] = rest.std()
+    return metrics, std_devs
+
 # =============================================================================
 # PLOTTING FUNCTIONS
 # =============================================================================
@@ -268,6 +349,16 @@ def print_performance_summary(metrics, endpoint_name):
     print(f"Layered MCP: total={layered_mcp['total']:.2f}ms, db={layered_mcp['db']:.2f}ms, "
           f"rest={layered_mcp['rest']:.2f}ms, mcp={layered_mcp['net']:.2f}ms")
 
+def print_tail_latencies(histograms, endpoint_name):
+    """Print percentiles computed directly from the HDR histograms."""
+    if not histograms:
+        return
+    print(f"\n{endpoint_name.upper()} tail latency:")
+    for system, histogram in histograms.items():
+        summary = histogram.summary_ms()
+        print(f"{system}: n={summary['count']}, p50={summary['p50_ms']:.2f}ms, p90={summary['p90_ms']:.2f}ms, "
+              f"p99={summary['p99_ms']:.2f}ms, p99.9={summary['p99.9_ms']:.2f}ms")
+
 # =============================================================================
 # MAIN EXECUTION
 # =============================================================================
@@ -277,13 +368,16 @@ def main():
     # Load benchmark data
     get_modelcard_data, search_modelcards_data = load_benchmark_data()
     
-    # Convert to milliseconds
-    convert_to_milliseconds(get_modelcard_data)
-    convert_to_milliseconds(search_modelcards_data)
-    
+    # Exact per-request breakdowns when a traced run exists, mean subtraction otherwise
+    traced_breakdowns = load_traced_breakdowns()
+
     # Calculate metrics for get_modelcard
-    get_modelcard_metrics = calculate_metrics(get_modelcard_data)
-    get_modelcard_std = calculate_standard_deviations(get_modelcard_data)
+    traced = calculate_traced_metrics(traced_breakdowns, "get_modelcard")
+    if traced is not None:
+        get_modelcard_metrics, get_modelcard_std = traced
+    else:
+        get_modelcard_metrics = calculate_metrics(get_modelcard_data)
+        get_modelcard_std = calculate_standard_deviations(get_modelcard_data)
     
     # Create get_modelcard plot
     create_stacked_bar_plot(
@@ -295,10 +389,15 @@ def main():
     
     # Print get_modelcard summary
     print_performance_summary(get_modelcard_metrics, "GET_MODELCARD")
+    print_tail_latencies(load_latency_histograms("get_modelcard"), "GET_MODELCARD")
     
     # Calculate metrics for search_modelcards
-    search_modelcards_metrics = calculate_metrics(search_modelcards_data)
-    search_modelcards_std = calculate_standard_deviations(search_modelcards_data)
+    traced = calculate_traced_metrics(traced_breakdowns, "search_modelcards")
+    if traced is not None:
+        search_modelcards_metrics, search_modelcards_std = traced
+    else:
+        search_modelcards_metrics = calculate_metrics(search_modelcards_data)
+        search_modelcards_std = calculate_standard_deviations(search_modelcards_data)
     
     # Create search_modelcards plot
     create_stacked_bar_plot(
@@ -310,6 +409,7 @@ def main():
     
     # Print search_modelcards summary
     print_performance_summary(search_modelcards_metrics, "SEARCH_MODELCARDS")
+    print_tail_latencies(load_latency_histograms("search_modelcards"), "SEARCH_MODELCARDS")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,132 @@
+import asyncio
+import os
+import sys
+import csv
+import time
+from contextlib import AsyncExitStack
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from harness.arrivals import run_open_loop
+from harness.capacity import search_capacity
+from harness.catalog import new_run_dir, record_run, settings
+from harness.hdr import HdrHistogram
+from harness.targets import PROTOCOLS, open_targets
+
+REST_SERVER_URL = os.getenv("REST_SERVER_URL", "http://149.165.175.102:5002")
+GET_MODELCARD_PATH = os.getenv("GET_MODELCARD_PATH", "/modelcard/{mc_id}")
+SEARCH_MODELCARDS_PATH = os.getenv("SEARCH_MODELCARDS_PATH", "/modelcards/search")
+SEARCH_PARAM = os.getenv("SEARCH_PARAM", "q")
+NATIVE_MCP_URL = os.getenv("NATIVE_MCP_URL", "http://149.165.175.102:8050/sse")
+LAYERED_MCP_URL = os.getenv("LAYERED_MCP_URL", "http://149.165.175.102:8051/sse")
+BENCHMARK_RESULTS_DIR = os.getenv("BENCHMARK_RESULTS_DIR", "/app/benchmark_results")
+# Protocols to search, in order; any of rest, native, layered
+SEARCH_PROTOCOLS = os.getenv("PROTOCOLS", ",".join(PROTOCOLS)).split(",")
+CAPACITY_OPERATION = os.getenv("CAPACITY_OPERATION", "get_modelcard")
+MODELCARD_ID = os.getenv("MODELCARD_ID", "megadetector-mc")
+SEARCH_QUERY = os.getenv("SEARCH_QUERY", "megadetector")
+# Offered load starts at START_RATE req/s and is multiplied by STEP_FACTOR while
+# the SLO holds, then bisected until within SEARCH_PRECISION of the knee
+START_RATE = float(os.getenv("START_RATE", "5"))
+MAX_RATE = float(os.getenv("MAX_RATE", "2000"))
+STEP_FACTOR = float(os.getenv("STEP_FACTOR", "2.0"))
+SEARCH_PRECISION = float(os.getenv("SEARCH_PRECISION", "0.05"))
+STEP_DURATION_S = float(os.getenv("STEP_DURATION_S", "10"))
+ARRIVAL_DISTRIBUTION = os.getenv("ARRIVAL_DISTRIBUTION", "poisson")
+# A step passes while p99 latency and the error rate stay within these limits
+SLO_P99_MS = float(os.getenv("SLO_P99_MS", "500"))
+MAX_ERROR_RATE = float(os.getenv("MAX_ERROR_RATE", "0.01"))
+# Connections per protocol: the REST connection pool limit and the number of
+# MCP sessions, so every protocol is searched with the same concurrency
+CONNECTIONS = int(os.getenv("CONNECTIONS", "10"))
+
+STEP_HEADERS = ['protocol', 'offered_rps', 'achieved_rps', 'requests', 'errors', 'error_rate',
+                'p50_ms', 'p99_ms', 'max_ms', 'passed']
+SUMMARY_HEADERS = ['protocol', 'operation', 'connections', 'slo_p99_ms', 'max_error_rate', 'max_sustainable_rps',
+                   'p99_at_max_ms']
+
+async def measure_step(call, argument, rate):
+    """Offer `rate` req/s open-loop for STEP_DURATION_S and check the result against the SLO"""
+    histogram = HdrHistogram()
+    errors = 0
+
+    async def request():
+        try:
+            return await call(CAPACITY_OPERATION, argument)
+        except Exception:
+            return None
+
+    def on_complete(latency_ms, service_ms, size_kb):
+        nonlocal errors
+        if size_kb is None:
+            errors += 1
+        else:
+            histogram.record_ms(latency_ms)
+
+    count = max(1, round(rate * STEP_DURATION_S))
+    start_time = time.perf_counter()
+    await run_open_loop(request, count, rate, on_complete, ARRIVAL_DISTRIBUTION)
+    duration_s = time.perf_counter() - start_time
+
+    summary = histogram.summary_ms(percentiles=(50, 99))
+    error_rate = errors / count
+    passed = histogram.total_count > 0 and summary['p99_ms'] <= SLO_P99_MS and error_rate <= MAX_ERROR_RATE
+    print(f"  {rate:.1f} req/s offered: p99={summary['p99_ms']:.2f}ms, "
+          f"errors={error_rate:.2%} -> {'pass' if passed else 'FAIL'}")
+    return {
+        'achieved_rps': histogram.total_count / duration_s if duration_s > 0 else 0.0,
+        'requests': count,
+        'errors': errors,
+        'error_rate': error_rate,
+        'p50_ms': summary['p50_ms'],
+        'p99_ms': summary['p99_ms'],
+        'max_ms': summary['max_ms'],
+        'passed': passed,
+    }
+
+async def find_capacity(run_dir):
+    """Search each protocol's maximum sustainable throughput and write the step and summary CSVs"""
+    argument = SEARCH_QUERY if CAPACITY_OPERATION == "search_modelcards" else MODELCARD_ID
+    urls = {"rest": REST_SERVER_URL, "native": NATIVE_MCP_URL, "layered": LAYERED_MCP_URL}
+    steps_file = run_dir / f"{CAPACITY_OPERATION}_capacity_steps.csv"
+    summary_file = run_dir / f"{CAPACITY_OPERATION}_capacity_summary.csv"
+
+    with open(steps_file, "w", newline="") as steps_f, open(summary_file, "w", newline="") as summary_f:
+        steps_writer = csv.writer(steps_f)
+        steps_writer.writerow(STEP_HEADERS)
+        summary_writer = csv.writer(summary_f)
+        summary_writer.writerow(SUMMARY_HEADERS)
+
+        for protocol in SEARCH_PROTOCOLS:
+            print(f"\n=== Capacity search: {protocol} {CAPACITY_OPERATION} over {CONNECTIONS} connections ===")
+            async with AsyncExitStack() as stack:
+                # Only this protocol's endpoint is opened, so one protocol's
+                # connections do not compete with the one being searched
+                targets = await open_targets(stack, *(urls[p] if p == protocol else None for p in PROTOCOLS),
+                                             connections=CONNECTIONS, get_path=GET_MODELCARD_PATH,
+                                             search_path=SEARCH_MODELCARDS_PATH, search_param=SEARCH_PARAM)
+                call = targets[protocol]
+                # Warm-up call keeps connection setup out of the first step
+                await call(CAPACITY_OPERATION, argument)
+                max_rps, steps = await search_capacity(lambda rate: measure_step(call, argument, rate),
+                                                       START_RATE, MAX_RATE, STEP_FACTOR, SEARCH_PRECISION)
+
+            for step in steps:
+                steps_writer.writerow([protocol] + [step[header] for header in STEP_HEADERS[1:]])
+            p99_at_max = next((step['p99_ms'] for step in steps if step['offered_rps'] == max_rps), None)
+            summary_writer.writerow([protocol, CAPACITY_OPERATION, CONNECTIONS, SLO_P99_MS, MAX_ERROR_RATE,
+                                     max_rps if max_rps is not None else "", p99_at_max if p99_at_max is not None else ""])
+            if max_rps is None:
+                print(f"{protocol}: SLO breached at the starting rate of {START_RATE} req/s")
+            elif max_rps >= MAX_RATE:
+                print(f"{protocol}: SLO held up to MAX_RATE ({MAX_RATE} req/s)")
+            else:
+                print(f"{protocol}: max sustainable throughput {max_rps:.1f} req/s (p99={p99_at_max:.2f}ms)")
+
+def main():
+    run_dir = new_run_dir(BENCHMARK_RESULTS_DIR)
+    record_run(BENCHMARK_RESULTS_DIR, run_dir, "capacity", settings(globals()))
+    asyncio.run(find_capacity(run_dir))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+import os
+import sys
+import csv
+import json
+import sqlite3
+import threading
+import time
+from itertools import cycle
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from harness.catalog import new_run_dir, record_results, record_run
+from harness.hdr import HdrHistogram
+from harness.queries import load_queries
+from harness.sink import ResultSink, histogram_path, merge_parts, part_path
+from harness.workers import split_evenly
+from standins.modelcards import generate_modelcard
+
+# Embedded SQLite store standing in for the PATRA database; rebuilt when
+# missing, when built with different card settings, or when REBUILD_DATABASE=1
+DATABASE_PATH = os.getenv("DATABASE_PATH", "/tmp/patra_standin.sqlite")
+REBUILD_DATABASE = os.getenv("REBUILD_DATABASE", "0") == "1"
+MODELCARD_COUNT = int(os.getenv("MODELCARD_COUNT", "1000"))
+# Shape of the stored cards, as for the stand-in servers
+PAYLOAD_KB = float(os.getenv("PAYLOAD_KB", "0"))
+CARD_FIELDS = int(os.getenv("CARD_FIELDS", "0"))
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "0"))
+CARD_SECTIONS = [section for section in os.getenv("CARD_SECTIONS", "ai_model").split(",") if section]
+BENCHMARK_RUNS = int(os.getenv("BENCHMARK_RUNS", "1000"))
+# Threads querying at once, each on its own connection; sqlite3 releases the
+# GIL while a statement runs, so reads proceed in parallel
+CONCURRENCY = int(os.getenv("CONCURRENCY", "1"))
+OPERATIONS = os.getenv("OPERATIONS", "get_modelcard,search_modelcards").split(",")
+# Unset cycles get_modelcard through every stored card
+MODELCARD_ID = os.getenv("MODELCARD_ID")
+SEARCH_QUERIES = load_queries(os.getenv("SEARCH_QUERIES_FILE"), os.getenv("SEARCH_QUERY", "megadetector"))
+SEARCH_RESULTS = int(os.getenv("SEARCH_RESULTS", "5"))
+BENCHMARK_RESULTS_DIR = os.getenv("BENCHMARK_RESULTS_DIR", "/app/benchmark_results")
+RESULTS_BUFFER_ROWS = int(os.getenv("RESULTS_BUFFER_ROWS", "0")) or None
+
+# Same schema as the database/*.csv files analysis/visualize.py reads (it
+# looks in database/benchmark_results/database when a server recorded none):
+# one total_time column in milliseconds
+CSV_HEADERS = ['total_time']
+CSV_UNITS = {'total_time': 'ms'}
+# The search results file has always been named in the singular
+RESULTS_FILES = {"get_modelcard": "get_modelcard.csv", "search_modelcards": "search_modelcard.csv"}
+SUMMARY_HEADERS = ['operation', 'concurrency', 'requests', 'duration_s', 'throughput_rps', 'mean_ms', 'p50_ms',
+                   'p99_ms']
+
+SCHEMA = """
+CREATE TABLE modelcards (external_id TEXT PRIMARY KEY, name TEXT, version TEXT, short_description TEXT,
+                         full_description TEXT, keywords TEXT, author TEXT, input_type TEXT, category TEXT,
+                         documentation TEXT, extra TEXT);
+CREATE TABLE ai_models (external_id TEXT PRIMARY KEY REFERENCES modelcards, name TEXT, version TEXT,
+                        framework TEXT, model_type TEXT, test_accuracy REAL, embedding TEXT);
+CREATE TABLE bias_analyses (external_id TEXT PRIMARY KEY REFERENCES modelcards, analysis TEXT);
+CREATE TABLE xai_analyses (external_id TEXT PRIMARY KEY REFERENCES modelcards, analysis TEXT);
+CREATE TABLE build_settings (name TEXT PRIMARY KEY, value TEXT);
+CREATE VIRTUAL TABLE modelcards_fts USING fts5(external_id UNINDEXED, name, keywords, short_description,
+                                               full_description);
+"""
+CARD_COLUMNS = ['external_id', 'name', 'version', 'short_description', 'full_description', 'keywords', 'author',
+                'input_type', 'category', 'documentation']
+AI_MODEL_COLUMNS = ['name', 'version', 'framework', 'model_type', 'test_accuracy']
+SELECT_CARDS = f"""
+SELECT {', '.join(f'm.{column}' for column in CARD_COLUMNS)}, m.extra,
+       {', '.join(f'a.{column}' for column in AI_MODEL_COLUMNS)}, a.embedding, b.analysis, x.analysis
+FROM modelcards m
+LEFT JOIN ai_models a ON a.external_id = m.external_id
+LEFT JOIN bias_analyses b ON b.external_id = m.external_id
+LEFT JOIN xai_analyses x ON x.external_id = m.external_id
+"""
+GET_QUERY = SELECT_CARDS + "WHERE m.external_id = ?"
+SEARCH_QUERY_SQL = SELECT_CARDS + """
+JOIN (SELECT external_id, rank FROM modelcards_fts WHERE modelcards_fts MATCH ? ORDER BY rank LIMIT ?) hits
+  ON hits.external_id = m.external_id
+ORDER BY hits.rank
+"""
+
+def modelcard_ids():
+    """Stored ids: cards are spread over the search corpus so every query has matches"""
+    slugs = [query.lower().replace(" ", "-") for query in SEARCH_QUERIES]
+    return [f"{slugs[index % len(slugs)]}-{index}-mc" for index in range(MODELCARD_COUNT)]
+
+def build_settings():
+    """Settings that determine the stored cards, kept in the store to detect a stale build"""
+    return {'MODELCARD_COUNT': MODELCARD_COUNT, 'PAYLOAD_KB': PAYLOAD_KB, 'CARD_FIELDS': CARD_FIELDS,
+            'EMBEDDING_DIM': EMBEDDING_DIM, 'CARD_SECTIONS': CARD_SECTIONS, 'SEARCH_QUERIES': SEARCH_QUERIES}
+
+def stored_build_settings(path):
+    """build_settings() the store at `path` was built with, or None if it is missing or predates them"""
+    if not Path(path).exists():
+        return None
+    connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        return {name: json.loads(value) for name, value in connection.execute("SELECT name, value FROM build_settings")}
+    except sqlite3.OperationalError:
+        return None
+    finally:
+        connection.close()
+
+def build_database(path):
+    """Create the store and fill it with MODELCARD_COUNT synthetic cards"""
+    path = Path(path)
+    path.unlink(missing_ok=True)
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.executescript(SCHEMA)
+    with connection:
+        connection.executemany("INSERT INTO build_settings VALUES (?, ?)",
+                               [(name, json.dumps(value)) for name, value in build_settings().items()])
+        for mc_id in modelcard_ids():
+            card = generate_modelcard(mc_id, int(PAYLOAD_KB * 1024), CARD_FIELDS, EMBEDDING_DIM, CARD_SECTIONS)
+            ai_model = card.pop("ai_model", None)
+            bias = card.pop("bias_analysis", None)
+            xai = card.pop("xai_analysis", None)
+            row = [card.pop(column, None) for column in CARD_COLUMNS]
+            connection.execute("INSERT INTO modelcards VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                               row + [json.dumps(card) if card else None])
+            connection.execute("INSERT INTO modelcards_fts VALUES (?, ?, ?, ?, ?)",
+                               [row[0], row[1], row[5], row[3], row[4]])
+            if ai_model is not None:
+                embedding = ai_model.pop("embedding", None)
+                connection.execute("INSERT INTO ai_models VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                   [mc_id] + [ai_model.get(column) for column in AI_MODEL_COLUMNS]
+                                   + [json.dumps(embedding) if embedding is not None else None])
+            if bias is not None:
+                connection.execute("INSERT INTO bias_analyses VALUES (?, ?)", [mc_id, json.dumps(bias)])
+            if xai is not None:
+                connection.execute("INSERT INTO xai_analyses VALUES (?, ?)", [mc_id, json.dumps(xai)])
+    connection.close()
+
+def assemble(row):
+    """Rebuild a model card dict from a SELECT_CARDS row, as the server's data layer would"""
+    width = len(CARD_COLUMNS)
+    card = {column: value for column, value in zip(CARD_COLUMNS, row[:width]) if value is not None}
+    if row[width]:
+        card.update(json.loads(row[width]))
+    ai_model = row[width + 1:width + 1 + len(AI_MODEL_COLUMNS)]
+    embedding, bias, xai = row[width + 1 + len(AI_MODEL_COLUMNS):]
+    if ai_model[0] is not None:
+        card["ai_model"] = dict(zip(AI_MODEL_COLUMNS, ai_model))
+        if embedding is not None:
+            card["ai_model"]["embedding"] = json.loads(embedding)
+    if bias is not None:
+        card["bias_analysis"] = json.loads(bias)
+    if xai is not None:
+        card["xai_analysis"] = json.loads(xai)
+    return card
+
+def get_modelcard(connection, mc_id):
+    row = connection.execute(GET_QUERY, (mc_id,)).fetchone()
+    return assemble(row) if row is not None else None
+
+def search_modelcards(connection, query):
+    # Quoted as one FTS phrase so queries with operators or punctuation stay literal
+    phrase = '"' + query.replace('"', '""') + '"'
+    return [assemble(row) for row in connection.execute(SEARCH_QUERY_SQL, (phrase, SEARCH_RESULTS))]
+
+def run_thread(operation, arguments, runs, sink, start_barrier):
+    """Time `runs` queries on this thread's own connection into `sink`"""
+    try:
+        connection = sqlite3.connect(f"file:{DATABASE_PATH}?mode=ro", uri=True)
+        query = search_modelcards if operation == "search_modelcards" else get_modelcard
+        next_argument = cycle(arguments).__next__
+        # Warm-up query keeps statement preparation and the first page reads out of the results
+        query(connection, arguments[0])
+    except Exception:
+        # Break the barrier so the other threads and the main thread fail instead of waiting forever
+        start_barrier.abort()
+        raise
+    start_barrier.wait()
+    for _ in range(runs):
+        start = time.perf_counter()
+        query(connection, next_argument())
+        sink.record((time.perf_counter() - start) * 1000)
+    connection.close()
+
+def run_operation(operation, arguments, results_file):
+    """Run BENCHMARK_RUNS queries across CONCURRENCY threads; returns (duration_s, histogram)"""
+    runs_per_thread = split_evenly(BENCHMARK_RUNS, CONCURRENCY)
+    # Each thread writes its own part file; a single thread writes the final file directly
+    if CONCURRENCY > 1:
+        thread_files = [part_path(results_file, thread) for thread in range(CONCURRENCY)]
+    else:
+        thread_files = [results_file]
+    metadata = {'client': 'database', 'protocol': 'database', 'operation': operation, 'concurrency': CONCURRENCY}
+    sinks = [ResultSink(thread_file, CSV_HEADERS, capacity=runs, buffer_rows=RESULTS_BUFFER_ROWS,
+                        latency_column='total_time', units=CSV_UNITS, metadata=metadata)
+             for thread_file, runs in zip(thread_files, runs_per_thread)]
+    # The main thread joins the barrier too, so the clock starts once every connection is warm
+    start_barrier = threading.Barrier(CONCURRENCY + 1)
+    threads = [threading.Thread(target=run_thread, args=(operation, arguments, runs, sink, start_barrier))
+               for runs, sink in zip(runs_per_thread, sinks)]
+    for thread in threads:
+        thread.start()
+    try:
+        start_barrier.wait()
+    except threading.BrokenBarrierError:
+        for thread in threads:
+            thread.join()
+        raise RuntimeError(f"A {operation} thread failed before the run started; see its traceback above") from None
+    start_time = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    duration_s = time.perf_counter() - start_time
+
+    histogram = HdrHistogram()
+    for sink in sinks:
+        sink.close()
+        histogram.merge(sink.histogram)
+    if CONCURRENCY > 1:
+        merge_parts(results_file, thread_files)
+    histogram.save(histogram_path(results_file))
+    record_results(results_file, histogram, "database")
+    return duration_s, histogram
+
+def main():
+    stored = stored_build_settings(DATABASE_PATH)
+    if REBUILD_DATABASE or stored != build_settings():
+        if stored is not None and not REBUILD_DATABASE:
+            changed = [name for name, value in build_settings().items() if stored.get(name) != value]
+            print(f"{DATABASE_PATH} was built with a different {', '.join(changed)}; rebuilding")
+        print(f"Building {DATABASE_PATH} with {MODELCARD_COUNT} model cards...")
+        build_database(DATABASE_PATH)
+
+    run_dir = new_run_dir(BENCHMARK_RESULTS_DIR, "database")
+    record_run(BENCHMARK_RESULTS_DIR, run_dir, "database", {
+        'DATABASE_PATH': DATABASE_PATH, 'REBUILD_DATABASE': REBUILD_DATABASE, **build_settings(),
+        'BENCHMARK_RUNS': BENCHMARK_RUNS, 'CONCURRENCY': CONCURRENCY, 'OPERATIONS': OPERATIONS,
+        'MODELCARD_ID': MODELCARD_ID, 'SEARCH_RESULTS': SEARCH_RESULTS, 'RESULTS_BUFFER_ROWS': RESULTS_BUFFER_ROWS,
+    })
+
+    with open(run_dir / "summary.csv", "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(SUMMARY_HEADERS)
+        for operation in OPERATIONS:
+            if operation == "search_modelcards":
+                arguments = SEARCH_QUERIES
+            else:
+                arguments = [MODELCARD_ID] if MODELCARD_ID else modelcard_ids()
+            print(f"Running {BENCHMARK_RUNS} {operation} queries on {CONCURRENCY} threads...")
+            duration_s, histogram = run_operation(operation, arguments, run_dir / RESULTS_FILES[operation])
+            summary = histogram.summary_ms(percentiles=(50, 99))
+            throughput = summary['count'] / duration_s if duration_s > 0 else 0.0
+            writer.writerow([operation, CONCURRENCY, summary['count'], duration_s, throughput, summary['mean_ms'],
+                             summary['p50_ms'], summary['p99_ms']])
+            print(f"{operation}: {throughput:.1f} queries/s, mean={summary['mean_ms']:.3f}ms, "
+                  f"p50={summary['p50_ms']:.3f}ms, p99={summary['p99_ms']:.3f}ms")
+
+if __name__ == "__main__":
+    main()
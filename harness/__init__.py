@@ -0,0 +1 @@
+"""Shared load-generation helpers for the REST and MCP benchmark clients."""
@@ -0,0 +1,63 @@
+"""Open-loop arrival scheduling.
+
+Closed-loop clients wait for each response before sending the next request, so
+a slow response delays every request queued behind it and that delay never
+shows up in the recorded latency (coordinated omission). The scheduler here
+fires requests at precomputed arrival times regardless of completions and
+measures latency from the *intended* send time.
+"""
+import asyncio
+import random
+import time
+
+DISTRIBUTIONS = ("constant", "poisson")
+
+def arrival_offsets(rate, count, distribution="constant", seed=None):
+    """Yield `count` intended send offsets in seconds from the start of the run."""
+    if rate <= 0:
+        raise ValueError(f"Arrival rate must be positive: {rate}")
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"Unsupported arrival distribution: {distribution}")
+    rng = random.Random(seed)
+    offset = 0.0
+    for _ in range(count):
+        yield offset
+        offset += rng.expovariate(rate) if distribution == "poisson" else 1.0 / rate
+
+async def run_schedule(schedule, call, on_complete):
+    """Issue `call(item)` for each (offset_s, item) of `schedule` at start + offset.
+
+    Requests are fired without waiting for earlier ones to finish, and each
+    completion is reported as `on_complete(item, latency_ms, service_time_ms,
+    result)`. Latency is measured from the intended send time; service time
+    from the moment the request was actually issued. `schedule` is consumed
+    lazily and finished tasks are not retained, so memory stays proportional
+    to the requests in flight.
+    """
+    async def timed(item, intended):
+        sent = time.perf_counter()
+        result = await call(item)
+        done = time.perf_counter()
+        on_complete(item, (done - intended) * 1000, (done - sent) * 1000, result)
+
+    start = time.perf_counter()
+    in_flight = set()
+    for offset, item in schedule:
+        intended = start + offset
+        delay = intended - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        task = asyncio.create_task(timed(item, intended))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+    if in_flight:
+        await asyncio.gather(*in_flight)
+
+async def run_open_loop(call, count, rate, on_complete, distribution="constant", seed=None):
+    """Fire `count` invocations of the coroutine factory `call` on an arrival schedule.
+
+    Each completion is reported as `on_complete(latency_ms, service_time_ms,
+    result)`; see run_schedule() for how the timings are taken.
+    """
+    schedule = ((offset, None) for offset in arrival_offsets(rate, count, distribution, seed))
+    await run_schedule(schedule, lambda _: call(), lambda _, *timings: on_complete(*timings))
@@ -0,0 +1,44 @@
+"""Capacity search: the highest offered load that still meets an SLO.
+
+The offered rate is raised geometrically while each step passes, then the
+interval between the last passing and the first failing rate is bisected
+until it is narrower than `precision` (relative). A single step is run by the
+caller-supplied `measure(rate)` coroutine, which returns a dict with at least
+a boolean "passed" key; every step result is kept so the whole load curve can
+be written out, not just the knee.
+"""
+
+async def search_capacity(measure, start_rate, max_rate, step_factor=2.0, precision=0.05):
+    """Return (highest passing rate or None, list of step results in the order run)."""
+    if start_rate <= 0 or max_rate < start_rate:
+        raise ValueError(f"Invalid capacity search range: {start_rate}..{max_rate}")
+    if step_factor <= 1:
+        raise ValueError(f"Step factor must be greater than 1: {step_factor}")
+    steps = []
+
+    async def step(rate):
+        result = dict(await measure(rate), offered_rps=rate)
+        steps.append(result)
+        return result["passed"]
+
+    passing, failing = None, None
+    rate = start_rate
+    while True:
+        if not await step(rate):
+            failing = rate
+            break
+        passing = rate
+        if rate >= max_rate:
+            return passing, steps
+        rate = min(rate * step_factor, max_rate)
+
+    if passing is None:
+        # Even the starting rate breaches the SLO; there is no knee to refine
+        return None, steps
+    while (failing - passing) / passing > precision:
+        rate = (passing + failing) / 2
+        if await step(rate):
+            passing = rate
+        else:
+            failing = rate
+    return passing, steps
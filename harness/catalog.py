@@ -0,0 +1,176 @@
+"""SQLite catalog of benchmark runs.
+
+Every client gives its run a unique id (timestamp plus a random suffix, or
+RUN_ID to share one id across clients) and writes into run_<id>, so runs on
+the same day no longer overwrite each other. The run and each of its results
+files are indexed in <results dir>/catalog.sqlite: config, host, protocol,
+operation, latency summary from the HDR histogram, and the paths of the CSV,
+.npy and histogram, relative to the catalog so it stays valid when the
+results volume is mounted elsewhere. Analysis queries the catalog instead of
+scanning directories and re-parsing files.
+"""
+import json
+import os
+import re
+import socket
+import sqlite3
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+
+from harness.schema import schema_path
+
+CATALOG_NAME = "catalog.sqlite"
+SUMMARY_PERCENTILES = (50, 90, 99)
+# Run directory names: run_YYYYMMDD_HHMMSS before the catalog, run_YYYY_MM_DD[_HHMMSS_<hex>] since
+_RUN_NAME = re.compile(r"run_(\d{4})_?(\d{2})_?(\d{2})(?:_(\d{2})(\d{2})(\d{2}))?")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT NOT NULL, client TEXT NOT NULL, host TEXT, started_at TEXT, run_dir TEXT, config TEXT,
+    PRIMARY KEY (run_id, client));
+CREATE TABLE IF NOT EXISTS results (
+    results_file TEXT PRIMARY KEY, run_id TEXT NOT NULL, client TEXT NOT NULL, protocol TEXT, operation TEXT,
+    requests INTEGER, mean_ms REAL, p50_ms REAL, p90_ms REAL, p99_ms REAL, max_ms REAL,
+    columnar_file TEXT, histogram_file TEXT, metadata TEXT, recorded_at TEXT);
+CREATE INDEX IF NOT EXISTS results_by_operation ON results (protocol, operation, run_id);
+"""
+
+@lru_cache(maxsize=None)
+def run_id():
+    """This process's run id; sortable by start time"""
+    return os.getenv("RUN_ID") or f"{datetime.now():%Y_%m_%d_%H%M%S}_{os.urandom(2).hex()}"
+
+def new_run_dir(results_root, *parts):
+    """Create and return <results_root>/<parts>/run_<run id>"""
+    path = Path(results_root, *parts, f"run_{run_id()}")
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+def settings(namespace):
+    """Upper-case scalar and list settings from a client module's globals(), for the run config"""
+    simple = (str, int, float, bool, type(None))
+    return {
+        name: list(value) if isinstance(value, tuple) else value
+        for name, value in namespace.items()
+        if name.isupper() and not name.endswith("HEADERS")
+        and (isinstance(value, simple) or isinstance(value, (list, tuple)) and all(isinstance(v, simple) for v in value))
+        and not (isinstance(value, str) and "\n" in value)
+    }
+
+def find_catalog(path):
+    """The catalog in `path` or the nearest directory above it, or None"""
+    path = Path(path).resolve()
+    for directory in [path, *path.parents]:
+        if (directory / CATALOG_NAME).exists():
+            return directory / CATALOG_NAME
+    return None
+
+class RunCatalog:
+    """Read and write the catalog stored in `root`."""
+
+    def __init__(self, root):
+        self.root = Path(root).resolve()
+        self.root.mkdir(parents=True, exist_ok=True)
+        # Several clients may share a results volume; wait out their writes
+        self._connection = sqlite3.connect(self.root / CATALOG_NAME, timeout=30)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.executescript(_SCHEMA)
+
+    def _relative(self, path):
+        return Path(path).resolve().relative_to(self.root).as_posix()
+
+    def add_run(self, run_dir, client, config):
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id(), client, socket.gethostname(), datetime.now(timezone.utc).isoformat(),
+                 self._relative(run_dir), json.dumps(config, default=str)))
+
+    def add_results(self, results_file, histogram, client, **metadata):
+        """Index one results file with its latency summary; metadata defaults to its schema sidecar's"""
+        results_file = Path(results_file)
+        sidecar = schema_path(results_file.with_suffix(".npy"))
+        if sidecar.exists():
+            metadata = {**json.loads(sidecar.read_text())['metadata'], **metadata}
+        summary = histogram.summary_ms(SUMMARY_PERCENTILES) if histogram.total_count else {'count': 0}
+        columnar_file = results_file.with_suffix(".npy")
+        histogram_file = results_file.with_suffix(".hdr")
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (self._relative(results_file), run_id(), client, metadata.get('protocol', client),
+                 metadata.get('operation'), summary['count'], summary.get('mean_ms'), summary.get('p50_ms'),
+                 summary.get('p90_ms'), summary.get('p99_ms'), summary.get('max_ms'),
+                 self._relative(columnar_file) if columnar_file.exists() else None,
+                 self._relative(histogram_file) if histogram_file.exists() else None,
+                 json.dumps(metadata, default=str), datetime.now(timezone.utc).isoformat()))
+
+    def runs(self, client=None):
+        """Runs, newest first, as dicts with absolute run_dir paths"""
+        query = "SELECT * FROM runs" + (" WHERE client = ?" if client else "") + " ORDER BY started_at DESC"
+        return [dict(row, run_dir=self.root / row['run_dir'], config=json.loads(row['config']))
+                for row in self._connection.execute(query, (client,) if client else ())]
+
+    def results(self, **filters):
+        """Indexed results matching column=value filters, newest run first, with absolute paths"""
+        where = " AND ".join(f"r.{column} = ?" for column in filters)
+        query = ("SELECT r.*, runs.started_at, runs.host FROM results r "
+                 "JOIN runs ON runs.run_id = r.run_id AND runs.client = r.client"
+                 + (f" WHERE {where}" if where else "") + " ORDER BY runs.started_at DESC, r.results_file")
+        rows = []
+        for row in self._connection.execute(query, tuple(filters.values())):
+            row = dict(row, metadata=json.loads(row['metadata']))
+            for column in ('results_file', 'columnar_file', 'histogram_file'):
+                if row[column] is not None:
+                    row[column] = self.root / row[column]
+            rows.append(row)
+        return rows
+
+    def close(self):
+        self._connection.close()
+
+def record_run(results_root, run_dir, client, config):
+    """Register this process's run in the catalog under `results_root`"""
+    catalog = RunCatalog(results_root)
+    catalog.add_run(run_dir, client, config)
+    catalog.close()
+
+def record_results(results_file, histogram, client, **metadata):
+    """Index a results file in the catalog of the run it belongs to (see record_run)"""
+    path = find_catalog(Path(results_file).parent)
+    if path is None:
+        return
+    catalog = RunCatalog(path.parent)
+    catalog.add_results(results_file, histogram, client, **metadata)
+    catalog.close()
+
+def _run_name_key(run_dir):
+    """Sort key for a run directory: the start time in its name, then the name"""
+    match = _RUN_NAME.match(run_dir.name)
+    started = "".join(part or "00" for part in match.groups()) if match else ""
+    return started, run_dir.name
+
+def latest_run_dir(root):
+    """Most recently started run directly under `root`.
+
+    Uses the catalog when one covers `root`. Directories written before the
+    catalog existed fall back to the start time in their names, which both
+    naming schemes carry (modification times do not survive a clone or copy).
+    Returns `root` itself when it holds no runs.
+    """
+    root = Path(root)
+    if not root.exists():
+        raise FileNotFoundError(f"Directory does not exist: {root}")
+    path = find_catalog(root)
+    if path is not None:
+        catalog = RunCatalog(path.parent)
+        runs = [run['run_dir'] for run in catalog.runs()
+                if run['run_dir'].parent == root.resolve() and run['run_dir'].exists()]
+        catalog.close()
+        if runs:
+            return runs[0]
+    run_dirs = [p for p in root.iterdir() if p.is_dir() and p.name.startswith("run_")]
+    if not run_dirs:
+        return root
+    return max(run_dirs, key=_run_name_key)
@@ -0,0 +1,192 @@
+"""HDR-style log-linear latency histogram.
+
+Records integer microsecond values into a fixed array of counters laid out the
+way HdrHistogram does it: values are grouped into power-of-two buckets, each
+split into linear sub-buckets, so every recorded value keeps
+`significant_digits` decimal digits of precision while memory stays fixed no
+matter how many samples are recorded. Histograms with the same layout can be
+merged across workers and runs, and encode to a few KB.
+"""
+import math
+import struct
+import zlib
+from array import array
+from pathlib import Path
+
+_MAGIC = b"HDRH1"
+_HEADER = struct.Struct("<5sQQBQQQ")
+
+class HdrHistogram:
+    """Fixed-memory histogram of integer values in [lowest, highest].
+
+    Values above `highest` are clamped to it (and counted in `clamped`) rather
+    than rejected, so a pathological outlier cannot abort a long run.
+    """
+
+    def __init__(self, lowest=1, highest=3_600_000_000, significant_digits=3):
+        if lowest < 1 or highest < 2 * lowest or not 1 <= significant_digits <= 5:
+            raise ValueError("Invalid histogram range or precision")
+        self.lowest = lowest
+        self.highest = highest
+        self.significant_digits = significant_digits
+
+        largest_single_unit = 2 * 10 ** significant_digits
+        self._unit_magnitude = int(math.floor(math.log2(lowest)))
+        self._half_magnitude = max(int(math.ceil(math.log2(largest_single_unit))) - 1, 0)
+        self._sub_bucket_count = 1 << (self._half_magnitude + 1)
+        self._half_count = self._sub_bucket_count // 2
+        self._sub_bucket_mask = (self._sub_bucket_count - 1) << self._unit_magnitude
+
+        smallest_untrackable = self._sub_bucket_count << self._unit_magnitude
+        bucket_count = 1
+        while smallest_untrackable <= highest:
+            smallest_untrackable <<= 1
+            bucket_count += 1
+        self.counts = array('Q', bytes(8 * (bucket_count + 1) * self._half_count))
+        self.total_count = 0
+        self.clamped = 0
+        self.min_value = None
+        self.max_value = 0
+
+    def _index(self, value):
+        bucket = (value | self._sub_bucket_mask).bit_length() - self._unit_magnitude - (self._half_magnitude + 1)
+        sub_bucket = value >> (bucket + self._unit_magnitude)
+        return ((bucket + 1) << self._half_magnitude) + sub_bucket - self._half_count
+
+    def _value_range(self, index):
+        """Lowest value and width of the range counted at `index`."""
+        bucket = (index >> self._half_magnitude) - 1
+        sub_bucket = (index & (self._half_count - 1)) + self._half_count
+        if bucket < 0:
+            sub_bucket -= self._half_count
+            bucket = 0
+        return sub_bucket << (bucket + self._unit_magnitude), 1 << (bucket + self._unit_magnitude)
+
+    def record(self, value, count=1):
+        """Record an integer value `count` times."""
+        if value > self.highest:
+            value = self.highest
+            self.clamped += count
+        elif value < 0:
+            raise ValueError(f"Cannot record negative value: {value}")
+        self.counts[self._index(value)] += count
+        self.total_count += count
+        if self.min_value is None or value < self.min_value:
+            self.min_value = value
+        if value > self.max_value:
+            self.max_value = value
+
+    def record_ms(self, milliseconds):
+        """Record a latency given in (fractional) milliseconds, stored as microseconds."""
+        self.record(int(round(milliseconds * 1000)))
+
+    def merge(self, other):
+        """Add the counts of a histogram with the same layout into this one."""
+        if (other.lowest, other.highest, other.significant_digits) != (self.lowest, self.highest, self.significant_digits):
+            raise ValueError("Cannot merge histograms with different ranges or precision")
+        counts = self.counts
+        for index, count in enumerate(other.counts):
+            if count:
+                counts[index] += count
+        self.total_count += other.total_count
+        self.clamped += other.clamped
+        if other.min_value is not None and (self.min_value is None or other.min_value < self.min_value):
+            self.min_value = other.min_value
+        self.max_value = max(self.max_value, other.max_value)
+        return self
+
+    def value_at_percentile(self, percentile):
+        """Highest value equivalent to the given percentile (0-100), in recorded units."""
+        if not self.total_count:
+            return 0
+        target = max(1, int(math.ceil(percentile / 100 * self.total_count)))
+        running = 0
+        for index, count in enumerate(self.counts):
+            running += count
+            if running >= target:
+                low, width = self._value_range(index)
+                return min(low + width - 1, self.max_value)
+        return self.max_value
+
+    def mean(self):
+        """Mean of recorded values, using the midpoint of each counter's range."""
+        if not self.total_count:
+            return 0.0
+        total = 0
+        for index, count in enumerate(self.counts):
+            if count:
+                low, width = self._value_range(index)
+                total += count * (low + (width - 1) / 2)
+        return total / self.total_count
+
+    def summary_ms(self, percentiles=(50, 90, 99, 99.9)):
+        """Mean and percentiles in milliseconds, for values recorded with record_ms()."""
+        stats = {'count': self.total_count, 'mean_ms': self.mean() / 1000}
+        for percentile in percentiles:
+            stats[f"p{percentile:g}_ms"] = self.value_at_percentile(percentile) / 1000
+        stats['max_ms'] = self.max_value / 1000
+        return stats
+
+    def encode(self):
+        """Serialize to bytes: a small header plus zlib-compressed, run-length varint counts."""
+        body = bytearray()
+        zeros = 0
+        for count in self.counts:
+            if count:
+                if zeros:
+                    _write_varint(body, (zeros << 1) | 1)
+                    zeros = 0
+                _write_varint(body, count << 1)
+            else:
+                zeros += 1
+        if zeros:
+            _write_varint(body, (zeros << 1) | 1)
+        header = _HEADER.pack(_MAGIC, self.lowest, self.highest, self.significant_digits, self.clamped,
+                              self.min_value or 0, self.max_value)
+        return header + zlib.compress(bytes(body))
+
+    @classmethod
+    def decode(cls, data):
+        """Rebuild a histogram from encode() output."""
+        magic, lowest, highest, significant_digits, clamped, min_value, max_value = _HEADER.unpack_from(data)
+        if magic != _MAGIC:
+            raise ValueError("Not an encoded HDR histogram")
+        histogram = cls(lowest, highest, significant_digits)
+        body = zlib.decompress(data[_HEADER.size:])
+        index = position = 0
+        while position < len(body):
+            value, position = _read_varint(body, position)
+            if value & 1:
+                index += value >> 1
+                continue
+            histogram.counts[index] = value >> 1
+            histogram.total_count += value >> 1
+            index += 1
+        histogram.clamped = clamped
+        if histogram.total_count:
+            histogram.min_value = min_value
+            histogram.max_value = max_value
+        return histogram
+
+    def save(self, path):
+        Path(path).write_bytes(self.encode())
+
+    @classmethod
+    def load(cls, path):
+        return cls.decode(Path(path).read_bytes())
+
+def _write_varint(buffer, value):
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+def _read_varint(data, position):
+    result = shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, position
+        shift += 7
@@ -0,0 +1,26 @@
+"""Interleaved request order across several targets.
+
+Benchmarking one target after another lets drift in the network or the
+backends over the run show up as a difference between targets. Interleaving
+sends every target one request per round instead, so all of them see the same
+conditions. The order within a round is either counterbalanced ("abba": the
+round order alternates between forward and reversed, so a linear drift cancels
+out over each pair of rounds) or shuffled per round ("random").
+"""
+import random
+
+DESIGNS = ("abba", "random")
+
+def interleaved_order(targets, rounds, design="abba", seed=None):
+    """Yield (round, target) pairs, every target exactly once per round."""
+    if design not in DESIGNS:
+        raise ValueError(f"Unsupported interleaving design: {design}")
+    targets = list(targets)
+    rng = random.Random(seed)
+    for round_index in range(rounds):
+        if design == "random":
+            order = rng.sample(targets, len(targets))
+        else:
+            order = targets if round_index % 2 == 0 else targets[::-1]
+        for target in order:
+            yield round_index, target
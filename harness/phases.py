@@ -0,0 +1,103 @@
+"""Per-phase HTTP request timing.
+
+Breaks each GET into the phases recorded in the historical
+rest/benchmark_results/run_*/ CSVs (DNS lookup, TCP connect, TLS handshake,
+request send, time to first byte, body read, close) without spawning curl.
+All durations are in seconds, matching those files.
+"""
+import http.client
+import socket
+import ssl
+import time
+from urllib.parse import urlsplit
+
+PHASE_HEADERS = [
+    'timestamp', 'dns_lookup', 'socket_creation', 'tcp_connect', 'ssl_context_creation',
+    'ssl_handshake', 'request_send', 'time_to_first_byte', 'response_read', 'socket_close',
+    'server_processing', 'total_time',
+]
+# Units for the unified result schema (see harness.schema); timestamp is epoch seconds
+PHASE_UNITS = dict.fromkeys(PHASE_HEADERS, 's')
+
+class PhaseTimedClient:
+    """Issue GETs against one origin and time each phase.
+
+    With `keep_alive` the connection is reused between requests, so only the
+    first request (or one after the server closes) pays for DNS, connect and
+    TLS; the remaining phases report zero for those steps.
+    """
+
+    def __init__(self, base_url, keep_alive=False):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.keep_alive = keep_alive
+        self.conn = None
+
+    def _connect(self, phases):
+        """Open a connection, filling in the connection-setup phases."""
+        start = time.perf_counter()
+        family, socktype, proto, _, address = socket.getaddrinfo(
+            self.host, self.port, type=socket.SOCK_STREAM)[0]
+        resolved = time.perf_counter()
+        sock = socket.socket(family, socktype, proto)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        created = time.perf_counter()
+        sock.connect(address)
+        connected = time.perf_counter()
+        phases['dns_lookup'] = resolved - start
+        phases['socket_creation'] = created - resolved
+        phases['tcp_connect'] = connected - created
+
+        if self.scheme == "https":
+            context = ssl.create_default_context()
+            context_created = time.perf_counter()
+            sock = context.wrap_socket(sock, server_hostname=self.host)
+            phases['ssl_context_creation'] = context_created - connected
+            phases['ssl_handshake'] = time.perf_counter() - context_created
+            conn = http.client.HTTPSConnection(self.host, self.port)
+        else:
+            conn = http.client.HTTPConnection(self.host, self.port)
+        # A preset socket makes http.client skip its own connect()
+        conn.sock = sock
+        return conn
+
+    def get(self, target, headers=None):
+        """GET `target` (path and query) with extra `headers`; returns (phase row, body size in bytes)."""
+        phases = dict.fromkeys(PHASE_HEADERS, 0.0)
+        phases['timestamp'] = time.time()
+        conn = self.conn or self._connect(phases)
+
+        start = time.perf_counter()
+        conn.putrequest("GET", target, skip_accept_encoding=True)
+        if not self.keep_alive:
+            conn.putheader("Connection", "close")
+        for name, value in (headers or {}).items():
+            conn.putheader(name, value)
+        conn.endheaders()
+        sent = time.perf_counter()
+        response = conn.getresponse()
+        first_byte = time.perf_counter()
+        body = response.read()
+        read = time.perf_counter()
+        phases['request_send'] = sent - start
+        phases['time_to_first_byte'] = first_byte - sent
+        phases['response_read'] = read - first_byte
+
+        if self.keep_alive and not response.will_close:
+            self.conn = conn
+        else:
+            conn.close()
+            self.conn = None
+            phases['socket_close'] = time.perf_counter() - read
+        # Without server-side instrumentation the wait for the first byte is
+        # the best available estimate of server processing time
+        phases['server_processing'] = phases['time_to_first_byte']
+        phases['total_time'] = sum(phases[name] for name in PHASE_HEADERS[1:-2])
+        return [phases[name] for name in PHASE_HEADERS], len(body)
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
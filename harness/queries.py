@@ -0,0 +1,15 @@
+"""Search query corpus loading."""
+from pathlib import Path
+
+def load_queries(path, fallback):
+    """Read one query per non-blank line of `path`.
+
+    Falls back to the single query `fallback` when no corpus file is configured,
+    which keeps the old SEARCH_QUERY-only setup working.
+    """
+    if not path:
+        return [fallback]
+    queries = [line.strip() for line in Path(path).read_text().splitlines() if line.strip()]
+    if not queries:
+        raise ValueError(f"Query corpus is empty: {path}")
+    return queries
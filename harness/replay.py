@@ -0,0 +1,59 @@
+"""Trace replay.
+
+Streams a JSONL trace of recorded requests and turns it into an open-loop
+schedule that preserves the recorded inter-arrival gaps, optionally sped up
+or slowed down. Each line is one request:
+
+    {"timestamp": 1761116485.11, "protocol": "rest", "operation": "get_modelcard", "mc_id": "megadetector-mc"}
+    {"timestamp": 1761116485.32, "protocol": "layered", "operation": "search_modelcards", "query": "AlexNet"}
+
+`timestamp` is in seconds (epoch or relative, only differences matter),
+`protocol` is one of rest, native or layered, and `operation` is
+get_modelcard (with `mc_id`) or search_modelcards (with `query`).
+"""
+import json
+from collections import namedtuple
+
+PROTOCOLS = ("rest", "native", "layered")
+OPERATIONS = ("get_modelcard", "search_modelcards")
+
+TraceRecord = namedtuple("TraceRecord", ["timestamp", "protocol", "operation", "argument"])
+
+def read_trace(path, on_invalid=None):
+    """Yield TraceRecords from a JSONL trace one line at a time.
+
+    Lines that are not valid trace records are skipped and reported to
+    `on_invalid(line_number, reason)` when given.
+    """
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+                operation = entry["operation"]
+                protocol = entry["protocol"]
+                if operation not in OPERATIONS:
+                    raise ValueError(f"unknown operation {operation!r}")
+                if protocol not in PROTOCOLS:
+                    raise ValueError(f"unknown protocol {protocol!r}")
+                argument = entry["query"] if operation == "search_modelcards" else entry["mc_id"]
+                yield TraceRecord(float(entry["timestamp"]), protocol, operation, argument)
+            except (ValueError, KeyError, TypeError) as e:
+                if on_invalid is not None:
+                    on_invalid(line_number, str(e))
+
+def trace_schedule(records, speed=1.0):
+    """Turn TraceRecords into (offset_s, record) pairs for harness.arrivals.run_schedule.
+
+    Offsets are relative to the first record and divided by `speed`, so 2.0
+    replays twice as fast. Records are assumed to be in timestamp order; any
+    that go backwards are sent immediately rather than reordered.
+    """
+    if speed <= 0:
+        raise ValueError(f"Replay speed must be positive: {speed}")
+    first = None
+    for record in records:
+        if first is None:
+            first = record.timestamp
+        yield max(record.timestamp - first, 0.0) / speed, record
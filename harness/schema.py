@@ -0,0 +1,137 @@
+"""Unified result schema and columnar storage.
+
+Every result column is named <quantity>_<unit> with a unit from UNITS
+(response_time_ms, response_size_kb, dns_lookup_s, ...), or is one of the
+per-request identifiers in ID_COLUMNS. Older files used unitless names such
+as total_time (milliseconds in database/*.csv, seconds in the phase CSVs);
+callers state those units explicitly and the columns are renamed on the way
+in, so the unit never has to be guessed from which directory a file came from.
+
+Results are stored as a NumPy .npy file of float64 records, one named field
+per column, plus a <stem>.schema.json sidecar describing each column's unit
+and the run's metadata. The schema is per column, but the layout is
+row-major: a structured array whose records are appended as the sink
+flushes them, so reading one column still reads every row. The .npy format
+is written here without numpy; with numpy, np.load() maps a multi-million-row
+file in milliseconds, and load_columns() reads it with the standard library
+alone.
+"""
+import ast
+import csv
+import json
+import socket
+import sys
+from array import array
+from datetime import datetime, timezone
+from pathlib import Path
+
+UNITS = ("s", "ms", "us", "bytes", "kb", "rps")
+# Per-request identifiers rather than measurements
+ID_COLUMNS = ("sequence", "round", "session", "depth", "worker")
+
+_MAGIC = b"\x93NUMPY\x01\x00"
+_FLOAT = "<f8" if sys.byteorder == "little" else ">f8"
+
+def column_unit(name):
+    """Unit suffix of a unified column name, "id" for identifiers, else None"""
+    if name in ID_COLUMNS:
+        return "id"
+    suffix = name.rsplit("_", 1)[-1]
+    return suffix if "_" in name and suffix in UNITS else None
+
+def unified_columns(headers, units=None):
+    """[(source header, unified name, unit)] for a result file's headers.
+
+    `units` gives the unit of headers without one, e.g. {'total_time': 'ms'}.
+    Raises ValueError for a column whose unit is neither in its name nor given.
+    """
+    units = units or {}
+    columns = []
+    for header in headers:
+        unit = column_unit(header)
+        if unit is not None:
+            columns.append((header, header, unit))
+        elif header in units:
+            if units[header] not in UNITS:
+                raise ValueError(f"Unknown unit for {header}: {units[header]}")
+            columns.append((header, f"{header}_{units[header]}", units[header]))
+        else:
+            raise ValueError(f"Result column {header!r} has no unit; name it <quantity>_<unit> or pass units=")
+    return columns
+
+def schema_path(path):
+    """Schema sidecar stored next to the results file `path`."""
+    path = Path(path)
+    return path.with_name(f"{path.stem}.schema.json")
+
+def _npy_header(names, rows):
+    descr = [(name, _FLOAT) for name in names]
+    header = f"{{'descr': {descr!r}, 'fortran_order': False, 'shape': ({rows},), }}"
+    # Padded for the largest row count, so the header can be rewritten in place on close
+    width = len(header) - len(str(rows)) + 20
+    total = -(-(len(_MAGIC) + 2 + width + 1) // 64) * 64
+    header = header.ljust(total - len(_MAGIC) - 2 - 1) + "\n"
+    return _MAGIC + len(header).to_bytes(2, "little") + header.encode("latin1")
+
+class NpyWriter:
+    """Append float64 rows to a structured (row-major) .npy file, fixing up its row count on close."""
+
+    def __init__(self, path, names, units, metadata=None):
+        self.path = Path(path)
+        self.names = list(names)
+        self.rows = 0
+        self._file = open(self.path, "wb")
+        self._file.write(_npy_header(self.names, 0))
+        schema = {
+            'columns': [{'name': name, 'unit': unit} for name, unit in zip(self.names, units)],
+            'metadata': {'host': socket.gethostname(), 'created_at': datetime.now(timezone.utc).isoformat(),
+                         **(metadata or {})},
+        }
+        schema_path(self.path).write_text(json.dumps(schema, indent=2))
+
+    def write(self, values):
+        """Append rows given as a flat array('d') of whole rows."""
+        self._file.write(values.tobytes())
+        self.rows += len(values) // len(self.names)
+
+    def close(self):
+        self._file.seek(0)
+        self._file.write(_npy_header(self.names, self.rows))
+        self._file.close()
+
+def read_npy(path):
+    """(column names, flat array('d') of rows) from a .npy file written by NpyWriter"""
+    with open(path, "rb") as f:
+        if f.read(len(_MAGIC)) != _MAGIC:
+            raise ValueError(f"Not a version 1.0 .npy file: {path}")
+        header = ast.literal_eval(f.read(int.from_bytes(f.read(2), "little")).decode("latin1"))
+        values = array("d")
+        values.frombytes(f.read())
+    if header['descr'] and header['descr'][0][1] != _FLOAT:
+        values.byteswap()
+    return [name for name, _ in header['descr']], values
+
+def load_columns(path):
+    """{column name: array('d')} from a .npy results file, without numpy"""
+    names, values = read_npy(path)
+    return {name: values[index::len(names)] for index, name in enumerate(names)}
+
+def convert_csv(csv_path, units=None, headers=None, metadata=None, npy_path=None):
+    """Write the .npy and schema for an existing results CSV; returns the .npy path.
+
+    `headers` names the columns of headerless files (the layered MCP timing
+    files are a single total_time column in seconds). The .npy goes next to
+    the CSV unless `npy_path` is given.
+    """
+    csv_path = Path(csv_path)
+    with open(csv_path, newline="") as f:
+        reader = csv.reader(f)
+        headers = headers or next(reader)
+        columns = unified_columns(headers, units)
+        values = array("d", (float(value) for row in reader if row for value in row))
+    npy_path = Path(npy_path) if npy_path is not None else csv_path.with_suffix(".npy")
+    writer = NpyWriter(npy_path, [name for _, name, _ in columns], [unit for _, _, unit in columns],
+                       {'source': csv_path.name, **(metadata or {})})
+    writer.write(values)
+    writer.close()
+    return npy_path
@@ -0,0 +1,143 @@
+"""Buffered result sink.
+
+Measured samples go into a preallocated flat array of doubles so recording a
+row costs a few stores instead of a file open/append/close. Rows reach the CSV
+in bulk: either once when the sink is closed, or, with a bounded buffer, from
+a background thread that drains full buffers while the run keeps recording.
+The same rows also go to a columnar .npy file in the unified schema (see
+harness.schema) next to the CSV.
+"""
+import csv
+import json
+import queue
+import threading
+from array import array
+from pathlib import Path
+
+from harness.hdr import HdrHistogram
+from harness.schema import NpyWriter, read_npy, schema_path, unified_columns
+
+def _zeros(size):
+    return array('d', bytes(8 * size))
+
+class ResultSink:
+    """Collect fixed-width float rows and write them to `path` as CSV.
+
+    With `buffer_rows` unset every row stays in memory (starting at `capacity`
+    rows and doubling as needed) and the file is written on close(). With
+    `buffer_rows` set, memory is bounded to two buffers of that many rows: a
+    full buffer is handed to a writer thread and recording continues in the
+    other one, blocking only if the writer falls a whole buffer behind.
+
+    Every row's `latency_column` value is also recorded, scaled by
+    `latency_to_us` to microseconds, into `histogram` so percentiles survive
+    without re-reading the CSV and can be merged across workers.
+
+    The .npy copy renames columns to the unified schema; `units` gives the
+    unit of any header that does not carry one, and `metadata` (protocol,
+    operation, mode, ...) is stored in its schema sidecar.
+    """
+
+    def __init__(self, path, headers, capacity=1024, buffer_rows=None,
+                 latency_column='response_time_ms', latency_to_us=1000.0, units=None, metadata=None):
+        self.path = Path(path)
+        self.width = len(headers)
+        self.count = 0
+        self.histogram = HdrHistogram()
+        self._latency_index = headers.index(latency_column)
+        self._latency_to_us = latency_to_us
+        columns = unified_columns(headers, units)
+        with open(self.path, "w", newline="") as f:
+            csv.writer(f).writerow(headers)
+        self._npy = NpyWriter(self.path.with_suffix(".npy"), [name for _, name, _ in columns],
+                              [unit for _, _, unit in columns], metadata)
+
+        self._bounded = bool(buffer_rows)
+        self._buffer = _zeros(self.width * (buffer_rows or max(capacity, 1)))
+        self._filled = 0
+        if self._bounded:
+            self._free = queue.Queue()
+            self._free.put(_zeros(len(self._buffer)))
+            self._pending = queue.Queue()
+            self._writer = threading.Thread(target=self._drain, daemon=True)
+            self._writer.start()
+
+    def record(self, *values):
+        """Append one row; must have exactly `width` values."""
+        buffer, i = self._buffer, self._filled
+        for value in values:
+            buffer[i] = value
+            i += 1
+        self._filled = i
+        self.count += 1
+        self.histogram.record(int(values[self._latency_index] * self._latency_to_us))
+        if i == len(buffer):
+            if self._bounded:
+                self._pending.put((buffer, i))
+                self._buffer, self._filled = self._free.get(), 0
+            else:
+                buffer.extend(_zeros(len(buffer)))
+
+    def _drain(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            buffer, filled = item
+            self._write(buffer, filled)
+            self._free.put(buffer)
+
+    def _write(self, buffer, filled):
+        rows = buffer[:filled]
+        self._npy.write(rows)
+        values = iter(rows)
+        with open(self.path, "a", newline="") as f:
+            csv.writer(f).writerows(zip(*[values] * self.width))
+
+    def close(self):
+        """Write any buffered rows and stop the writer thread."""
+        if self._bounded:
+            self._pending.put((self._buffer, self._filled))
+            self._pending.put(None)
+            self._writer.join()
+        else:
+            self._write(self._buffer, self._filled)
+        self._filled = 0
+        self._npy.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def part_path(path, worker):
+    """Per-worker results file next to the final `path`."""
+    path = Path(path)
+    return path.with_name(f"{path.stem}.part{worker}{path.suffix}")
+
+def merge_parts(path, part_paths):
+    """Concatenate per-worker CSVs (sharing one header) and their .npy files into `path` and remove them."""
+    with open(path, "w", newline="") as out:
+        for n, part in enumerate(part_paths):
+            with open(part, newline="") as f:
+                header = f.readline()
+                if n == 0:
+                    out.write(header)
+                for chunk in iter(lambda: f.read(1 << 20), ""):
+                    out.write(chunk)
+            Path(part).unlink()
+
+    npy_parts = [Path(part).with_suffix(".npy") for part in part_paths]
+    schema = json.loads(schema_path(npy_parts[0]).read_text())
+    writer = NpyWriter(Path(path).with_suffix(".npy"), [column['name'] for column in schema['columns']],
+                       [column['unit'] for column in schema['columns']], schema['metadata'])
+    for part in npy_parts:
+        writer.write(read_npy(part)[1])
+        part.unlink()
+        schema_path(part).unlink()
+    writer.close()
+
+def histogram_path(path):
+    """Histogram file stored next to the results CSV `path`."""
+    return Path(path).with_suffix(".hdr")
@@ -0,0 +1,99 @@
+"""REST and MCP endpoints behind one call signature.
+
+Runners that mix protocols in a single run (trace replay, capacity search)
+open each endpoint once and then issue requests through a uniform
+`call(operation, argument, traceparent=None)` coroutine that returns the
+response size in KB (bytes received on the wire, see harness.wire) and raises
+on failure. A traceparent, when given, is propagated as described in
+harness.tracing. Unlike
+the rest of the harness this module needs httpx and mcp, so only the
+cross-protocol images import it.
+"""
+from urllib.parse import urlencode
+
+import httpx
+from mcp import ClientSession, types
+
+from harness.tracing import TRACE_HEADER
+from harness.transports import mcp_streams
+from harness.wire import WireCounter, counting_transport, response_wire_bytes
+
+PROTOCOLS = ("rest", "native", "layered")
+
+def tool_arguments(operation, argument):
+    """MCP tool arguments for a get_modelcard id or search_modelcards query"""
+    return {"query": argument} if operation == "search_modelcards" else {"mc_id": argument}
+
+async def call_tool(session, name, arguments, traceparent=None):
+    """session.call_tool(), carrying `traceparent` in the request's _meta when given"""
+    if traceparent is None:
+        return await session.call_tool(name, arguments=arguments)
+    # ClientSession.call_tool() takes no _meta in mcp 1.10.1, so build the request
+    params = types.CallToolRequestParams(name=name, arguments=arguments, _meta={TRACE_HEADER: traceparent})
+    request = types.ClientRequest(types.CallToolRequest(method="tools/call", params=params))
+    return await session.send_request(request, types.CallToolResult)
+
+async def open_rest_target(stack, base_url, get_path="/modelcard/{mc_id}",
+                           search_path="/modelcards/search", search_param="q", connections=None):
+    """Open a pooled httpx client on `stack` and return its call coroutine.
+
+    `connections` caps the pool (and keeps that many alive); None leaves it unlimited.
+    """
+    if connections is None:
+        limits = httpx.Limits(max_connections=None)
+    else:
+        limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+    transport = counting_transport(limits=limits)
+    client = await stack.enter_async_context(httpx.AsyncClient(base_url=base_url, transport=transport, timeout=None))
+
+    async def call(operation, argument, traceparent=None):
+        if operation == "search_modelcards":
+            target = f"{search_path}?{urlencode({search_param: argument})}"
+        else:
+            target = get_path.format(mc_id=argument)
+        headers = {TRACE_HEADER: traceparent} if traceparent is not None else None
+        response = await client.get(target, headers=headers)
+        response.raise_for_status()
+        return response_wire_bytes(response)[1] / 1024
+    return call
+
+async def open_mcp_target(stack, server_url, sessions=1):
+    """Open and initialize `sessions` SSE MCP sessions on `stack` and return their call coroutine.
+
+    Each call goes to the session with the fewest calls in flight.
+    """
+    pool = []
+    for _ in range(sessions):
+        wire = WireCounter()
+        read_stream, write_stream = await stack.enter_async_context(mcp_streams(server_url, "sse", wire))
+        session = await stack.enter_async_context(ClientSession(read_stream, write_stream))
+        await session.initialize()
+        pool.append({"session": session, "wire": wire, "in_flight": 0})
+
+    async def call(operation, argument, traceparent=None):
+        entry = min(pool, key=lambda entry: entry["in_flight"])
+        entry["in_flight"] += 1
+        try:
+            result = await call_tool(entry["session"], operation, tool_arguments(operation, argument), traceparent)
+        finally:
+            entry["in_flight"] -= 1
+        if result.isError:
+            raise RuntimeError(f"{operation} failed: {result.content}")
+        # Bytes since the session's previous completion; exact unless calls overlap on it
+        return entry["wire"].take()[1] / 1024
+    return call
+
+async def open_targets(stack, rest_url, native_url, layered_url, connections=None, **rest_paths):
+    """Open every configured endpoint, keyed by protocol; empty URLs are skipped.
+
+    `connections` caps the REST connection pool and sets the number of MCP
+    sessions, so both protocols get the same concurrency; None leaves REST
+    unlimited with one MCP session.
+    """
+    targets = {}
+    if rest_url:
+        targets["rest"] = await open_rest_target(stack, rest_url, connections=connections, **rest_paths)
+    for protocol, server_url in [("native", native_url), ("layered", layered_url)]:
+        if server_url:
+            targets[protocol] = await open_mcp_target(stack, server_url, connections or 1)
+    return targets
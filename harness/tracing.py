@@ -0,0 +1,113 @@
+"""Per-request trace context and hop-by-hop latency breakdown.
+
+Clients send a W3C traceparent with every request: as an HTTP header to REST
+and in the tools/call `_meta` to MCP servers. Every server on the path (native
+or layered MCP, REST, the database layer) passes it on and appends one span
+record per request to a JSON-lines log:
+
+    {"trace_id": "<32 hex digits>", "hop": "rest", "duration_ms": 12.3}
+
+Trace ids are a random per-run prefix followed by the request's sequence
+number, so a result row only needs its sequence column, and the run only its
+prefix, to be joined against the span logs afterwards. Each request then gets
+an exact breakdown: the time spent in every hop minus the hop beneath it,
+instead of subtracting mean times from unpaired files.
+"""
+import csv
+import json
+import secrets
+import threading
+
+TRACE_HEADER = "traceparent"
+# Server hops from outermost to innermost
+HOPS = ("native_mcp", "layered_mcp", "rest", "db")
+BREAKDOWN_HEADERS = ['sequence', 'trace_id', 'total_ms', 'network_ms'] + [f"{hop}_ms" for hop in HOPS]
+
+class TraceContext:
+    """Trace ids for one run: a random 64-bit prefix plus the request sequence."""
+
+    def __init__(self, prefix=None):
+        self.prefix = prefix or secrets.token_hex(8)
+
+    def trace_id(self, sequence):
+        return f"{self.prefix}{int(sequence):016x}"
+
+    def traceparent(self, sequence):
+        # The parent span id only has to be non-zero
+        return f"00-{self.trace_id(sequence)}-{int(sequence) + 1:016x}-01"
+
+def trace_id_from(traceparent):
+    """Trace id of a traceparent value, or None if it is missing or malformed."""
+    parts = traceparent.strip().split("-") if traceparent else []
+    if len(parts) != 4 or len(parts[1]) != 32:
+        return None
+    return parts[1]
+
+class SpanLog:
+    """Appends one hop's span records to a JSON-lines file.
+
+    Lines are written whole in append mode, so several server threads and
+    processes can share one log.
+    """
+    _lock = threading.Lock()
+
+    def __init__(self, path, hop):
+        self.hop = hop
+        self._file = open(path, "a", buffering=1)
+
+    def record(self, traceparent, duration_ms):
+        trace_id = trace_id_from(traceparent)
+        if trace_id is not None:
+            line = json.dumps({"trace_id": trace_id, "hop": self.hop, "duration_ms": duration_ms}) + "\n"
+            with self._lock:
+                self._file.write(line)
+
+    def close(self):
+        self._file.close()
+
+def load_spans(paths):
+    """Read span logs into {trace_id: {hop: duration_ms}}."""
+    spans = {}
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    span = json.loads(line)
+                    spans.setdefault(span["trace_id"], {})[span["hop"]] = float(span["duration_ms"])
+    return spans
+
+def breakdown(total_ms, hops):
+    """Split a request's client-side latency into the time spent in each hop.
+
+    `hops` maps hop names to the durations their servers recorded. Each hop is
+    charged its own duration minus that of the next hop down; whatever the
+    outermost hop does not account for is network and client time. Hops absent
+    from `hops` are None.
+    """
+    row = {f"{hop}_ms": None for hop in HOPS}
+    outer_key, outer_ms = "network_ms", total_ms
+    for hop in HOPS:
+        if hop in hops:
+            row[outer_key] = outer_ms - hops[hop]
+            outer_key, outer_ms = f"{hop}_ms", hops[hop]
+    row[outer_key] = outer_ms
+    return row
+
+def join_spans(results_csv, prefix, spans):
+    """Breakdown rows (BREAKDOWN_HEADERS) for the traced requests in a results CSV.
+
+    The CSV needs a sequence column and either response_time_ms or, from the
+    REST client's phases mode, total_time in seconds; requests no server
+    recorded a span for are left out.
+    """
+    context = TraceContext(prefix)
+    rows = []
+    with open(results_csv, newline="") as f:
+        for result in csv.DictReader(f):
+            trace_id = context.trace_id(float(result['sequence']))
+            if trace_id in spans:
+                total_ms = (float(result['response_time_ms']) if 'response_time_ms' in result
+                            else float(result['total_time']) * 1000)
+                rows.append({'sequence': int(float(result['sequence'])), 'trace_id': trace_id, 'total_ms': total_ms,
+                             **breakdown(total_ms, spans[trace_id])})
+    return rows
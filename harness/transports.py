@@ -0,0 +1,122 @@
+"""MCP client transports behind one stream interface.
+
+mcp 1.10.1 ships SSE, streamable-HTTP, WebSocket and stdio clients that all
+hand ClientSession a (read_stream, write_stream) pair of JSON-RPC session
+messages. mcp_streams() opens any of them by name and can count the session's
+traffic into a WireCounter, which lets the same workload compare transports
+on bytes as well as latency:
+
+- sse and streamable_http run on httpx, so every byte on their connections
+  (headers, SSE framing, JSON-RPC envelopes) is counted at the network stream.
+- stdio frames each message as one line of JSON, so message size plus the
+  newline is exactly what crosses the pipe.
+- websocket counts serialized messages only; frame headers and any
+  per-message compression happen inside the websockets library.
+
+Like targets.py this module needs the mcp package; the WebSocket client
+additionally needs websockets (the mcp[ws] extra) and is only imported when
+selected.
+"""
+import shlex
+from contextlib import asynccontextmanager
+
+import httpx
+from mcp import StdioServerParameters
+from mcp.client.sse import sse_client
+from mcp.client.stdio import stdio_client
+from mcp.client.streamable_http import streamablehttp_client
+
+from harness.wire import counting_transport
+
+TRANSPORTS = ("sse", "streamable_http", "websocket", "stdio")
+
+def _message_bytes(item):
+    """Serialized size of a session message, as the transports put it on the wire."""
+    if isinstance(item, Exception):
+        return 0
+    message = getattr(item, "message", item)
+    return len(message.model_dump_json(by_alias=True, exclude_none=True).encode('utf-8'))
+
+class _CountingStream:
+    """Delegating wrapper around an anyio memory stream that sizes each message."""
+
+    def __init__(self, stream, wire, sending, framing_bytes):
+        self._stream = stream
+        self._wire = wire
+        self._sending = sending
+        self._framing_bytes = framing_bytes
+
+    def _count(self, item):
+        if self._sending:
+            self._wire.bytes_sent += _message_bytes(item) + self._framing_bytes
+        else:
+            self._wire.bytes_received += _message_bytes(item) + self._framing_bytes
+
+    async def send(self, item):
+        self._count(item)
+        await self._stream.send(item)
+
+    async def receive(self):
+        item = await self._stream.receive()
+        self._count(item)
+        return item
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        item = await self._stream.__anext__()
+        self._count(item)
+        return item
+
+    async def __aenter__(self):
+        await self._stream.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return await self._stream.__aexit__(*exc_info)
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+def _counting_client_factory(wire):
+    """httpx client factory for the MCP HTTP transports, counting connection bytes into `wire`"""
+    def create_client(headers=None, timeout=None, auth=None):
+        # Same settings as mcp's default factory, plus the counting transport
+        return httpx.AsyncClient(headers=headers, timeout=timeout if timeout is not None else httpx.Timeout(30.0),
+                                 auth=auth, follow_redirects=True, transport=counting_transport(wire))
+    return create_client
+
+def _open_client(url, transport, wire, env):
+    if transport == "stdio":
+        # `url` is the server command line; the server is spawned per session,
+        # with `env` on top of mcp's default environment (which passes little else)
+        command, *args = shlex.split(url)
+        return stdio_client(StdioServerParameters(command=command, args=args, env=env))
+    if transport in ("sse", "streamable_http"):
+        client = sse_client if transport == "sse" else streamablehttp_client
+        if wire is not None:
+            return client(url, httpx_client_factory=_counting_client_factory(wire))
+        return client(url)
+    if transport == "websocket":
+        from mcp.client.websocket import websocket_client
+        return websocket_client(url)
+    raise ValueError(f"Unsupported MCP transport: {transport}")
+
+@asynccontextmanager
+async def mcp_streams(url, transport="sse", wire=None, env=None):
+    """Open an MCP client transport, yielding its (read_stream, write_stream).
+
+    For stdio, `url` is the command that starts the server and `env` holds
+    extra environment variables for it. With `wire` given, the session's
+    traffic in both directions is added to it.
+    """
+    async with _open_client(url, transport, wire, env) as streams:
+        # streamable_http also yields a session id getter, which is not needed here
+        read_stream, write_stream = streams[0], streams[1]
+        if wire is not None and transport in ("stdio", "websocket"):
+            # stdio ends every message with a newline
+            framing_bytes = 1 if transport == "stdio" else 0
+            read_stream = _CountingStream(read_stream, wire, False, framing_bytes)
+            write_stream = _CountingStream(write_stream, wire, True, framing_bytes)
+        yield read_stream, write_stream
@@ -0,0 +1,165 @@
+"""Bytes-on-wire accounting.
+
+Counts what actually crosses the connection - request and status lines,
+headers, chunked or SSE framing, JSON-RPC envelopes and bodies - by wrapping
+the network stream underneath the HTTP client instead of re-encoding decoded
+responses. The wrappers only add the length of each buffer the client already
+reads or writes, so they cost no copies.
+
+Two layers are covered: httpcore network streams (httpx, and through it the
+MCP SSE and streamable-HTTP clients) and plain sockets (http.client, and
+through it requests/urllib3). Like targets.py this module needs httpx.
+"""
+import socket
+
+import httpcore
+import httpx
+
+class WireCounter:
+    """Running totals of bytes sent and received.
+
+    take() returns the bytes moved since the previous take(), which lets a
+    caller attribute traffic to the request that just finished without
+    resetting the totals.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.bytes_sent = self.bytes_received = 0
+        self._taken_sent = self._taken_received = 0
+
+    def take(self):
+        """(bytes sent, bytes received) since the last take() or reset()."""
+        sent = self.bytes_sent - self._taken_sent
+        received = self.bytes_received - self._taken_received
+        self._taken_sent, self._taken_received = self.bytes_sent, self.bytes_received
+        return sent, received
+
+    def add(self, other):
+        self.bytes_sent += other.bytes_sent
+        self.bytes_received += other.bytes_received
+        return self
+
+    def count_sent(self, size, shared=None):
+        self.bytes_sent += size
+        if shared is not None:
+            shared.bytes_sent += size
+
+    def count_received(self, size, shared=None):
+        self.bytes_received += size
+        if shared is not None:
+            shared.bytes_received += size
+
+class _CountingNetworkStream(httpcore.AsyncNetworkStream):
+    """httpcore stream that counts into its own `wire` and an optional shared counter."""
+
+    def __init__(self, stream, shared):
+        self._stream = stream
+        self._shared = shared
+        self.wire = WireCounter()
+
+    async def read(self, max_bytes, timeout=None):
+        data = await self._stream.read(max_bytes, timeout)
+        self.wire.count_received(len(data), self._shared)
+        return data
+
+    async def write(self, buffer, timeout=None):
+        self.wire.count_sent(len(buffer), self._shared)
+        await self._stream.write(buffer, timeout)
+
+    async def aclose(self):
+        await self._stream.aclose()
+
+    async def start_tls(self, ssl_context, server_hostname=None, timeout=None):
+        # Counts above TLS are the HTTP bytes; record overhead is not included
+        stream = await self._stream.start_tls(ssl_context, server_hostname=server_hostname, timeout=timeout)
+        return _CountingNetworkStream(stream, self._shared)
+
+    def get_extra_info(self, info):
+        return self._stream.get_extra_info(info)
+
+class _CountingBackend(httpcore.AsyncNetworkBackend):
+    def __init__(self, backend, shared):
+        self._backend = backend
+        self._shared = shared
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        stream = await self._backend.connect_tcp(host, port, timeout=timeout, local_address=local_address,
+                                                 socket_options=socket_options)
+        return _CountingNetworkStream(stream, self._shared)
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        stream = await self._backend.connect_unix_socket(path, timeout=timeout, socket_options=socket_options)
+        return _CountingNetworkStream(stream, self._shared)
+
+    async def sleep(self, seconds):
+        await self._backend.sleep(seconds)
+
+def counting_transport(wire=None, **transport_kwargs):
+    """httpx.AsyncHTTPTransport whose connections count their bytes (also into `wire`, if given).
+
+    Pass the result as `transport=` to httpx.AsyncClient; pool limits must
+    then be given here rather than to the client.
+    """
+    transport = httpx.AsyncHTTPTransport(**transport_kwargs)
+    # httpx has no public hook for the network backend, so wrap the pool's
+    pool = transport._pool
+    pool._network_backend = _CountingBackend(pool._network_backend, wire)
+    return transport
+
+def response_wire_bytes(response):
+    """(bytes sent, bytes received) for an httpx response read through counting_transport().
+
+    HTTP/1.1 connections carry one exchange at a time, so the connection's
+    traffic since its previous response is exactly this request and response.
+    Must be called before yielding to the event loop once the response is read,
+    while no other request can have picked up the connection.
+    """
+    stream = response.extensions.get("network_stream")
+    if not isinstance(stream, _CountingNetworkStream):
+        return 0, 0
+    return stream.wire.take()
+
+class CountingSocket:
+    """Socket wrapper that counts bytes sent and received into `wire`.
+
+    Everything http.client does with a socket (sendall, makefile, recv_into,
+    close, options) goes through here or is delegated, so buffered reads made
+    via makefile() are counted as they come off the socket.
+    """
+
+    def __init__(self, sock, wire):
+        self._sock = sock
+        self.wire = wire
+
+    def sendall(self, data, *flags):
+        self.wire.bytes_sent += len(data)
+        return self._sock.sendall(data, *flags)
+
+    def send(self, data, *flags):
+        sent = self._sock.send(data, *flags)
+        self.wire.bytes_sent += sent
+        return sent
+
+    def recv(self, size, *flags):
+        data = self._sock.recv(size, *flags)
+        self.wire.bytes_received += len(data)
+        return data
+
+    def recv_into(self, buffer, *args):
+        received = self._sock.recv_into(buffer, *args)
+        self.wire.bytes_received += received
+        return received
+
+    def makefile(self, mode="r", buffering=None, **kwargs):
+        # socket.makefile reads through its first argument's recv_into, i.e. this wrapper
+        self._io_refs = 0
+        return socket.socket.makefile(self, mode, buffering, **kwargs)
+
+    def _decref_socketios(self):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self._sock, name)
@@ -0,0 +1,27 @@
+"""Multi-process load generation.
+
+One Python process tops out well before the servers do once JSON decoding and
+result bookkeeping sit on the client hot path. These helpers split a run's
+virtual users and request budget across worker processes and hand back each
+worker's results for the caller to merge into a single run directory.
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+def split_evenly(total, parts):
+    """Split `total` into `parts` integers that differ by at most one."""
+    return [total // parts + (1 if i < total % parts else 0) for i in range(parts)]
+
+def run_in_processes(func, args_per_worker):
+    """Call `func(*args)` in one process per entry and return the results in order.
+
+    `func` must be a module-level function so it can be pickled. A single entry
+    runs inline to keep the default single-process path free of pool overhead.
+    """
+    if len(args_per_worker) == 1:
+        return [func(*args_per_worker[0])]
+    # spawn rather than fork: the MCP client calls this from inside a running event loop
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=len(args_per_worker), mp_context=context) as pool:
+        futures = [pool.submit(func, *args) for args in args_per_worker]
+        return [future.result() for future in futures]
@@ -0,0 +1,113 @@
+import asyncio
+import os
+import sys
+import csv
+import time
+from collections import Counter
+from contextlib import AsyncExitStack
+from itertools import cycle
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from harness.catalog import new_run_dir, record_results, record_run, settings
+from harness.interleave import interleaved_order
+from harness.queries import load_queries
+from harness.sink import ResultSink, histogram_path
+from harness.targets import PROTOCOLS, open_targets
+from harness.tracing import TraceContext
+
+REST_SERVER_URL = os.getenv("REST_SERVER_URL", "http://149.165.175.102:5002")
+GET_MODELCARD_PATH = os.getenv("GET_MODELCARD_PATH", "/modelcard/{mc_id}")
+SEARCH_MODELCARDS_PATH = os.getenv("SEARCH_MODELCARDS_PATH", "/modelcards/search")
+SEARCH_PARAM = os.getenv("SEARCH_PARAM", "q")
+NATIVE_MCP_URL = os.getenv("NATIVE_MCP_URL", "http://149.165.175.102:8050/sse")
+LAYERED_MCP_URL = os.getenv("LAYERED_MCP_URL", "http://149.165.175.102:8051/sse")
+BENCHMARK_RESULTS_DIR = os.getenv("BENCHMARK_RESULTS_DIR", "/app/benchmark_results")
+RESULTS_BUFFER_ROWS = int(os.getenv("RESULTS_BUFFER_ROWS", "0")) or None
+# Rounds per operation; every round sends one request to each protocol
+BENCHMARK_RUNS = int(os.getenv("BENCHMARK_RUNS", "100"))
+OPERATIONS = os.getenv("OPERATIONS", "get_modelcard,search_modelcards").split(",")
+INTERLEAVE_PROTOCOLS = os.getenv("PROTOCOLS", ",".join(PROTOCOLS)).split(",")
+# "abba" alternates forward and reversed protocol order, "random" shuffles each round
+INTERLEAVE_DESIGN = os.getenv("INTERLEAVE_DESIGN", "abba")
+INTERLEAVE_SEED = os.getenv("INTERLEAVE_SEED")
+MODELCARD_ID = os.getenv("MODELCARD_ID", "megadetector-mc")
+# Send a traceparent with every request so server span logs can be joined to
+# the rows by sequence (see analysis/trace_breakdown.py)
+TRACE_CONTEXT = os.getenv("TRACE_CONTEXT", "0") == "1"
+SEARCH_QUERIES = load_queries(os.getenv("SEARCH_QUERIES_FILE"), os.getenv("SEARCH_QUERY", "megadetector"))
+
+# sequence is the request's position in the interleaved run, shared across protocols
+CSV_HEADERS = ['sequence', 'round', 'response_time_ms', 'response_size_kb']
+SUMMARY_HEADERS = ['protocol', 'operation', 'requests', 'errors', 'mean_ms', 'p50_ms', 'p99_ms', 'trace_prefix']
+
+def write_summary(summary_file, sinks, errors, trace_prefixes):
+    """Write per (protocol, operation) counts, latency percentiles and trace id prefixes"""
+    with open(summary_file, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(SUMMARY_HEADERS)
+        for key in sorted(set(sinks) | set(errors)):
+            summary = sinks[key].histogram.summary_ms(percentiles=(50, 99))
+            writer.writerow([*key, summary['count'], errors[key], summary['mean_ms'], summary['p50_ms'], summary['p99_ms'],
+                             trace_prefixes.get(key[1], "")])
+            print(f"{key[0]} {key[1]}: {summary['count']} ok, {errors[key]} errors, "
+                  f"p50={summary['p50_ms']:.2f}ms, p99={summary['p99_ms']:.2f}ms")
+
+async def run_interleaved(run_dir):
+    """Send each operation to every protocol in interleaved rounds, writing one CSV per (protocol, operation)"""
+    urls = {"rest": REST_SERVER_URL, "native": NATIVE_MCP_URL, "layered": LAYERED_MCP_URL}
+    seed = int(INTERLEAVE_SEED) if INTERLEAVE_SEED is not None else None
+    sinks = {}
+    errors = Counter()
+    trace_prefixes = {}
+
+    async with AsyncExitStack() as stack:
+        targets = await open_targets(stack, *(urls[p] if p in INTERLEAVE_PROTOCOLS else None for p in PROTOCOLS),
+                                     get_path=GET_MODELCARD_PATH, search_path=SEARCH_MODELCARDS_PATH,
+                                     search_param=SEARCH_PARAM)
+        for operation in OPERATIONS:
+            arguments = SEARCH_QUERIES if operation == "search_modelcards" else [MODELCARD_ID]
+            # Sequences restart per operation, so each operation gets its own trace id prefix
+            trace = TraceContext() if TRACE_CONTEXT else None
+            metadata = {'client': 'interleave', 'operation': operation, 'design': INTERLEAVE_DESIGN}
+            if trace is not None:
+                trace_prefixes[operation] = metadata['trace_prefix'] = trace.prefix
+            for protocol in INTERLEAVE_PROTOCOLS:
+                sinks[protocol, operation] = ResultSink(run_dir / f"{protocol}_{operation}.csv", CSV_HEADERS,
+                                                        capacity=BENCHMARK_RUNS, buffer_rows=RESULTS_BUFFER_ROWS,
+                                                        metadata={**metadata, 'protocol': protocol})
+                # Warm-up call keeps connection setup out of the first round
+                await targets[protocol](operation, arguments[0])
+
+            print(f"Running {BENCHMARK_RUNS} interleaved {operation} rounds ({INTERLEAVE_DESIGN}) "
+                  f"across {', '.join(INTERLEAVE_PROTOCOLS)}...")
+            # Every protocol gets the same argument within a round
+            round_arguments = cycle(arguments)
+            argument = None
+            for sequence, (round_index, protocol) in enumerate(
+                    interleaved_order(INTERLEAVE_PROTOCOLS, BENCHMARK_RUNS, INTERLEAVE_DESIGN, seed)):
+                if sequence % len(INTERLEAVE_PROTOCOLS) == 0:
+                    argument = next(round_arguments)
+                traceparent = trace.traceparent(sequence) if trace is not None else None
+                start = time.perf_counter()
+                try:
+                    size_kb = await targets[protocol](operation, argument, traceparent)
+                except Exception:
+                    errors[protocol, operation] += 1
+                    continue
+                response_time_ms = (time.perf_counter() - start) * 1000
+                sinks[protocol, operation].record(sequence, round_index, response_time_ms, size_kb)
+
+    for sink in sinks.values():
+        sink.close()
+        sink.histogram.save(histogram_path(sink.path))
+        record_results(sink.path, sink.histogram, "interleave")
+    write_summary(run_dir / "interleaved_summary.csv", sinks, errors, trace_prefixes)
+
+def main():
+    run_dir = new_run_dir(BENCHMARK_RESULTS_DIR)
+    record_run(BENCHMARK_RESULTS_DIR, run_dir, "interleave", settings(globals()))
+    asyncio.run(run_interleaved(run_dir))
+
+if __name__ == "__main__":
+    main()
@@ -1,77 +1,553 @@
 import asyncio
 import os
+import sys
 import time
+from itertools import count, cycle
 from pathlib import Path
-from datetime import datetime
 import csv
+from contextlib import AsyncExitStack, asynccontextmanager
 from mcp import ClientSession
-from mcp.client.sse import sse_client
 
-CSV_HEADERS = ['response_time_ms', 'response_size_kb']
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from harness.arrivals import run_open_loop
+from harness.catalog import new_run_dir, record_results, record_run
+from harness.queries import load_queries
+from harness.hdr import HdrHistogram
+from harness.sink import ResultSink, histogram_path, merge_parts, part_path
+from harness.targets import call_tool
+from harness.tracing import TraceContext
+from harness.transports import mcp_streams
+from harness.wire import WireCounter
+from harness.workers import run_in_processes, split_evenly
 
-def write_latency_row(csv_file, response_time_ms, response_size_kb):
-    """Write latency row with response time and size"""
-    with open(csv_file, "a", newline="") as f:
+# response_size_kb is the session's wire bytes received since the previous call
+# completed: exactly the call's own bytes when one call is in flight, and with
+# several in flight the rows still add up to the session's total. sequence
+# numbers the measured calls across workers, sessions and pipeline depths
+CSV_HEADERS = ['sequence', 'response_time_ms', 'response_size_kb']
+# In open-loop mode response_time_ms is measured from the intended send time
+OPEN_LOOP_HEADERS = CSV_HEADERS + ['service_time_ms']
+# In pool mode each row also records which session issued the call, in
+# pipeline mode how many calls were kept in flight
+POOL_HEADERS = CSV_HEADERS + ['session']
+PIPELINE_HEADERS = CSV_HEADERS + ['depth']
+# One row per fresh session, timing each step of its life separately
+SETUP_PHASES = ['connect_ms', 'initialize_ms', 'list_tools_ms', 'first_call_ms', 'close_ms']
+SETUP_HEADERS = SETUP_PHASES + ['total_ms']
+# bytes_sent/bytes_received cover the measured calls on the wire (see harness.transports)
+SUMMARY_HEADERS = ['client_mode', 'transport', 'workers', 'requests', 'duration_s', 'throughput_rps',
+                   'bytes_sent', 'bytes_received']
+BREAKDOWN_HEADERS = ['requests', 'duration_s', 'throughput_rps', 'mean_ms', 'p50_ms', 'p99_ms', 'max_ms']
+TRANSPORT_HEADERS = ['transport', 'requests', 'throughput_rps', 'p50_ms', 'p99_ms',
+                     'bytes_sent_per_call', 'bytes_received_per_call']
+
+# Where each transport is served, relative to a server's base URL
+TRANSPORT_PATHS = {
+    "sse": os.getenv("SSE_PATH", "/sse"),
+    "streamable_http": os.getenv("STREAMABLE_HTTP_PATH", "/mcp"),
+    "websocket": os.getenv("WEBSOCKET_PATH", "/ws"),
+}
+# Command that starts the local server for the stdio transport
+STDIO_SERVER_COMMAND = os.getenv(
+    "STDIO_SERVER_COMMAND",
+    f"{sys.executable} {Path(__file__).resolve().parent.parent / 'standins' / 'mcp_server.py'}")
+# Set for the stdio server, which otherwise only gets mcp's default environment;
+# no simulated database time by default, so stdio measures the protocol floor
+STDIO_SERVER_ENV = {
+    "GET_SERVICE_TIME_MS": os.getenv("STDIO_GET_SERVICE_TIME_MS", "0"),
+    "SEARCH_SERVICE_TIME_MS": os.getenv("STDIO_SEARCH_SERVICE_TIME_MS", "0"),
+}
+
+def write_summary(summary_file, client_mode, transport, workers, requests_count, duration_s, wire):
+    """Write run-level throughput summary"""
+    throughput_rps = requests_count / duration_s if duration_s > 0 else 0.0
+    with open(summary_file, "w", newline="") as f:
         writer = csv.writer(f)
-        writer.writerow([response_time_ms, response_size_kb])
-
-def init_csv_file(csv_file):
-    """Initialize CSV file with headers"""
-    with open(csv_file, "w", newline="") as f:
-        csv.writer(f).writerow(CSV_HEADERS)
-
-async def run_benchmark(server_url, client_type, runs, modelcard_id, benchmark_results_dir):
-    """Run benchmark for a specific server"""
-    # Setup output directory with date and client type
-    today = datetime.now().strftime('%Y_%m_%d')
-    run_dir = Path(benchmark_results_dir) / f"run_{today}" / client_type
-    run_dir.mkdir(parents=True, exist_ok=True)
-    
-    get_modelcard_file = run_dir / "get_modelcard.csv"
-    init_csv_file(get_modelcard_file)
-    
-    print(f"\n=== Testing {client_type.upper()} MCP Server ===")
-    print(f"Server URL: {server_url}")
-    
-    async with sse_client(server_url) as (read_stream, write_stream):
+        writer.writerow(SUMMARY_HEADERS)
+        writer.writerow([client_mode, transport, workers, requests_count, duration_s, throughput_rps,
+                         wire.bytes_sent, wire.bytes_received])
+    # In session_setup mode each request is a whole session, so throughput is sessions/s
+    unit = "sessions" if client_mode == "session_setup" else "calls"
+    print(f"{requests_count} {unit} in {duration_s:.2f}s ({throughput_rps:.1f} {unit}/s, workers={workers}, "
+          f"{wire.bytes_sent} B sent, {wire.bytes_received} B received)")
+
+def write_transport_comparison(comparison_file, results_by_transport):
+    """Write throughput, latency and bytes per call side by side for each transport"""
+    with open(comparison_file, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(TRANSPORT_HEADERS)
+        for transport, (count, duration_s, histogram, wire) in results_by_transport.items():
+            summary = histogram.summary_ms(percentiles=(50, 99))
+            writer.writerow([transport, count, count / duration_s if duration_s > 0 else 0.0,
+                             summary['p50_ms'], summary['p99_ms'],
+                             wire.bytes_sent / count if count else 0.0,
+                             wire.bytes_received / count if count else 0.0])
+
+def write_breakdown(breakdown_file, key_header, stats):
+    """Write request counts, throughput and latency percentiles per (key, duration_s, histogram)"""
+    with open(breakdown_file, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([key_header] + BREAKDOWN_HEADERS)
+        for key, duration_s, histogram in stats:
+            summary = histogram.summary_ms(percentiles=(50, 99))
+            throughput_rps = histogram.total_count / duration_s if duration_s > 0 else 0.0
+            writer.writerow([key, histogram.total_count, duration_s, throughput_rps,
+                             summary['mean_ms'], summary['p50_ms'], summary['p99_ms'], summary['max_ms']])
+
+def transport_url(base_url, transport):
+    """Endpoint URL for `transport` on a server at `base_url`"""
+    if transport == "stdio":
+        return base_url
+    if transport == "websocket":
+        base_url = "ws" + base_url[len("http"):]
+    return base_url + TRANSPORT_PATHS[transport]
+
+@asynccontextmanager
+async def open_session(server_url, transport="sse", wire=None):
+    """Open and initialize an MCP session over `transport`, counting its traffic into `wire`"""
+    async with mcp_streams(server_url, transport, wire, STDIO_SERVER_ENV) as (read_stream, write_stream):
         async with ClientSession(read_stream, write_stream) as session:
             await session.initialize()
+            yield session
+
+def traceparent_for(trace, sequence):
+    """traceparent for a measured call, or None when tracing is off"""
+    return trace.traceparent(sequence) if trace is not None else None
+
+def operation_arguments(operation, modelcard_id, search_queries):
+    """Tool arguments for an operation; callers cycle through them in order"""
+    if operation == "search_modelcards":
+        return [{"query": query} for query in search_queries]
+    return [{"mc_id": modelcard_id}]
+
+async def run_open_loop_calls(session, tool, arguments_list, runs, arrival, sink, wire, first_sequence=0,
+                              trace=None):
+    """Issue `runs` tool calls on the arrival schedule without awaiting each one.
+
+    Records (sequence, latency_ms, response_size_kb, service_time_ms) rows
+    into `sink`, numbering calls in send order from `first_sequence`.
+    """
+    next_arguments = cycle(arguments_list).__next__
+    sequences = count(first_sequence)
+
+    async def call():
+        sequence = next(sequences)
+        await call_tool(session, tool, next_arguments(), traceparent_for(trace, sequence))
+        return sequence
+
+    def on_complete(latency_ms, service_ms, sequence):
+        sink.record(sequence, latency_ms, wire.take()[1] / 1024, service_ms)
+
+    await run_open_loop(call, runs, arrival["rate"], on_complete, arrival["distribution"], arrival["seed"])
+
+async def run_in_flight_calls(session, tool, arguments_list, runs, in_flight, wire, on_complete, first_sequence=0,
+                              trace=None):
+    """Issue `runs` tool calls on one session, keeping up to `in_flight` outstanding.
+
+    Calls are numbered from `first_sequence` and each completion is reported
+    as `on_complete(sequence, response_time_ms, response_size_kb)`.
+    """
+    remaining = iter(range(first_sequence, first_sequence + runs))
+    next_arguments = cycle(arguments_list).__next__
+
+    async def lane():
+        # Lanes share `remaining`, so a lane that finishes early picks up more calls
+        for sequence in remaining:
+            start = time.perf_counter()
+            await call_tool(session, tool, next_arguments(), traceparent_for(trace, sequence))
+            response_time_ms = (time.perf_counter() - start) * 1000
+            on_complete(sequence, response_time_ms, wire.take()[1] / 1024)
+
+    await asyncio.gather(*(lane() for _ in range(min(in_flight, runs))))
+
+async def measure_pool(server_url, tool, arguments_list, runs, pool, sink, wire, transport="sse", trace=None):
+    """Open `pool["sessions"]` MCP sessions and split `runs` calls across them.
+
+    Every session connects and makes a warm-up call before any measured call
+    is sent, then keeps `pool["in_flight"]` calls outstanding. Rows go into
+    `sink` tagged with the session index. Returns (measured wall time in
+    seconds, list of (session, session wall time, session latency histogram));
+    each session's measured traffic is added to `wire`.
+    """
+    sessions = pool["sessions"]
+    ready = asyncio.Barrier(sessions + 1)
+    session_stats = [None] * sessions
+
+    async def run_session(index, session_runs, first_sequence):
+        try:
+            session_wire = WireCounter()
+            async with open_session(server_url, transport, session_wire) as session:
+                await session.call_tool(tool, arguments=arguments_list[0])
+                await ready.wait()
+                session_wire.reset()
+                histogram = HdrHistogram()
+
+                def on_complete(sequence, response_time_ms, response_size_kb):
+                    sink.record(sequence, response_time_ms, response_size_kb, index)
+                    histogram.record_ms(response_time_ms)
 
-            print(f"Running {runs + 1} get_modelcard calls (warm-up + {runs} measured)...")
-            for i in range(runs + 1):
                 start = time.perf_counter()
-                result = await session.call_tool("get_modelcard", arguments={"mc_id": modelcard_id})
-                end = time.perf_counter()
-                
-                response_time_ms = (end - start) * 1000
-                response_str = str(result)
-                response_size_bytes = len(response_str.encode('utf-8'))
-                response_size_kb = response_size_bytes / 1024
-                
-                # Only write to CSV after the first request (skip index 0)
-                if i > 0:
-                    write_latency_row(get_modelcard_file, response_time_ms, response_size_kb)
-                    print(f"get_modelcard {i}/{runs}: {response_time_ms:.2f}ms, {response_size_kb:.2f}KB")
-                else:
-                    print(f"Warm-up call: {response_time_ms:.2f}ms, {response_size_kb:.2f}KB")
+                await run_in_flight_calls(session, tool, arguments_list, session_runs,
+                                          pool["in_flight"], session_wire, on_complete, first_sequence, trace)
+                session_stats[index] = (index, time.perf_counter() - start, histogram)
+                wire.add(session_wire)
+        except Exception:
+            # Release the other sessions instead of leaving them waiting at the barrier
+            await ready.abort()
+            raise
+
+    print(f"Opening {sessions} sessions with {pool['in_flight']} in-flight {tool} calls each...")
+    runs_per_session = split_evenly(runs, sessions)
+    tasks = [asyncio.create_task(run_session(index, session_runs, sum(runs_per_session[:index])))
+             for index, session_runs in enumerate(runs_per_session)]
+    try:
+        await ready.wait()
+    except asyncio.BrokenBarrierError:
+        # Surface the session's own error rather than the broken barrier
+        await asyncio.gather(*tasks)
+        raise
+    measured_start = time.perf_counter()
+    await asyncio.gather(*tasks)
+    return time.perf_counter() - measured_start, session_stats
+
+async def time_session_setup(server_url, tool, arguments, transport="sse", wire=None):
+    """Open one fresh session, call list_tools and `tool` once, and close it.
+
+    Returns the SETUP_HEADERS timings in milliseconds.
+    """
+    start = time.perf_counter()
+    async with AsyncExitStack() as stack:
+        read_stream, write_stream = await stack.enter_async_context(
+            mcp_streams(server_url, transport, wire, STDIO_SERVER_ENV))
+        connected = time.perf_counter()
+        session = await stack.enter_async_context(ClientSession(read_stream, write_stream))
+        await session.initialize()
+        initialized = time.perf_counter()
+        await session.list_tools()
+        listed = time.perf_counter()
+        await session.call_tool(tool, arguments=arguments)
+        called = time.perf_counter()
+    closed = time.perf_counter()
+    return ((connected - start) * 1000, (initialized - connected) * 1000, (listed - initialized) * 1000,
+            (called - listed) * 1000, (closed - called) * 1000, (closed - start) * 1000)
+
+async def measure_session_setup(server_url, tool, arguments_list, runs, concurrency, sink,
+                                wire, transport="sse"):
+    """Open and close `runs` fresh sessions, up to `concurrency` at a time.
+
+    Rows of per-step timings go into `sink` and every session's traffic,
+    handshake included, into `wire`. Returns (wall time in seconds,
+    list of (step, wall time, step latency histogram)).
+    """
+    histograms = [HdrHistogram() for _ in SETUP_HEADERS]
+    remaining = iter(range(runs))
+    next_arguments = cycle(arguments_list).__next__
+
+    async def lane():
+        for _ in remaining:
+            timings = await time_session_setup(server_url, tool, next_arguments(), transport, wire)
+            sink.record(*timings)
+            for histogram, timing_ms in zip(histograms, timings):
+                histogram.record_ms(timing_ms)
+
+    print(f"Opening {runs} fresh sessions, {concurrency} at a time...")
+    start = time.perf_counter()
+    await asyncio.gather(*(lane() for _ in range(min(concurrency, runs))))
+    duration_s = time.perf_counter() - start
+    return duration_s, [(step[:-len("_ms")], duration_s, histogram)
+                        for step, histogram in zip(SETUP_HEADERS, histograms)]
+
+async def measure_pipeline(server_url, tool, arguments_list, runs, depths, sink, wire, transport="sse", trace=None):
+    """Run `runs` calls on a single MCP session at each pipeline depth in `depths`.
+
+    At depth K the session keeps K calls outstanding, so depth 1 matches sync
+    mode. Rows go into `sink` tagged with the depth. Returns (measured wall
+    time in seconds, list of (depth, wall time, latency histogram)).
+    """
+    depth_stats = []
+    async with open_session(server_url, transport, wire) as session:
+        await session.call_tool(tool, arguments=arguments_list[0])
+        wire.reset()
+        measured_start = time.perf_counter()
+        for depth_index, depth in enumerate(depths):
+            histogram = HdrHistogram()
+
+            def on_complete(sequence, response_time_ms, response_size_kb):
+                sink.record(sequence, response_time_ms, response_size_kb, depth)
+                histogram.record_ms(response_time_ms)
+
+            start = time.perf_counter()
+            await run_in_flight_calls(session, tool, arguments_list, runs, depth, wire, on_complete,
+                                      depth_index * runs, trace)
+            duration_s = time.perf_counter() - start
+            depth_stats.append((depth, duration_s, histogram))
+            summary = histogram.summary_ms(percentiles=(50, 99))
+            print(f"depth {depth}: {runs / duration_s if duration_s > 0 else 0.0:.1f} calls/s, "
+                  f"p50={summary['p50_ms']:.2f}ms, p99={summary['p99_ms']:.2f}ms")
+        return time.perf_counter() - measured_start, depth_stats
+
+async def measure_calls(server_url, tool, arguments_list, runs, sink, wire, arrival=None, transport="sse",
+                        first_sequence=0, trace=None):
+    """Open one MCP session and run `runs` measured `tool` calls after a warm-up.
+
+    Records latency rows into `sink` and returns the measured wall time in
+    seconds. `wire` is reset after the warm-up so it only counts the
+    measured calls. Measured calls are numbered from `first_sequence` and,
+    with `trace`, carry a traceparent in their _meta.
+    """
+    async with open_session(server_url, transport, wire) as session:
+        if arrival:
+            await session.call_tool(tool, arguments=arguments_list[0])
+            wire.reset()
+            print(f"Running {runs} open-loop {tool} calls at {arrival['rate']} req/s "
+                  f"({arrival['distribution']})...")
+            measured_start = time.perf_counter()
+            await run_open_loop_calls(session, tool, arguments_list, runs, arrival, sink, wire, first_sequence, trace)
+            return time.perf_counter() - measured_start
+
+        print(f"Running {runs + 1} {tool} calls (warm-up + {runs} measured)...")
+        for i, arguments in zip(range(runs + 1), cycle(arguments_list)):
+            # Start the wall clock after the warm-up call
+            if i == 1:
+                wire.reset()
+                measured_start = time.perf_counter()
+            sequence = first_sequence + i - 1
+            traceparent = traceparent_for(trace, sequence) if i > 0 else None
+            start = time.perf_counter()
+            await call_tool(session, tool, arguments, traceparent)
+            end = time.perf_counter()
+            
+            response_time_ms = (end - start) * 1000
+            response_size_kb = wire.take()[1] / 1024
+            
+            # Only record after the first request (skip index 0)
+            if i > 0:
+                sink.record(sequence, response_time_ms, response_size_kb)
+                print(f"{tool} {i}/{runs}: {response_time_ms:.2f}ms, {response_size_kb:.2f}KB")
+            else:
+                print(f"Warm-up call: {response_time_ms:.2f}ms, {response_size_kb:.2f}KB")
+        return time.perf_counter() - measured_start if runs > 0 else 0.0
+
+def measure_worker(server_url, tool, arguments_list, runs, arrival, results_file, headers, buffer_rows, transport,
+                   metadata=None, first_sequence=0, trace_prefix=None):
+    """Process-pool entry point: run measure_calls on a fresh event loop into `results_file`.
+
+    Returns (rows recorded, measured wall time in seconds, encoded latency
+    histogram, wire byte totals).
+    """
+    wire = WireCounter()
+    with ResultSink(results_file, headers, capacity=runs, buffer_rows=buffer_rows, metadata=metadata) as sink:
+        trace = TraceContext(trace_prefix) if trace_prefix else None
+        duration_s = asyncio.run(measure_calls(server_url, tool, arguments_list, runs, sink, wire, arrival,
+                                               transport, first_sequence, trace))
+    return sink.count, duration_s, sink.histogram.encode(), wire
+
+async def run_benchmark(server_url, client_type, operation, arguments_list, runs, benchmark_results_dir,
+                        arrival=None, workers=1, buffer_rows=None, pool=None, depths=None,
+                        transport="sse", suffix="", setup=None, trace_context=False):
+    """Run one operation's benchmark against a specific server.
+
+    `operation` names both the MCP tool and the results file, and each call
+    takes the next entry of `arguments_list`.
+
+    When `arrival` is given ({"rate", "distribution", "seed"}) the measured calls
+    are sent open-loop instead of one after another. With `workers` > 1 the
+    calls and arrival rate are split across that many processes, each holding
+    its own session, and their rows are merged into one file. `buffer_rows`
+    bounds the rows each process holds in memory (see ResultSink).
+
+    When `pool` is given ({"sessions", "in_flight"}) the calls are instead
+    spread over that many concurrent sessions in this process, and per-session
+    latency is written to `<operation>_sessions.csv`. When `depths` is given
+    the calls are repeated on one session at each pipeline depth, with
+    per-depth results in `<operation>_pipeline.csv`. When `setup` is given
+    ({"concurrency"}) every row is a fresh session instead, timed step by
+    step, with per-step percentiles in `<operation>_setup.csv` and the run
+    summary counting sessions rather than calls. These three modes run in
+    this process, so they raise ValueError for `workers` > 1.
+
+    Sessions run over `transport`, and `suffix` is appended to every file
+    name so several transports can share a directory. With `trace_context`
+    every measured call carries a traceparent in its _meta, under a trace id
+    prefix stored in the results' metadata (not in session setup mode, where
+    rows are sessions rather than calls). Returns (calls recorded, measured
+    wall time, latency histogram, wire byte totals).
+    """
+    if workers > 1 and (setup or depths or pool):
+        raise ValueError(f"WORKERS={workers} is only supported in the sync and open_loop client modes")
+    # Setup output directory with run id and client type
+    run_dir = new_run_dir(benchmark_results_dir) / client_type
+    run_dir.mkdir(exist_ok=True)
+    
+    results_file = run_dir / f"{operation}{suffix}.csv"
+    wire = WireCounter()
+    if setup:
+        headers, client_mode = SETUP_HEADERS, "session_setup"
+    elif depths:
+        headers, client_mode = PIPELINE_HEADERS, "pipeline"
+    elif pool:
+        headers, client_mode = POOL_HEADERS, "pool"
+    elif arrival:
+        headers, client_mode = OPEN_LOOP_HEADERS, "open_loop"
+    else:
+        headers, client_mode = CSV_HEADERS, "sync"
+    # Stored with the columnar results (see harness.schema)
+    metadata = {'client': 'mcp', 'protocol': client_type, 'operation': operation, 'client_mode': client_mode,
+                'transport': transport, 'server_url': server_url}
+    trace = TraceContext() if trace_context and not setup else None
+    if trace is not None:
+        metadata['trace_prefix'] = trace.prefix
+    
+    print(f"\n=== Testing {client_type.upper()} MCP Server: {operation} ===")
+    print(f"Server URL: {server_url} ({transport})")
+    if trace is not None:
+        print(f"Trace id prefix: {trace.prefix}")
+    
+    if setup:
+        with ResultSink(results_file, headers, capacity=runs, buffer_rows=buffer_rows,
+                        latency_column='total_ms', metadata=metadata) as sink:
+            duration_s, step_stats = await measure_session_setup(server_url, operation, arguments_list, runs,
+                                                                 setup["concurrency"], sink, wire, transport)
+        count = sink.count
+        histogram = sink.histogram
+        write_breakdown(run_dir / f"{operation}{suffix}_setup.csv", "step", step_stats)
+    elif depths:
+        with ResultSink(results_file, headers, capacity=runs * len(depths), buffer_rows=buffer_rows,
+                        metadata=metadata) as sink:
+            duration_s, depth_stats = await measure_pipeline(server_url, operation, arguments_list, runs,
+                                                             depths, sink, wire, transport, trace)
+        count = sink.count
+        histogram = sink.histogram
+        write_breakdown(run_dir / f"{operation}{suffix}_pipeline.csv", "depth", depth_stats)
+    elif pool:
+        with ResultSink(results_file, headers, capacity=runs, buffer_rows=buffer_rows, metadata=metadata) as sink:
+            duration_s, session_stats = await measure_pool(server_url, operation, arguments_list, runs, pool, sink,
+                                                           wire, transport, trace)
+        count = sink.count
+        histogram = sink.histogram
+        write_breakdown(run_dir / f"{operation}{suffix}_sessions.csv", "session", session_stats)
+    elif workers == 1:
+        with ResultSink(results_file, headers, capacity=runs, buffer_rows=buffer_rows, metadata=metadata) as sink:
+            duration_s = await measure_calls(server_url, operation, arguments_list, runs, sink, wire, arrival,
+                                             transport, trace=trace)
+        count = sink.count
+        histogram = sink.histogram
+    else:
+        # Each worker writes its own part file, merged below
+        worker_args = []
+        runs_per_worker = split_evenly(runs, workers)
+        for worker, worker_runs in enumerate(runs_per_worker):
+            worker_arrival = None
+            if arrival:
+                # Offset the seed so workers do not replay identical Poisson schedules
+                worker_arrival = dict(arrival, rate=arrival["rate"] / workers,
+                                      seed=arrival["seed"] + worker if arrival["seed"] is not None else None)
+            worker_args.append((server_url, operation, arguments_list, worker_runs, worker_arrival,
+                                part_path(results_file, worker), headers, buffer_rows, transport, metadata,
+                                sum(runs_per_worker[:worker]), trace.prefix if trace is not None else None))
+        loop = asyncio.get_running_loop()
+        results = await loop.run_in_executor(None, run_in_processes, measure_worker, worker_args)
+        merge_parts(results_file, [args[5] for args in worker_args])
+        count = sum(result[0] for result in results)
+        # Workers run side by side, so the slowest one bounds the run's wall time
+        duration_s = max(result[1] for result in results)
+        histogram = HdrHistogram()
+        for _, _, encoded, worker_wire in results:
+            histogram.merge(HdrHistogram.decode(encoded))
+            wire.add(worker_wire)
+
+    write_summary(run_dir / f"{operation}{suffix}_summary.csv", client_mode, transport, workers, count,
+                  duration_s, wire)
+    histogram.save(histogram_path(results_file))
+    record_results(results_file, histogram, "mcp")
+    if histogram.total_count:
+        summary = histogram.summary_ms()
+        print(f"p50={summary['p50_ms']:.2f}ms, p99={summary['p99_ms']:.2f}ms, p99.9={summary['p99.9_ms']:.2f}ms")
+    return count, duration_s, histogram, wire
 
 async def main():
     runs = int(os.getenv("BENCHMARK_RUNS", "10"))
     modelcard_id = os.getenv("MODELCARD_ID", "megadetector-mc")
+    # One query per line, cycled through in order; unset means SEARCH_QUERY only
+    search_queries = load_queries(os.getenv("SEARCH_QUERIES_FILE"), os.getenv("SEARCH_QUERY", "megadetector"))
+    operations = os.getenv("OPERATIONS", "get_modelcard,search_modelcards").split(",")
     benchmark_results_dir = os.getenv("BENCHMARK_RESULTS_DIR", "/app/benchmark_results")
+    # "sync" awaits each call before the next, "open_loop" sends at ARRIVAL_RATE req/s,
+    # "pool" runs SESSIONS concurrent sessions with CALLS_IN_FLIGHT outstanding calls each,
+    # "pipeline" repeats BENCHMARK_RUNS calls on one session at each of PIPELINE_DEPTHS,
+    # "session_setup" opens BENCHMARK_RUNS fresh sessions, SETUP_CONCURRENCY at a time
+    client_mode = os.getenv("CLIENT_MODE", "sync")
+    arrival = None
+    pool = None
+    depths = None
+    setup = None
+    if client_mode == "session_setup":
+        setup = {"concurrency": int(os.getenv("SETUP_CONCURRENCY", "1"))}
+    if client_mode == "pipeline":
+        depths = [int(depth) for depth in os.getenv("PIPELINE_DEPTHS", "1,2,4,8,16").split(",")]
+    if client_mode == "pool":
+        pool = {
+            "sessions": int(os.getenv("SESSIONS", "10")),
+            "in_flight": int(os.getenv("CALLS_IN_FLIGHT", "1")),
+        }
+    if client_mode == "open_loop":
+        seed = os.getenv("ARRIVAL_SEED")
+        arrival = {
+            "rate": float(os.getenv("ARRIVAL_RATE", "10")),
+            "distribution": os.getenv("ARRIVAL_DISTRIBUTION", "constant"),
+            "seed": int(seed) if seed is not None else None,
+        }
+    # Worker processes, each with its own MCP session
+    workers = int(os.getenv("WORKERS", "1"))
+    # Rows held in memory per results buffer; unset keeps the whole run in
+    # memory, a value bounds it by flushing full buffers in the background
+    buffer_rows = int(os.getenv("RESULTS_BUFFER_ROWS", "0")) or None
+    # Any of sse, streamable_http, websocket against the remote servers; each
+    # runs the same workload. stdio instead spawns STDIO_SERVER_COMMAND locally
+    # and is reported as its own "stdio" server
+    transports = os.getenv("MCP_TRANSPORTS", "sse").split(",")
+    # Send a traceparent in every measured call's _meta so server span logs can
+    # be joined to the rows by sequence (see analysis/trace_breakdown.py)
+    trace_context = os.getenv("TRACE_CONTEXT", "0") == "1"
+    network_transports = [transport for transport in transports if transport != "stdio"]
     
-    # Test native MCP server first
-    native_server_url = "http://149.165.175.102:8050/sse"
-    await run_benchmark(native_server_url, "native", runs, modelcard_id, benchmark_results_dir)
-    
-    # Test layered MCP server second
-    layered_server_url = "http://149.165.175.102:8051/sse"
-    await run_benchmark(layered_server_url, "layered", runs, modelcard_id, benchmark_results_dir)
+    # Test native MCP server first, then the layered one
+    servers = []
+    if network_transports:
+        servers += [
+            ("native", os.getenv("NATIVE_MCP_BASE_URL", "http://149.165.175.102:8050")),
+            ("layered", os.getenv("LAYERED_MCP_BASE_URL", "http://149.165.175.102:8051")),
+        ]
+    if "stdio" in transports:
+        servers.append(("stdio", STDIO_SERVER_COMMAND))
+    record_run(benchmark_results_dir, new_run_dir(benchmark_results_dir), "mcp", {
+        'BENCHMARK_RUNS': runs, 'MODELCARD_ID': modelcard_id, 'SEARCH_QUERIES': search_queries,
+        'OPERATIONS': operations, 'CLIENT_MODE': client_mode, 'ARRIVAL': arrival, 'POOL': pool,
+        'PIPELINE_DEPTHS': depths, 'SETUP': setup, 'WORKERS': workers, 'RESULTS_BUFFER_ROWS': buffer_rows,
+        'MCP_TRANSPORTS': transports, 'SERVERS': dict(servers), 'STDIO_SERVER_ENV': STDIO_SERVER_ENV,
+        'TRACE_CONTEXT': trace_context,
+    })
+    for client_type, base_url in servers:
+        server_transports = ["stdio"] if client_type == "stdio" else network_transports
+        for operation in operations:
+            arguments_list = operation_arguments(operation, modelcard_id, search_queries)
+            results_by_transport = {}
+            for transport in server_transports:
+                # A single transport keeps the historical file names
+                suffix = f"_{transport}" if len(server_transports) > 1 else ""
+                results_by_transport[transport] = await run_benchmark(
+                    transport_url(base_url, transport), client_type, operation, arguments_list, runs,
+                    benchmark_results_dir, arrival, workers, buffer_rows, pool, depths, transport, suffix, setup,
+                    trace_context)
+            if len(server_transports) > 1:
+                run_dir = new_run_dir(benchmark_results_dir) / client_type
+                write_transport_comparison(run_dir / f"{operation}_transports.csv", results_by_transport)
     
     print("\n=== Benchmark Complete ===")
     print("Results saved to:")
-    print(f"  - Native: {benchmark_results_dir}/run_{datetime.now().strftime('%Y_%m_%d')}/native/get_modelcard.csv")
-    print(f"  - Layered: {benchmark_results_dir}/run_{datetime.now().strftime('%Y_%m_%d')}/layered/get_modelcard.csv")
+    for client_type, _ in servers:
+        for operation in operations:
+            print(f"  - {client_type.capitalize()}: {new_run_dir(benchmark_results_dir)}/{client_type}/{operation}*.csv")
                 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,99 @@
+import asyncio
+import os
+import sys
+import csv
+import time
+from collections import Counter
+from contextlib import AsyncExitStack
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from harness.arrivals import run_schedule
+from harness.catalog import new_run_dir, record_results, record_run, settings
+from harness.replay import read_trace, trace_schedule
+from harness.sink import ResultSink, histogram_path
+from harness.targets import open_targets
+
+TRACE_FILE = os.getenv("TRACE_FILE", "/app/trace.jsonl")
+# 2.0 replays the trace twice as fast as recorded, 0.5 at half speed
+REPLAY_SPEED = float(os.getenv("REPLAY_SPEED", "1.0"))
+REST_SERVER_URL = os.getenv("REST_SERVER_URL", "http://149.165.175.102:5002")
+GET_MODELCARD_PATH = os.getenv("GET_MODELCARD_PATH", "/modelcard/{mc_id}")
+SEARCH_MODELCARDS_PATH = os.getenv("SEARCH_MODELCARDS_PATH", "/modelcards/search")
+SEARCH_PARAM = os.getenv("SEARCH_PARAM", "q")
+NATIVE_MCP_URL = os.getenv("NATIVE_MCP_URL", "http://149.165.175.102:8050/sse")
+LAYERED_MCP_URL = os.getenv("LAYERED_MCP_URL", "http://149.165.175.102:8051/sse")
+BENCHMARK_RESULTS_DIR = os.getenv("BENCHMARK_RESULTS_DIR", "/app/benchmark_results")
+RESULTS_BUFFER_ROWS = int(os.getenv("RESULTS_BUFFER_ROWS", "0")) or None
+
+# response_time_ms is measured from the time the trace says the request was sent
+CSV_HEADERS = ['response_time_ms', 'response_size_kb', 'service_time_ms']
+SUMMARY_HEADERS = ['protocol', 'operation', 'requests', 'errors', 'duration_s', 'throughput_rps']
+
+def write_summary(summary_file, sinks, errors, duration_s):
+    """Write per (protocol, operation) request counts and throughput"""
+    with open(summary_file, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(SUMMARY_HEADERS)
+        for key in sorted(set(sinks) | set(errors)):
+            count = sinks[key].count if key in sinks else 0
+            throughput_rps = count / duration_s if duration_s > 0 else 0.0
+            writer.writerow([*key, count, errors[key], duration_s, throughput_rps])
+            print(f"{key[0]} {key[1]}: {count} ok, {errors[key]} errors, {throughput_rps:.1f} req/s")
+
+async def replay_trace(run_dir):
+    """Replay TRACE_FILE against the REST and MCP endpoints, writing one CSV per (protocol, operation)"""
+    sinks = {}
+    errors = Counter()
+    invalid = Counter()
+
+    def on_invalid(line_number, reason):
+        if not invalid:
+            print(f"Skipping invalid trace line {line_number}: {reason}")
+        invalid[reason] += 1
+
+    async with AsyncExitStack() as stack:
+        # Endpoints are opened up front so connection setup stays out of the replayed timings
+        targets = await open_targets(stack, REST_SERVER_URL, NATIVE_MCP_URL, LAYERED_MCP_URL,
+                                     get_path=GET_MODELCARD_PATH, search_path=SEARCH_MODELCARDS_PATH,
+                                     search_param=SEARCH_PARAM)
+
+        async def call(record):
+            """Send one trace record, returning the response size in KB or None on failure"""
+            try:
+                return await targets[record.protocol](record.operation, record.argument)
+            except Exception:
+                return None
+
+        def on_complete(record, latency_ms, service_ms, size_kb):
+            key = (record.protocol, record.operation)
+            if size_kb is None:
+                errors[key] += 1
+                return
+            if key not in sinks:
+                sinks[key] = ResultSink(run_dir / f"{record.protocol}_{record.operation}.csv", CSV_HEADERS,
+                                        buffer_rows=RESULTS_BUFFER_ROWS,
+                                        metadata={'client': 'replay', 'protocol': record.protocol,
+                                                  'operation': record.operation})
+            sinks[key].record(latency_ms, size_kb, service_ms)
+
+        print(f"Replaying {TRACE_FILE} at {REPLAY_SPEED}x...")
+        start_time = time.perf_counter()
+        await run_schedule(trace_schedule(read_trace(TRACE_FILE, on_invalid), REPLAY_SPEED), call, on_complete)
+        duration_s = time.perf_counter() - start_time
+
+    for sink in sinks.values():
+        sink.close()
+        sink.histogram.save(histogram_path(sink.path))
+        record_results(sink.path, sink.histogram, "replay")
+    if invalid:
+        print(f"Skipped {sum(invalid.values())} invalid trace line(s)")
+    write_summary(run_dir / "replay_summary.csv", sinks, errors, duration_s)
+
+def main():
+    run_dir = new_run_dir(BENCHMARK_RESULTS_DIR)
+    record_run(BENCHMARK_RESULTS_DIR, run_dir, "replay", settings(globals()))
+    asyncio.run(replay_trace(run_dir))
+
+if __name__ == "__main__":
+    main()
@@ -1,51 +1,373 @@
 import os
+import sys
 import csv
+import asyncio
+import httpx
 import requests
 import time
+from itertools import count, cycle
+from urllib.parse import urlencode, urlsplit
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
 from pathlib import Path
-from datetime import datetime
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from harness.arrivals import run_open_loop
+from harness.catalog import new_run_dir, record_results, record_run, settings
+from harness.phases import PHASE_HEADERS, PHASE_UNITS, PhaseTimedClient
+from harness.queries import load_queries
+from harness.hdr import HdrHistogram
+from harness.sink import ResultSink, histogram_path, merge_parts, part_path
+from harness.wire import CountingSocket, WireCounter, counting_transport, response_wire_bytes
+from harness.tracing import TRACE_HEADER, TraceContext
+from harness.workers import run_in_processes, split_evenly
 
 REST_API_BASE_URL = os.getenv("SERVER_URL")
 BENCHMARK_RUNS = int(os.getenv("BENCHMARK_RUNS"))
 MODELCARD_ID = os.getenv("MODELCARD_ID")
 SEARCH_QUERY = os.getenv("SEARCH_QUERY")
 BENCHMARK_RESULTS_DIR = os.getenv("BENCHMARK_RESULTS_DIR")
+GET_MODELCARD_PATH = os.getenv("GET_MODELCARD_PATH", "/modelcard/{mc_id}")
+SEARCH_MODELCARDS_PATH = os.getenv("SEARCH_MODELCARDS_PATH", "/modelcards/search")
+# Query-string parameter carrying the search text
+SEARCH_PARAM = os.getenv("SEARCH_PARAM", "q")
+# One query per line, cycled through in order; unset means SEARCH_QUERY only
+SEARCH_QUERIES_FILE = os.getenv("SEARCH_QUERIES_FILE")
+OPERATIONS = os.getenv("OPERATIONS", "get_modelcard,search_modelcards").split(",")
+
+# "sync" issues one blocking request at a time, "async" drives CONCURRENCY
+# httpx callers from a single event loop, "open_loop" sends at ARRIVAL_RATE
+# req/s regardless of how fast responses come back, "phases" times DNS,
+# connect, TLS, send, first byte and read for each request (seconds)
+CLIENT_MODE = os.getenv("CLIENT_MODE", "sync")
+CONCURRENCY = int(os.getenv("CONCURRENCY", "1"))
+ARRIVAL_RATE = float(os.getenv("ARRIVAL_RATE", "10"))
+ARRIVAL_DISTRIBUTION = os.getenv("ARRIVAL_DISTRIBUTION", "constant")
+ARRIVAL_SEED = os.getenv("ARRIVAL_SEED")
+# "new" opens a fresh connection per request, "pooled" reuses up to POOL_SIZE
+# keep-alive connections, "both" runs the two back to back and reports the
+# connection setup overhead
+CONNECTION_MODE = os.getenv("CONNECTION_MODE", "new")
+POOL_SIZE = int(os.getenv("POOL_SIZE", str(CONCURRENCY)))
+# Worker processes; requests, CONCURRENCY and ARRIVAL_RATE are split across
+# them and POOL_SIZE applies per process
+WORKERS = int(os.getenv("WORKERS", "1"))
+# Rows held in memory per results buffer; unset keeps the whole run in memory
+# and writes it at the end, a value bounds memory for long runs by flushing
+# full buffers from a background thread
+RESULTS_BUFFER_ROWS = int(os.getenv("RESULTS_BUFFER_ROWS", "0")) or None
+# Send a traceparent header with every measured request so server span logs
+# can be joined to the rows by sequence (see analysis/trace_breakdown.py)
+TRACE_CONTEXT = os.getenv("TRACE_CONTEXT", "0") == "1"
+
+# response_size_kb is everything received for the request on the wire: status
+# line, headers, any chunked framing and the body as sent (before decompression).
+# sequence numbers the measured requests across all workers
+CSV_HEADERS = ['sequence', 'response_time_ms', 'response_size_kb']
+# In open-loop mode response_time_ms is measured from the intended send time
+OPEN_LOOP_HEADERS = CSV_HEADERS + ['service_time_ms']
+SUMMARY_HEADERS = ['client_mode', 'connection_mode', 'workers', 'concurrency', 'requests', 'duration_s', 'throughput_rps',
+                   'bytes_sent', 'bytes_received']
+OVERHEAD_HEADERS = ['connection_mode', 'requests', 'mean_ms', 'p50_ms', 'p99_ms']
+PHASE_CSV_HEADERS = ['sequence'] + PHASE_HEADERS
 
-CSV_HEADERS = ['response_time_ms', 'response_size_kb']
+def trace_headers(trace, sequence):
+    """traceparent header for a measured request, or None when tracing is off"""
+    return {TRACE_HEADER: trace.traceparent(sequence)} if trace is not None else None
 
-def write_latency_row(csv_file, response_time_ms, response_size_kb):
-    """Write latency row with response time and size"""
-    with open(csv_file, "a", newline="") as f:
+def write_summary(summary_file, connection_mode, requests_count, duration_s, wire):
+    """Write run-level throughput and wire byte totals"""
+    throughput_rps = requests_count / duration_s if duration_s > 0 else 0.0
+    with open(summary_file, "w", newline="") as f:
         writer = csv.writer(f)
-        writer.writerow([response_time_ms, response_size_kb])
+        writer.writerow(SUMMARY_HEADERS)
+        writer.writerow([CLIENT_MODE, connection_mode, WORKERS, CONCURRENCY, requests_count, duration_s, throughput_rps,
+                         wire.bytes_sent, wire.bytes_received])
+    print(f"{requests_count} requests in {duration_s:.2f}s ({throughput_rps:.1f} req/s, "
+          f"mode={CLIENT_MODE}, connection={connection_mode}, workers={WORKERS}, concurrency={CONCURRENCY}, "
+          f"{wire.bytes_sent} B sent, {wire.bytes_received} B received)")
 
-def init_csv_file(csv_file):
-    """Initialize CSV file with headers"""
-    with open(csv_file, "w", newline="") as f:
-        csv.writer(f).writerow(CSV_HEADERS)
+def write_connection_overhead(overhead_file, histograms_by_mode):
+    """Write per-mode latency stats plus the pooled-vs-new difference"""
+    stats = {}
+    for mode, histogram in histograms_by_mode.items():
+        summary = histogram.summary_ms(percentiles=(50, 99))
+        stats[mode] = [summary['count'], summary['mean_ms'], summary['p50_ms'], summary['p99_ms']]
+    overhead = [new - pooled for new, pooled in zip(stats["new"][1:], stats["pooled"][1:])]
+    with open(overhead_file, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(OVERHEAD_HEADERS)
+        for mode, row in stats.items():
+            writer.writerow([mode] + row)
+        writer.writerow(["setup_overhead", ""] + overhead)
+    print(f"Connection setup overhead: mean={overhead[0]:.2f}ms, p50={overhead[1]:.2f}ms, p99={overhead[2]:.2f}ms")
 
-def main():
-    # Setup output directory with date and client type
-    today = datetime.now().strftime('%Y_%m_%d')
-    run_dir = Path(BENCHMARK_RESULTS_DIR) / f"run_{today}"
-    run_dir.mkdir(parents=True, exist_ok=True)
-    
-    get_modelcard_file = run_dir / "get_modelcard.csv"
-
-    init_csv_file(get_modelcard_file)
-    
-    for i in range(BENCHMARK_RUNS):
+class CountingHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections count socket bytes into `wire`.
+
+    HTTPS connections are counted above TLS, like counting_transport(): the
+    HTTP bytes, without TLS record overhead.
+    """
+
+    def __init__(self, wire, **kwargs):
+        self.wire = wire
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        wire = self.wire
+
+        class CountingConnection(HTTPConnection):
+            def _new_conn(self):
+                return CountingSocket(super()._new_conn(), wire)
+
+        class CountingTLSConnection(HTTPSConnection):
+            def connect(self):
+                # The handshake needs the real socket, so wrap the TLS socket once it is up
+                super().connect()
+                self.sock = CountingSocket(self.sock, wire)
+
+        class CountingPool(HTTPConnectionPool):
+            ConnectionCls = CountingConnection
+
+        class CountingTLSPool(HTTPSConnectionPool):
+            ConnectionCls = CountingTLSConnection
+
+        self.poolmanager.pool_classes_by_scheme = {**self.poolmanager.pool_classes_by_scheme,
+                                                   "http": CountingPool, "https": CountingTLSPool}
+
+def sync_getter(connection_mode, wire):
+    """Return a GET callable for the sync client in the given connection mode"""
+    if connection_mode == "new":
+        # Like requests.get, build and tear down a Session so every call connects
+        # afresh. The adapter (and its connection classes) is built once, outside
+        # the timed calls; closing the session closes its pooled connection.
+        adapter = CountingHTTPAdapter(wire)
+
+        def get(url, headers=None):
+            with requests.Session() as session:
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                return session.get(url, headers=headers)
+        return get
+    session = requests.Session()
+    adapter = CountingHTTPAdapter(wire, pool_connections=1, pool_maxsize=POOL_SIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session.get
+
+def async_limits(connection_mode, max_connections):
+    """httpx pool limits for the given connection mode"""
+    if connection_mode == "new":
+        # No keep-alive slots: httpx closes each connection once its response is read
+        return httpx.Limits(max_connections=max_connections, max_keepalive_connections=0)
+    return httpx.Limits(max_connections=max_connections, max_keepalive_connections=POOL_SIZE)
+
+def operation_urls(operation):
+    """Request URLs for an operation; runners cycle through them in order"""
+    if operation == "search_modelcards":
+        queries = load_queries(SEARCH_QUERIES_FILE, SEARCH_QUERY)
+        return [f"{REST_API_BASE_URL}{SEARCH_MODELCARDS_PATH}?{urlencode({SEARCH_PARAM: query})}"
+                for query in queries]
+    return [f"{REST_API_BASE_URL}{GET_MODELCARD_PATH.format(mc_id=MODELCARD_ID)}"]
+
+def run_sync(urls, connection_mode, runs, sink, wire, first_sequence=0, trace=None):
+    """Issue `runs` measured sequential requests after one warm-up, recording into `sink`.
+
+    Measured requests are numbered from `first_sequence` and, with `trace`,
+    carry a traceparent. Returns the measured wall time in seconds.
+    """
+    get = sync_getter(connection_mode, wire)
+    for i, url in zip(range(runs + 1), cycle(urls)):
+        # Start the wall clock after the warm-up request
+        if i == 1:
+            wire.reset()
+            measured_start = time.perf_counter()
+        sequence = first_sequence + i - 1
+        headers = trace_headers(trace, sequence) if i > 0 else None
         start_time = time.perf_counter()
-        response = requests.get(f"{REST_API_BASE_URL}/modelcard/{MODELCARD_ID}")        
+        get(url, headers=headers)
         end_time = time.perf_counter()
         response_time_ms = (end_time - start_time) * 1000
-        response_str = response.text
-        response_size_bytes = len(response_str.encode('utf-8'))
-        response_size_kb = response_size_bytes / 1024
-        
-        # Only write to CSV after the first request (skip index 0)
+        # Requests run one at a time, so the bytes since the last one are this one's
+        response_size_kb = wire.take()[1] / 1024
+
+        # Only record after the first request (skip index 0)
+        if i > 0:
+            sink.record(sequence, response_time_ms, response_size_kb)
+    return time.perf_counter() - measured_start if runs > 0 else 0.0
+
+def run_phases(urls, connection_mode, runs, sink, first_sequence=0, trace=None):
+    """Issue `runs` measured sequential requests after one warm-up, timing each phase.
+
+    Records PHASE_CSV_HEADERS rows into `sink` and returns the measured wall time in seconds.
+    """
+    client = PhaseTimedClient(REST_API_BASE_URL, keep_alive=connection_mode != "new")
+    targets = [urlsplit(url)._replace(scheme="", netloc="").geturl() for url in urls]
+    for i, target in zip(range(runs + 1), cycle(targets)):
+        # Start the wall clock after the warm-up request
+        if i == 1:
+            measured_start = time.perf_counter()
+        sequence = first_sequence + i - 1
+        row, _ = client.get(target, trace_headers(trace, sequence) if i > 0 else None)
         if i > 0:
-            write_latency_row(get_modelcard_file, response_time_ms, response_size_kb)
+            sink.record(sequence, *row)
+    client.close()
+    return time.perf_counter() - measured_start if runs > 0 else 0.0
+
+async def fetch(client, url, headers=None):
+    """Time a single GET and return (response_time_ms, response_size_kb)"""
+    start_time = time.perf_counter()
+    response = await client.get(url, headers=headers)
+    end_time = time.perf_counter()
+    return (end_time - start_time) * 1000, response_wire_bytes(response)[1] / 1024
+
+async def run_async(urls, connection_mode, runs, concurrency, sink, wire, first_sequence=0, trace=None):
+    """Issue `runs` measured requests from `concurrency` concurrent callers, recording into `sink`.
+
+    Returns the measured wall time in seconds. One warm-up request per caller
+    opens the connection pool before timing starts. Requests are numbered
+    and traced as in run_sync().
+    """
+    max_connections = concurrency if connection_mode == "new" else POOL_SIZE
+    limits = async_limits(connection_mode, max_connections)
+    # Shared iterator hands out request slots; safe because the loop is single-threaded
+    remaining = zip(range(first_sequence, first_sequence + runs), cycle(urls))
+
+    async def worker(client):
+        for sequence, url in remaining:
+            sink.record(sequence, *await fetch(client, url, trace_headers(trace, sequence)))
+
+    async with httpx.AsyncClient(transport=counting_transport(wire, limits=limits), timeout=None) as client:
+        await asyncio.gather(*(fetch(client, urls[0]) for _ in range(concurrency)))
+        wire.reset()
+        start_time = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        duration_s = time.perf_counter() - start_time
+    return duration_s
+
+async def run_open_loop_async(urls, connection_mode, runs, arrival_rate, seed, sink, wire, first_sequence=0,
+                              trace=None):
+    """Send `runs` measured requests on an `arrival_rate` req/s schedule.
+
+    Records (sequence, latency_ms, response_size_kb, service_time_ms) rows
+    into `sink` and returns the wall time in seconds. The pool is unbounded so
+    requests never queue client-side.
+    """
+    limits = async_limits(connection_mode, None)
+    sequences = count(first_sequence)
+
+    async def call():
+        # Numbered in send order, which the schedule fixes
+        sequence = next(sequences)
+        return sequence, await fetch(client, next_url(), trace_headers(trace, sequence))
+
+    def on_complete(latency_ms, service_ms, result):
+        sequence, (_, size_kb) = result
+        sink.record(sequence, latency_ms, size_kb, service_ms)
+
+    async with httpx.AsyncClient(transport=counting_transport(wire, limits=limits), timeout=None) as client:
+        await fetch(client, urls[0])
+        wire.reset()
+        next_url = cycle(urls).__next__
+        start_time = time.perf_counter()
+        await run_open_loop(call, runs, arrival_rate, on_complete, ARRIVAL_DISTRIBUTION, seed)
+        duration_s = time.perf_counter() - start_time
+    return duration_s
+
+def run_worker(urls, connection_mode, runs, concurrency, arrival_rate, seed, results_file, headers, metadata=None,
+               first_sequence=0, trace_prefix=None):
+    """Run one process's share of the configured CLIENT_MODE into `results_file`.
+
+    The worker's requests are numbered from `first_sequence`; with
+    `trace_prefix` they carry a traceparent. Returns (rows recorded, measured
+    wall time in seconds, encoded latency histogram, wire byte totals).
+    Phases mode does not count wire bytes.
+    """
+    trace = TraceContext(trace_prefix) if trace_prefix else None
+    wire = WireCounter()
+    # Phase rows carry total_time in seconds rather than response_time_ms
+    latency = ('total_time', 1e6) if CLIENT_MODE == "phases" else ('response_time_ms', 1000.0)
+    with ResultSink(results_file, headers, capacity=runs, buffer_rows=RESULTS_BUFFER_ROWS,
+                    latency_column=latency[0], latency_to_us=latency[1],
+                    units=PHASE_UNITS if CLIENT_MODE == "phases" else None, metadata=metadata) as sink:
+        if CLIENT_MODE == "open_loop":
+            duration_s = asyncio.run(run_open_loop_async(urls, connection_mode, runs, arrival_rate, seed, sink, wire,
+                                                         first_sequence, trace))
+        elif CLIENT_MODE == "async":
+            duration_s = asyncio.run(run_async(urls, connection_mode, runs, concurrency, sink, wire, first_sequence,
+                                               trace))
+        elif CLIENT_MODE == "phases":
+            duration_s = run_phases(urls, connection_mode, runs, sink, first_sequence, trace)
+        else:
+            duration_s = run_sync(urls, connection_mode, runs, sink, wire, first_sequence, trace)
+    return sink.count, duration_s, sink.histogram.encode(), wire
+
+def run_mode(urls, connection_mode, results_file, metadata=None, trace=None):
+    """Run the configured CLIENT_MODE across WORKERS processes into `results_file`.
+
+    Returns (rows recorded, measured wall time in seconds, merged latency
+    histogram, wire byte totals); the histogram is also saved next to
+    `results_file`. `metadata` is stored with the columnar results (see
+    harness.schema); with `trace` every measured request carries a traceparent.
+    """
+    seed = int(ARRIVAL_SEED) if ARRIVAL_SEED is not None else None
+    headers = {"open_loop": OPEN_LOOP_HEADERS, "phases": PHASE_CSV_HEADERS}.get(CLIENT_MODE, CSV_HEADERS)
+    runs_per_worker = split_evenly(max(BENCHMARK_RUNS - 1, 0), WORKERS)
+    # Each worker numbers its requests after those of the workers before it
+    first_sequences = [sum(runs_per_worker[:worker]) for worker in range(WORKERS)]
+    concurrency_per_worker = split_evenly(max(CONCURRENCY, WORKERS), WORKERS)
+    # Each worker writes its own part file; a single worker writes the final file directly
+    worker_files = [part_path(results_file, worker) for worker in range(WORKERS)] if WORKERS > 1 else [results_file]
+    worker_args = [
+        # Offset the seed so workers do not replay identical Poisson schedules
+        (urls, connection_mode, runs, concurrency, ARRIVAL_RATE / WORKERS,
+         seed + worker if seed is not None else None, worker_file, headers, metadata, first_sequence,
+         trace.prefix if trace is not None else None)
+        for worker, (runs, concurrency, worker_file, first_sequence)
+        in enumerate(zip(runs_per_worker, concurrency_per_worker, worker_files, first_sequences))
+    ]
+    results = run_in_processes(run_worker, worker_args)
+    if WORKERS > 1:
+        merge_parts(results_file, worker_files)
+    histogram = HdrHistogram()
+    wire = WireCounter()
+    for _, _, encoded, worker_wire in results:
+        histogram.merge(HdrHistogram.decode(encoded))
+        wire.add(worker_wire)
+    histogram.save(histogram_path(results_file))
+    record_results(results_file, histogram, "rest")
+    # Workers run side by side, so the slowest one bounds the run's wall time
+    return sum(result[0] for result in results), max(result[1] for result in results), histogram, wire
+
+def main():
+    run_dir = new_run_dir(BENCHMARK_RESULTS_DIR)
+    record_run(BENCHMARK_RESULTS_DIR, run_dir, "rest", settings(globals()))
+
+    connection_modes = ["pooled", "new"] if CONNECTION_MODE == "both" else [CONNECTION_MODE]
+    for operation in OPERATIONS:
+        urls = operation_urls(operation)
+        histograms_by_mode = {}
+        for connection_mode in connection_modes:
+            # A single mode keeps the historical file names
+            suffix = f"_{connection_mode}" if CONNECTION_MODE == "both" else ""
+            results_file = run_dir / f"{operation}{suffix}.csv"
+
+            print(f"Running {operation} ({len(urls)} distinct request(s))...")
+            metadata = {'client': 'rest', 'protocol': 'rest', 'operation': operation, 'client_mode': CLIENT_MODE,
+                        'connection_mode': connection_mode, 'workers': WORKERS}
+            # Sequences restart for every results file, so each gets its own trace id prefix
+            trace = TraceContext() if TRACE_CONTEXT else None
+            if trace is not None:
+                metadata['trace_prefix'] = trace.prefix
+                print(f"Trace id prefix: {trace.prefix}")
+            count, duration_s, histogram, wire = run_mode(urls, connection_mode, results_file, metadata, trace)
+            write_summary(run_dir / f"{operation}{suffix}_summary.csv", connection_mode, count, duration_s, wire)
+            histograms_by_mode[connection_mode] = histogram
+
+        if CONNECTION_MODE == "both":
+            write_connection_overhead(run_dir / f"{operation}_connection_overhead.csv", histograms_by_mode)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,43 @@
+"""Service-time distributions for the local stand-in servers."""
+import csv
+import math
+import random
+
+DISTRIBUTIONS = ("constant", "exponential", "lognormal", "uniform", "recorded")
+
+def load_recorded_times(path):
+    """Service times in ms from a CSV with a total_time column (or one value per row)"""
+    with open(path, newline="") as f:
+        rows = list(csv.reader(f))
+    if rows and "total_time" in rows[0]:
+        column = rows[0].index("total_time")
+        rows = rows[1:]
+    else:
+        column = 0
+    times = [float(row[column]) for row in rows if row and row[column].strip()]
+    if not times:
+        raise ValueError(f"No service times in {path}")
+    return times
+
+def service_time_sampler(distribution="constant", mean_ms=0.0, sigma=0.5, recorded_file=None, seed=None):
+    """Return a function that draws one service time in seconds per call.
+
+    exponential, lognormal (shape `sigma`) and uniform (0 to twice the mean)
+    all have mean `mean_ms`; recorded resamples the times in `recorded_file`,
+    e.g. a database/get_modelcard.csv captured from the real backend.
+    """
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"Unsupported service time distribution: {distribution}")
+    rng = random.Random(seed)
+    mean_s = mean_ms / 1000
+    if distribution == "recorded":
+        times_s = [value / 1000 for value in load_recorded_times(recorded_file)]
+        return lambda: rng.choice(times_s)
+    if mean_s <= 0 or distribution == "constant":
+        return lambda: mean_s
+    if distribution == "exponential":
+        return lambda: rng.expovariate(1 / mean_s)
+    if distribution == "lognormal":
+        mu = math.log(mean_s) - sigma ** 2 / 2
+        return lambda: rng.lognormvariate(mu, sigma)
+    return lambda: rng.uniform(0, 2 * mean_s)
@@ -0,0 +1,140 @@
+"""Local MCP stand-ins for the native (8050) and layered (8051) PATRA servers.
+
+Both expose get_modelcard and search_modelcards. The native stand-in serves
+model cards itself, sleeping for a configurable service time in place of the
+database query, like rest_server.py. The layered stand-in proxies every call
+to the REST stand-in (or any PATRA REST server) over a pooled httpx client,
+so the layered-vs-native overhead can be reproduced on one machine.
+
+MCP_TRANSPORT selects stdio (spawned by the MCP client's stdio transport,
+with no service time unless set, so it measures the protocol alone), sse or
+streamable-http. With TRACE_LOG set, calls carrying a traceparent in
+their _meta append spans for this hop (native_mcp or layered_mcp) and, on the
+native server, db; the layered server forwards the traceparent to REST. Hop
+spans cover the tool call, not the MCP framing around it.
+"""
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+import httpx
+from mcp.server.fastmcp import Context, FastMCP
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from harness.tracing import TRACE_HEADER, SpanLog
+from latency import service_time_sampler
+from modelcards import ModelCardStore, load_modelcards
+
+# "native" serves model cards directly, "layered" calls the REST server
+MCP_STANDIN_MODE = os.getenv("MCP_STANDIN_MODE", "native")
+MCP_TRANSPORT = os.getenv("MCP_TRANSPORT", "stdio")
+STANDIN_HOST = os.getenv("STANDIN_HOST", "127.0.0.1")
+STANDIN_PORT = int(os.getenv("STANDIN_PORT", "8050"))
+# Layered mode only: the REST server every call is forwarded to
+REST_SERVER_URL = os.getenv("REST_SERVER_URL", "http://127.0.0.1:5002")
+GET_MODELCARD_PATH = os.getenv("GET_MODELCARD_PATH", "/modelcard/{mc_id}")
+SEARCH_MODELCARDS_PATH = os.getenv("SEARCH_MODELCARDS_PATH", "/modelcards/search")
+SEARCH_PARAM = os.getenv("SEARCH_PARAM", "q")
+# Native mode only: model cards and simulated database time, as in rest_server.py
+MODELCARDS_FILE = os.getenv("MODELCARDS_FILE")
+PAYLOAD_KB = float(os.getenv("PAYLOAD_KB", "0"))
+SEARCH_RESULTS = int(os.getenv("SEARCH_RESULTS", "5"))
+# Shape of synthetic cards; ids ending in -<size>kb override PAYLOAD_KB
+CARD_FIELDS = int(os.getenv("CARD_FIELDS", "0"))
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "0"))
+CARD_SECTIONS = [section for section in os.getenv("CARD_SECTIONS", "ai_model").split(",") if section]
+SERVICE_TIME_DISTRIBUTION = os.getenv("SERVICE_TIME_DISTRIBUTION", "constant")
+# None by default over stdio, where the stand-in is the local protocol floor
+DEFAULT_SERVICE_TIMES_MS = ("0", "0") if MCP_TRANSPORT == "stdio" else ("5", "15")
+GET_SERVICE_TIME_MS = float(os.getenv("GET_SERVICE_TIME_MS", DEFAULT_SERVICE_TIMES_MS[0]))
+SEARCH_SERVICE_TIME_MS = float(os.getenv("SEARCH_SERVICE_TIME_MS", DEFAULT_SERVICE_TIMES_MS[1]))
+SERVICE_TIME_SIGMA = float(os.getenv("SERVICE_TIME_SIGMA", "0.5"))
+GET_SERVICE_TIME_FILE = os.getenv("GET_SERVICE_TIME_FILE")
+SEARCH_SERVICE_TIME_FILE = os.getenv("SEARCH_SERVICE_TIME_FILE")
+SERVICE_TIME_SEED = os.getenv("SERVICE_TIME_SEED")
+TRACE_LOG = os.getenv("TRACE_LOG")
+
+server = FastMCP(f"patra-{MCP_STANDIN_MODE}-standin", host=STANDIN_HOST, port=STANDIN_PORT)
+hop_spans = SpanLog(TRACE_LOG, f"{MCP_STANDIN_MODE}_mcp") if TRACE_LOG else None
+db_spans = SpanLog(TRACE_LOG, "db") if TRACE_LOG and MCP_STANDIN_MODE == "native" else None
+store = None
+service_times = {}
+rest_client = None
+
+def traceparent_of(ctx):
+    """The traceparent the client put in the request's _meta, if any"""
+    meta = ctx.request_context.meta
+    return getattr(meta, TRACE_HEADER, None) if meta is not None else None
+
+async def serve_native(operation, argument, traceparent):
+    db_ms = service_times[operation]() * 1000
+    if db_ms > 0:
+        await asyncio.sleep(db_ms / 1000)
+    if db_spans is not None and traceparent is not None:
+        db_spans.record(traceparent, db_ms)
+    if operation == "search_modelcards":
+        return store.search(argument)
+    card = store.get(argument)
+    if card is None:
+        raise ValueError(f"Model card not found: {argument}")
+    return card
+
+async def serve_layered(operation, argument, traceparent):
+    global rest_client
+    if rest_client is None:
+        # Created on first use so it binds to the server's event loop
+        rest_client = httpx.AsyncClient(base_url=REST_SERVER_URL, timeout=None,
+                                        limits=httpx.Limits(max_connections=None))
+    if operation == "search_modelcards":
+        target = f"{SEARCH_MODELCARDS_PATH}?{urlencode({SEARCH_PARAM: argument})}"
+    else:
+        target = GET_MODELCARD_PATH.format(mc_id=argument)
+    headers = {TRACE_HEADER: traceparent} if traceparent is not None else None
+    response = await rest_client.get(target, headers=headers)
+    response.raise_for_status()
+    return response.json()
+
+async def serve(operation, argument, ctx):
+    start = time.perf_counter()
+    traceparent = traceparent_of(ctx)
+    handler = serve_layered if MCP_STANDIN_MODE == "layered" else serve_native
+    result = await handler(operation, argument, traceparent)
+    if hop_spans is not None and traceparent is not None:
+        hop_spans.record(traceparent, (time.perf_counter() - start) * 1000)
+    return result
+
+@server.tool()
+async def get_modelcard(mc_id: str, ctx: Context) -> dict:
+    """Get a model card by id"""
+    return await serve("get_modelcard", mc_id, ctx)
+
+@server.tool()
+async def search_modelcards(query: str, ctx: Context) -> list:
+    """Search model cards by keyword"""
+    return await serve("search_modelcards", query, ctx)
+
+def main():
+    global store
+    if MCP_STANDIN_MODE not in ("native", "layered"):
+        raise ValueError(f"Unsupported MCP stand-in mode: {MCP_STANDIN_MODE}")
+    recorded = load_modelcards(MODELCARDS_FILE) if MODELCARDS_FILE else None
+    store = ModelCardStore(recorded, int(PAYLOAD_KB * 1024), SEARCH_RESULTS, extra_fields=CARD_FIELDS,
+                           embedding_dim=EMBEDDING_DIM, sections=CARD_SECTIONS)
+    seed = int(SERVICE_TIME_SEED) if SERVICE_TIME_SEED is not None else None
+    service_times.update({
+        "get_modelcard": service_time_sampler(SERVICE_TIME_DISTRIBUTION, GET_SERVICE_TIME_MS, SERVICE_TIME_SIGMA,
+                                              GET_SERVICE_TIME_FILE, seed),
+        "search_modelcards": service_time_sampler(SERVICE_TIME_DISTRIBUTION, SEARCH_SERVICE_TIME_MS, SERVICE_TIME_SIGMA,
+                                                  SEARCH_SERVICE_TIME_FILE, seed),
+    })
+    if MCP_TRANSPORT != "stdio":
+        # stdout carries the protocol under stdio, so only announce network servers
+        print(f"{MCP_STANDIN_MODE} MCP stand-in listening on {STANDIN_HOST}:{STANDIN_PORT} ({MCP_TRANSPORT})")
+    server.run(transport=MCP_TRANSPORT)
+
+if __name__ == "__main__":
+    main()
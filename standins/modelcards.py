@@ -0,0 +1,107 @@
+"""Model cards served by the local stand-in servers."""
+import json
+import random
+import re
+from functools import lru_cache, partial
+from pathlib import Path
+
+# Optional nested sections of a generated card, as in PATRA's schema
+SECTIONS = ("ai_model", "bias_analysis", "xai_analysis")
+# Ids ending in -<size>kb ask for a synthetic card of that size, e.g. sweep-64kb
+SIZED_ID = re.compile(r"-(\d+(?:\.\d+)?)kb$")
+WORDS = ("model", "image", "camera", "trap", "species", "detection", "training", "dataset", "accuracy",
+         "wildlife", "inference", "edge", "device", "label", "bounding", "box", "animal", "classifier")
+
+def _text(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+def generate_modelcard(mc_id, payload_bytes=0, extra_fields=0, embedding_dim=0, sections=("ai_model",)):
+    """A synthetic model card shaped like the ones the PATRA endpoints return.
+
+    The card is deterministic per id. `extra_fields` adds flat text fields,
+    `sections` picks the nested ai_model, bias_analysis and xai_analysis
+    sections, and `embedding_dim` gives ai_model an embedding vector of that
+    length. With `payload_bytes` set, the documentation field pads the card
+    out to about that size when JSON-encoded.
+    """
+    rng = random.Random(mc_id)
+    card = {
+        "external_id": mc_id,
+        "name": mc_id.replace("-mc", "").replace("-", " ").title(),
+        "version": "1.0",
+        "short_description": f"Stand-in model card for {mc_id}",
+        "full_description": f"Locally generated model card for {mc_id}, used to benchmark the transport path.",
+        "keywords": "benchmark, stand-in",
+        "author": "patra-benchmarks",
+        "input_type": "image",
+        "category": "classification",
+    }
+    for index in range(extra_fields):
+        card[f"field_{index}"] = _text(rng, 8)
+    if "ai_model" in sections:
+        card["ai_model"] = {
+            "name": mc_id,
+            "version": "1.0",
+            "framework": "pytorch",
+            "model_type": "cnn",
+            "test_accuracy": 0.9,
+        }
+        if embedding_dim:
+            card["ai_model"]["embedding"] = [round(rng.uniform(-1, 1), 6) for _ in range(embedding_dim)]
+    if "bias_analysis" in sections:
+        card["bias_analysis"] = {
+            "demographic_parity_diff": round(rng.uniform(0, 0.2), 4),
+            "equal_odds_difference": round(rng.uniform(0, 0.2), 4),
+            "groups": [{"group": f"group_{index}", "accuracy": round(rng.uniform(0.7, 1), 4),
+                        "false_positive_rate": round(rng.uniform(0, 0.1), 4)} for index in range(4)],
+        }
+    if "xai_analysis" in sections:
+        card["xai_analysis"] = {
+            "method": "shap",
+            "feature_importance": [{"feature": f"feature_{index}", "importance": round(rng.uniform(0, 1), 4)}
+                                   for index in range(10)],
+        }
+    missing = payload_bytes - len(json.dumps(card)) - len(', "documentation": ""')
+    if missing > 0:
+        card["documentation"] = (_text(rng, missing // 6 + 1) + " ")[:missing]
+    return card
+
+def load_modelcards(path):
+    """Recorded model cards keyed by external_id, from a JSON list or JSON lines file"""
+    text = Path(path).read_text()
+    cards = json.loads(text) if text.lstrip().startswith("[") else [json.loads(line) for line in text.splitlines() if line.strip()]
+    return {card["external_id"]: card for card in cards}
+
+class ModelCardStore:
+    """get/search over recorded cards, or synthetic ones when none are loaded.
+
+    Synthetic cards exist for any id, are built with the generate_modelcard()
+    options in `shape` and padded to `payload_bytes`, or to the size in the id
+    for ids matching SIZED_ID. Synthetic cards are built once per id and
+    shared between calls, so callers must not modify them; servers then pay
+    for serving a card rather than generating it, as in rest_server.py's
+    cache. Recorded cards are served as captured, and unknown ids return None.
+    """
+
+    def __init__(self, recorded=None, payload_bytes=0, search_results=5, **shape):
+        self.recorded = recorded
+        self.payload_bytes = payload_bytes
+        self.search_results = search_results
+        self.shape = shape
+        self._generate = lru_cache(maxsize=4096)(partial(generate_modelcard, **shape))
+
+    def get(self, mc_id):
+        if self.recorded is not None:
+            return self.recorded.get(mc_id)
+        sized = SIZED_ID.search(mc_id)
+        payload_bytes = int(float(sized.group(1)) * 1024) if sized else self.payload_bytes
+        return self._generate(mc_id, payload_bytes)
+
+    def search(self, query):
+        if self.recorded is None:
+            return [self._generate(f"{query}-{index}-mc", self.payload_bytes)
+                    for index in range(self.search_results)]
+        query = query.lower()
+        matches = [card for card in self.recorded.values()
+                   if any(query in str(card.get(field, "")).lower() for field in ("name", "keywords", "short_description"))]
+        return matches[:self.search_results]
@@ -0,0 +1,193 @@
+"""TCP proxy that emulates network conditions between the clients and a server.
+
+Each route listens on a local port and forwards to a target host:port,
+adding to every chunk in both directions a one-way delay with jitter, and
+pacing it to a bandwidth cap. The upstream connect waits one round trip, so
+a new connection costs the handshake it would on the emulated link. Chunks
+are delivered in order, so jitter stretches gaps but never reorders the
+stream. Whole connections can also be dropped (accepted, then black-holed
+until the client gives up) or reset (aborted with a TCP RST at a random byte
+offset). Packet loss below TCP cannot be
+emulated from user space; drops and resets cover what a client sees of it.
+
+Point a client at the listening port instead of the server, e.g.
+REST_SERVER_URL=http://127.0.0.1:15002 for the route 15002=host:5002. Works
+the same in front of the local stand-ins or the real servers. Only needs the
+standard library.
+"""
+import asyncio
+import os
+import random
+import signal
+import socket
+import struct
+import time
+
+PROXY_HOST = os.getenv("PROXY_HOST", "127.0.0.1")
+# Comma-separated listen_port=target_host:target_port routes
+PROXY_ROUTES = os.getenv("PROXY_ROUTES", "15002=127.0.0.1:5002,18050=127.0.0.1:8050,18051=127.0.0.1:8051")
+# One-way delay added in each direction, plus a uniform +/- jitter
+DELAY_MS = float(os.getenv("DELAY_MS", "0"))
+JITTER_MS = float(os.getenv("JITTER_MS", "0"))
+# Per-connection, per-direction bandwidth cap in kilobits/s; 0 is unlimited
+BANDWIDTH_KBPS = float(os.getenv("BANDWIDTH_KBPS", "0"))
+# Probability that a new connection is black-holed
+DROP_RATE = float(os.getenv("DROP_RATE", "0"))
+# Probability that a connection is reset, at a byte offset drawn uniformly from
+# the first RESET_WINDOW_BYTES forwarded (both directions together); a
+# connection that closes before reaching its offset is not reset
+RESET_RATE = float(os.getenv("RESET_RATE", "0"))
+RESET_WINDOW_BYTES = int(os.getenv("RESET_WINDOW_BYTES", "16384"))
+PROXY_SEED = os.getenv("PROXY_SEED")
+READ_SIZE = 64 * 1024
+
+rng = random.Random(int(PROXY_SEED) if PROXY_SEED is not None else None)
+stats = {"connections": 0, "dropped": 0, "reset": 0, "bytes": 0}
+
+class ConnectionReset(Exception):
+    """Raised to abort a proxied connection with a RST."""
+
+def parse_routes(routes):
+    """[(listen_port, target_host, target_port)] from PROXY_ROUTES syntax"""
+    parsed = []
+    for route in filter(None, (part.strip() for part in routes.split(","))):
+        listen_port, target = route.split("=")
+        host, port = target.rsplit(":", 1)
+        parsed.append((int(listen_port), host, int(port)))
+    return parsed
+
+def one_way_delay_s():
+    """DELAY_MS with jitter, in seconds"""
+    return max(0.0, DELAY_MS + rng.uniform(-JITTER_MS, JITTER_MS)) / 1000
+
+def reset(writer):
+    """Close with a RST instead of a FIN"""
+    sock = writer.get_extra_info("socket")
+    if sock is not None:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+    writer.transport.abort()
+
+async def pipe(reader, writer, reset_after):
+    """Forward one direction, delaying each chunk and pacing it to the bandwidth cap.
+
+    `reset_after` is None, or the connection's {"bytes": n} shared by both
+    directions: the stream is cut with a reset once n more bytes are forwarded.
+    """
+    queue = asyncio.Queue()
+
+    async def receive():
+        # Reads run ahead of delivery, as they would on a link with a delay
+        last_due = 0.0
+        while True:
+            try:
+                data = await reader.read(READ_SIZE)
+            except (ConnectionError, OSError) as e:
+                # The peer reset or the socket failed: end the connection rather than wait for data
+                await queue.put((last_due, e))
+                return
+            if not data:
+                await queue.put((None, b""))
+                return
+            resetting = reset_after is not None and len(data) >= reset_after["bytes"]
+            if resetting:
+                data = data[:reset_after["bytes"]]
+            elif reset_after is not None:
+                reset_after["bytes"] -= len(data)
+            last_due = max(last_due, time.perf_counter() + one_way_delay_s())
+            if data:
+                await queue.put((last_due, data))
+            if resetting:
+                await queue.put((last_due, ConnectionReset()))
+                return
+
+    receiver = asyncio.create_task(receive())
+    link_free = 0.0
+    try:
+        while True:
+            due, data = await queue.get()
+            if isinstance(data, Exception):
+                raise data
+            if not data:
+                if writer.can_write_eof():
+                    writer.write_eof()
+                return
+            now = time.perf_counter()
+            if due > now:
+                await asyncio.sleep(due - now)
+                now = due
+            if BANDWIDTH_KBPS > 0:
+                # The chunk leaves once the link has finished sending the previous one
+                link_free = max(link_free, now) + len(data) * 8 / (BANDWIDTH_KBPS * 1000)
+                await asyncio.sleep(link_free - now)
+            writer.write(data)
+            await writer.drain()
+            stats["bytes"] += len(data)
+    finally:
+        receiver.cancel()
+
+async def black_hole(reader, writer):
+    """Swallow everything the client sends and never answer"""
+    while await reader.read(READ_SIZE):
+        pass
+    writer.close()
+
+async def handle(client_reader, client_writer, target_host, target_port):
+    stats["connections"] += 1
+    if DROP_RATE and rng.random() < DROP_RATE:
+        stats["dropped"] += 1
+        await black_hole(client_reader, client_writer)
+        return
+    # The handshake crosses the emulated link both ways before any data does
+    await asyncio.sleep(one_way_delay_s() + one_way_delay_s())
+    try:
+        server_reader, server_writer = await asyncio.open_connection(target_host, target_port)
+    except OSError:
+        reset(client_writer)
+        return
+    for writer in (client_writer, server_writer):
+        writer.get_extra_info("socket").setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    reset_after = {"bytes": rng.randrange(RESET_WINDOW_BYTES)} if RESET_RATE and rng.random() < RESET_RATE else None
+    tasks = [asyncio.create_task(pipe(client_reader, server_writer, reset_after)),
+             asyncio.create_task(pipe(server_reader, client_writer, reset_after))]
+    try:
+        await asyncio.gather(*tasks)
+    except ConnectionReset:
+        stats["reset"] += 1
+        reset(client_writer)
+        reset(server_writer)
+    except (ConnectionError, OSError):
+        pass
+    finally:
+        for task in tasks:
+            task.cancel()
+        for writer in (client_writer, server_writer):
+            if not writer.is_closing():
+                writer.close()
+
+async def serve():
+    servers = []
+    for listen_port, target_host, target_port in parse_routes(PROXY_ROUTES):
+        server = await asyncio.start_server(
+            lambda r, w, host=target_host, port=target_port: handle(r, w, host, port),
+            PROXY_HOST, listen_port, backlog=1024)
+        servers.append(server)
+        print(f"Proxying {PROXY_HOST}:{listen_port} -> {target_host}:{target_port}")
+    bandwidth = f"{BANDWIDTH_KBPS}kbps" if BANDWIDTH_KBPS > 0 else "unlimited"
+    print(f"delay={DELAY_MS}ms jitter={JITTER_MS}ms bandwidth={bandwidth} "
+          f"drop={DROP_RATE:.2%} reset={RESET_RATE:.2%}")
+    await asyncio.gather(*(server.serve_forever() for server in servers))
+
+def main():
+    # docker stop sends SIGTERM; handle it like Ctrl-C so the totals are printed
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"{stats['connections']} connections, {stats['dropped']} dropped, "
+              f"{stats['reset']} reset, {stats['bytes']} bytes forwarded")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Local stand-in for the PATRA REST server.
+
+Serves GET /modelcard/{mc_id} and GET /modelcards/search?q=... from synthetic
+or recorded model cards, sleeping for a configurable service time in place of
+the database query, so the REST and cross-protocol clients can run offline.
+Responses are encoded once per id or query and cached, which keeps the
+stand-in's own cost small next to the configured service time. Only needs
+the standard library.
+"""
+import json
+import os
+import sys
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from harness.tracing import TRACE_HEADER, SpanLog
+from latency import service_time_sampler
+from modelcards import ModelCardStore, load_modelcards
+
+STANDIN_HOST = os.getenv("STANDIN_HOST", "127.0.0.1")
+STANDIN_PORT = int(os.getenv("STANDIN_PORT", "5002"))
+GET_MODELCARD_PATH = os.getenv("GET_MODELCARD_PATH", "/modelcard/{mc_id}")
+SEARCH_MODELCARDS_PATH = os.getenv("SEARCH_MODELCARDS_PATH", "/modelcards/search")
+SEARCH_PARAM = os.getenv("SEARCH_PARAM", "q")
+# Recorded cards (JSON list or JSON lines); unset serves synthetic cards for any id
+MODELCARDS_FILE = os.getenv("MODELCARDS_FILE")
+# Approximate JSON size of each synthetic card, 0 for the natural size
+PAYLOAD_KB = float(os.getenv("PAYLOAD_KB", "0"))
+SEARCH_RESULTS = int(os.getenv("SEARCH_RESULTS", "5"))
+# Shape of synthetic cards; ids ending in -<size>kb override PAYLOAD_KB
+CARD_FIELDS = int(os.getenv("CARD_FIELDS", "0"))
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "0"))
+CARD_SECTIONS = [section for section in os.getenv("CARD_SECTIONS", "ai_model").split(",") if section]
+# Simulated database time per request: constant, exponential, lognormal,
+# uniform or recorded (resampled from a CSV with a total_time column in ms)
+SERVICE_TIME_DISTRIBUTION = os.getenv("SERVICE_TIME_DISTRIBUTION", "constant")
+GET_SERVICE_TIME_MS = float(os.getenv("GET_SERVICE_TIME_MS", "5"))
+SEARCH_SERVICE_TIME_MS = float(os.getenv("SEARCH_SERVICE_TIME_MS", "15"))
+SERVICE_TIME_SIGMA = float(os.getenv("SERVICE_TIME_SIGMA", "0.5"))
+GET_SERVICE_TIME_FILE = os.getenv("GET_SERVICE_TIME_FILE")
+SEARCH_SERVICE_TIME_FILE = os.getenv("SEARCH_SERVICE_TIME_FILE")
+SERVICE_TIME_SEED = os.getenv("SERVICE_TIME_SEED")
+# Span log for requests carrying a traceparent (hops "rest" and "db")
+TRACE_LOG = os.getenv("TRACE_LOG")
+
+GET_PREFIX, GET_SUFFIX = GET_MODELCARD_PATH.split("{mc_id}")
+
+class StandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Deep accept backlog so connection bursts at high concurrency are not refused
+    request_queue_size = 1024
+
+    def handle_error(self, request, client_address):
+        # Clients (or the network proxy) resetting connections is expected
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+class ModelCardHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; with Nagle on, the body would
+    # wait for the client's delayed ACK (~40ms)
+    disable_nagle_algorithm = True
+    store = None
+    service_times = {}
+    rest_spans = db_spans = None
+
+    def do_GET(self):
+        start = time.perf_counter()
+        url = urlsplit(self.path)
+        if url.path == SEARCH_MODELCARDS_PATH:
+            operation = "search_modelcards"
+            body = self.encoded_search(parse_qs(url.query).get(SEARCH_PARAM, [""])[0])
+        elif url.path.startswith(GET_PREFIX) and url.path.endswith(GET_SUFFIX):
+            operation = "get_modelcard"
+            body = self.encoded_modelcard(unquote(url.path[len(GET_PREFIX):len(url.path) - len(GET_SUFFIX)]))
+        else:
+            self.send_json(404, b'{"error": "not found"}')
+            return
+
+        db_ms = self.service_times[operation]() * 1000
+        if db_ms > 0:
+            time.sleep(db_ms / 1000)
+        if body is None:
+            self.send_json(404, b'{"error": "model card not found"}')
+        else:
+            self.send_json(200, body)
+
+        traceparent = self.headers.get(TRACE_HEADER)
+        if traceparent is not None and self.rest_spans is not None:
+            self.db_spans.record(traceparent, db_ms)
+            self.rest_spans.record(traceparent, (time.perf_counter() - start) * 1000)
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def encoded_modelcard(mc_id):
+        card = ModelCardHandler.store.get(mc_id)
+        return json.dumps(card).encode('utf-8') if card is not None else None
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def encoded_search(query):
+        return json.dumps(ModelCardHandler.store.search(query)).encode('utf-8')
+
+    def send_json(self, status, body):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def main():
+    recorded = load_modelcards(MODELCARDS_FILE) if MODELCARDS_FILE else None
+    ModelCardHandler.store = ModelCardStore(recorded, int(PAYLOAD_KB * 1024), SEARCH_RESULTS,
+                                            extra_fields=CARD_FIELDS, embedding_dim=EMBEDDING_DIM,
+                                            sections=CARD_SECTIONS)
+    seed = int(SERVICE_TIME_SEED) if SERVICE_TIME_SEED is not None else None
+    ModelCardHandler.service_times = {
+        "get_modelcard": service_time_sampler(SERVICE_TIME_DISTRIBUTION, GET_SERVICE_TIME_MS, SERVICE_TIME_SIGMA,
+                                              GET_SERVICE_TIME_FILE, seed),
+        "search_modelcards": service_time_sampler(SERVICE_TIME_DISTRIBUTION, SEARCH_SERVICE_TIME_MS, SERVICE_TIME_SIGMA,
+                                                  SEARCH_SERVICE_TIME_FILE, seed),
+    }
+    if TRACE_LOG:
+        ModelCardHandler.rest_spans = SpanLog(TRACE_LOG, "rest")
+        ModelCardHandler.db_spans = SpanLog(TRACE_LOG, "db")
+
+    server = StandinServer((STANDIN_HOST, STANDIN_PORT), ModelCardHandler)
+    print(f"REST stand-in listening on http://{STANDIN_HOST}:{STANDIN_PORT} "
+          f"({SERVICE_TIME_DISTRIBUTION} service time, {'recorded' if recorded else 'synthetic'} model cards)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import asyncio
+import os
+import sys
+import csv
+import time
+from collections import Counter
+from contextlib import AsyncExitStack
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from harness.catalog import new_run_dir, record_results, record_run, settings
+from harness.hdr import HdrHistogram
+from harness.interleave import interleaved_order
+from harness.sink import ResultSink, histogram_path
+from harness.targets import PROTOCOLS, open_targets
+
+# Defaults point at the local stand-ins (standins/docker-compose.yml), which
+# generate a card of the requested size for ids ending in -<size>kb
+REST_SERVER_URL = os.getenv("REST_SERVER_URL", "http://127.0.0.1:5002")
+GET_MODELCARD_PATH = os.getenv("GET_MODELCARD_PATH", "/modelcard/{mc_id}")
+NATIVE_MCP_URL = os.getenv("NATIVE_MCP_URL", "http://127.0.0.1:8050/sse")
+LAYERED_MCP_URL = os.getenv("LAYERED_MCP_URL", "http://127.0.0.1:8051/sse")
+BENCHMARK_RESULTS_DIR = os.getenv("BENCHMARK_RESULTS_DIR", "/app/benchmark_results")
+RESULTS_BUFFER_ROWS = int(os.getenv("RESULTS_BUFFER_ROWS", "0")) or None
+SWEEP_PROTOCOLS = os.getenv("PROTOCOLS", ",".join(PROTOCOLS)).split(",")
+# Card sizes to sweep, in KB, and the model card id requested for each
+SWEEP_PAYLOAD_KB = [float(size) for size in os.getenv("SWEEP_PAYLOAD_KB", "1,4,16,64,256,1024").split(",")]
+SWEEP_ID_TEMPLATE = os.getenv("SWEEP_ID_TEMPLATE", "sweep-{payload_kb:g}kb")
+# Interleaved rounds per size; every round fetches the card once per protocol
+BENCHMARK_RUNS = int(os.getenv("BENCHMARK_RUNS", "100"))
+INTERLEAVE_DESIGN = os.getenv("INTERLEAVE_DESIGN", "abba")
+INTERLEAVE_SEED = os.getenv("INTERLEAVE_SEED")
+
+CSV_HEADERS = ['payload_kb', 'response_time_ms', 'response_size_kb']
+# bytes_per_ms is mean response bytes on the wire over mean latency
+SUMMARY_HEADERS = ['protocol', 'payload_kb', 'requests', 'errors', 'response_size_kb', 'mean_ms', 'p50_ms', 'p99_ms',
+                   'bytes_per_ms']
+
+async def run_sweep(run_dir):
+    """Fetch get_modelcard at each payload size from every protocol in interleaved rounds"""
+    urls = {"rest": REST_SERVER_URL, "native": NATIVE_MCP_URL, "layered": LAYERED_MCP_URL}
+    seed = int(INTERLEAVE_SEED) if INTERLEAVE_SEED is not None else None
+    sinks = {protocol: ResultSink(run_dir / f"{protocol}_payload_sweep.csv", CSV_HEADERS,
+                                  capacity=BENCHMARK_RUNS * len(SWEEP_PAYLOAD_KB), buffer_rows=RESULTS_BUFFER_ROWS,
+                                  metadata={'client': 'sweep', 'protocol': protocol, 'operation': 'get_modelcard'})
+             for protocol in SWEEP_PROTOCOLS}
+
+    with open(run_dir / "payload_sweep_summary.csv", "w", newline="") as summary_f:
+        summary_writer = csv.writer(summary_f)
+        summary_writer.writerow(SUMMARY_HEADERS)
+
+        async with AsyncExitStack() as stack:
+            targets = await open_targets(stack, *(urls[p] if p in SWEEP_PROTOCOLS else None for p in PROTOCOLS),
+                                         get_path=GET_MODELCARD_PATH)
+            for payload_kb in SWEEP_PAYLOAD_KB:
+                mc_id = SWEEP_ID_TEMPLATE.format(payload_kb=payload_kb)
+                histograms = {protocol: HdrHistogram() for protocol in SWEEP_PROTOCOLS}
+                sizes = Counter()
+                errors = Counter()
+                for protocol in SWEEP_PROTOCOLS:
+                    # Warm-up call keeps connection setup and server-side card generation out of the rounds
+                    await targets[protocol]("get_modelcard", mc_id)
+
+                print(f"Sweeping {mc_id}: {BENCHMARK_RUNS} interleaved rounds across {', '.join(SWEEP_PROTOCOLS)}...")
+                for _, protocol in interleaved_order(SWEEP_PROTOCOLS, BENCHMARK_RUNS, INTERLEAVE_DESIGN, seed):
+                    start = time.perf_counter()
+                    try:
+                        size_kb = await targets[protocol]("get_modelcard", mc_id)
+                    except Exception:
+                        errors[protocol] += 1
+                        continue
+                    response_time_ms = (time.perf_counter() - start) * 1000
+                    sinks[protocol].record(payload_kb, response_time_ms, size_kb)
+                    histograms[protocol].record_ms(response_time_ms)
+                    sizes[protocol] += size_kb
+
+                for protocol in SWEEP_PROTOCOLS:
+                    summary_writer.writerow(summarize(protocol, payload_kb, histograms[protocol], sizes[protocol],
+                                                      errors[protocol]))
+
+    for sink in sinks.values():
+        sink.close()
+        sink.histogram.save(histogram_path(sink.path))
+        record_results(sink.path, sink.histogram, "sweep")
+
+def summarize(protocol, payload_kb, histogram, total_size_kb, errors):
+    """One SUMMARY_HEADERS row for a protocol at a payload size"""
+    summary = histogram.summary_ms(percentiles=(50, 99))
+    count = summary['count']
+    if not count:
+        print(f"{protocol} {payload_kb:g}KB: all {errors} requests failed")
+        return [protocol, payload_kb, 0, errors, "", "", "", "", ""]
+    size_kb = total_size_kb / count
+    bytes_per_ms = size_kb * 1024 / summary['mean_ms']
+    print(f"{protocol} {payload_kb:g}KB: {size_kb:.1f}KB on the wire, mean={summary['mean_ms']:.2f}ms, "
+          f"p99={summary['p99_ms']:.2f}ms, {bytes_per_ms:.0f} bytes/ms")
+    return [protocol, payload_kb, count, errors, size_kb, summary['mean_ms'], summary['p50_ms'], summary['p99_ms'],
+            bytes_per_ms]
+
+def main():
+    run_dir = new_run_dir(BENCHMARK_RESULTS_DIR)
+    record_run(BENCHMARK_RESULTS_DIR, run_dir, "sweep", settings(globals()))
+    asyncio.run(run_sweep(run_dir))
+
+if __name__ == "__main__":
+    main()
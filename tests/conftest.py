@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The clients import the harness from the repository root, as do the tests
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
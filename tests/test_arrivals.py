@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+
+from harness.arrivals import arrival_offsets, run_open_loop
+
+def test_constant_offsets():
+    assert list(arrival_offsets(4, 4)) == [0.0, 0.25, 0.5, 0.75]
+
+def test_poisson_offsets_seeded():
+    first = list(arrival_offsets(100, 1000, "poisson", seed=1))
+    assert first == list(arrival_offsets(100, 1000, "poisson", seed=1))
+    assert first == sorted(first)
+    # Mean gap close to 1/rate
+    assert first[-1] / 999 == pytest.approx(0.01, rel=0.15)
+
+@pytest.mark.parametrize("rate, distribution", [(0, "constant"), (10, "bursty")])
+def test_invalid_schedule(rate, distribution):
+    with pytest.raises(ValueError):
+        list(arrival_offsets(rate, 1, distribution))
+
+def test_latency_includes_queueing_behind_slow_requests():
+    # One slot serialises the calls, so later requests wait behind the first:
+    # with coordinated omission corrected that wait shows up as latency
+    slot = asyncio.Semaphore(1)
+    timings = []
+
+    async def call():
+        async with slot:
+            await asyncio.sleep(0.05)
+
+    async def run():
+        await run_open_loop(call, 5, 100, lambda latency_ms, service_ms, _: timings.append((latency_ms, service_ms)))
+
+    asyncio.run(run())
+    latencies = sorted(latency for latency, _ in timings)
+    assert len(timings) == 5
+    # The fifth request was due at 40ms and only finished after ~250ms
+    assert latencies[-1] >= 200
+    for latency, service in timings:
+        assert latency >= service - 1
@@ -0,0 +1,23 @@
+import asyncio
+
+from harness.capacity import search_capacity
+
+def run_search(knee, start=10, maximum=10000, precision=0.05):
+    async def measure(rate):
+        return {"passed": rate <= knee}
+    return asyncio.run(search_capacity(measure, start, maximum, precision=precision))
+
+def test_finds_knee_within_precision():
+    max_rps, steps = run_search(knee=300)
+    assert 300 / 1.05 <= max_rps <= 300
+    assert [step["offered_rps"] for step in steps[:6]] == [10, 20, 40, 80, 160, 320]
+
+def test_failing_start_rate():
+    max_rps, steps = run_search(knee=5)
+    assert max_rps is None
+    assert len(steps) == 1
+
+def test_passing_up_to_max_rate():
+    max_rps, steps = run_search(knee=1e9, maximum=100)
+    assert max_rps == 100
+    assert steps[-1]["offered_rps"] == 100
@@ -0,0 +1,64 @@
+import os
+
+import pytest
+
+from harness import catalog
+from harness.catalog import RunCatalog, latest_run_dir, new_run_dir, record_results, record_run
+from harness.hdr import HdrHistogram
+from harness.sink import ResultSink
+
+@pytest.fixture
+def fresh_run_id(monkeypatch):
+    """Give each call to new_run_dir its own run id, as separate client processes would"""
+    monkeypatch.delenv("RUN_ID", raising=False)
+    catalog.run_id.cache_clear()
+    yield catalog.run_id.cache_clear
+    catalog.run_id.cache_clear()
+
+def test_run_ids_unique_and_stable(fresh_run_id):
+    ids = set()
+    for _ in range(50):
+        fresh_run_id()
+        ids.add(catalog.run_id())
+        assert catalog.run_id() == catalog.run_id()
+    assert len(ids) == 50
+
+def test_run_id_from_environment(fresh_run_id, monkeypatch, tmp_path):
+    monkeypatch.setenv("RUN_ID", "shared")
+    assert new_run_dir(tmp_path, "database") == tmp_path / "database" / "run_shared"
+
+def test_runs_and_results_indexed(fresh_run_id, tmp_path):
+    run_dirs = []
+    for p99_us in (1000, 2000):
+        fresh_run_id()
+        run_dir = new_run_dir(tmp_path)
+        record_run(tmp_path, run_dir, "rest", {'BENCHMARK_RUNS': 10})
+        with ResultSink(run_dir / "get_modelcard.csv", ['response_time_ms'],
+                        metadata={'protocol': 'rest', 'operation': 'get_modelcard'}) as sink:
+            sink.record(p99_us / 1000)
+        record_results(sink.path, sink.histogram, "rest")
+        run_dirs.append(run_dir)
+
+    assert latest_run_dir(tmp_path) == run_dirs[-1].resolve()
+    results = RunCatalog(tmp_path).results(operation="get_modelcard")
+    assert [row['p99_ms'] for row in results] == pytest.approx([2.0, 1.0], rel=1e-3)
+    assert results[0]['columnar_file'] == (run_dirs[-1] / "get_modelcard.npy").resolve()
+    assert results[0]['metadata']['protocol'] == 'rest'
+    assert RunCatalog(tmp_path).runs()[0]['config'] == {'BENCHMARK_RUNS': 10}
+
+def test_results_outside_a_catalog_are_ignored(tmp_path):
+    record_results(tmp_path / "results.csv", HdrHistogram(), "rest")
+    assert not (tmp_path / "catalog.sqlite").exists()
+
+def test_latest_run_dir_without_catalog(tmp_path):
+    assert latest_run_dir(tmp_path) == tmp_path
+    with pytest.raises(FileNotFoundError):
+        latest_run_dir(tmp_path / "missing")
+
+def test_latest_legacy_run_dir_by_name_not_mtime(tmp_path):
+    names = ["run_20251022_070125", "run_2025_10_24", "run_2025_10_24_093000_ab12", "run_20250101_235959"]
+    for index, name in enumerate(names):
+        (tmp_path / name).mkdir()
+        # A checkout or copy leaves modification times in arbitrary order
+        os.utime(tmp_path / name, (1000 - index, 1000 - index))
+    assert latest_run_dir(tmp_path) == tmp_path / "run_2025_10_24_093000_ab12"
@@ -0,0 +1,53 @@
+import pytest
+
+from harness.hdr import HdrHistogram
+
+def test_percentiles_within_precision():
+    histogram = HdrHistogram()
+    for value in range(1, 10001):
+        histogram.record(value)
+    assert histogram.total_count == 10000
+    assert histogram.value_at_percentile(50) == pytest.approx(5000, rel=1e-3)
+    assert histogram.value_at_percentile(99) == pytest.approx(9900, rel=1e-3)
+    assert histogram.value_at_percentile(100) == 10000
+    assert histogram.mean() == pytest.approx(5000.5, rel=1e-3)
+
+def test_merge_matches_single_histogram():
+    combined, first, second = HdrHistogram(), HdrHistogram(), HdrHistogram()
+    for value in range(1, 5001):
+        combined.record(value)
+        (first if value % 2 else second).record(value)
+    first.merge(second)
+    assert first.total_count == combined.total_count
+    assert first.min_value == 1 and first.max_value == 5000
+    assert list(first.counts) == list(combined.counts)
+
+def test_merge_rejects_different_layout():
+    with pytest.raises(ValueError):
+        HdrHistogram().merge(HdrHistogram(significant_digits=2))
+
+def test_values_above_highest_are_clamped():
+    histogram = HdrHistogram(highest=1000)
+    histogram.record(5000, count=3)
+    assert histogram.clamped == 3
+    assert histogram.max_value == 1000
+    assert histogram.value_at_percentile(100) == 1000
+
+def test_negative_values_rejected():
+    with pytest.raises(ValueError):
+        HdrHistogram().record(-1)
+
+def test_encode_round_trip(tmp_path):
+    histogram = HdrHistogram()
+    for value in (1, 10, 100, 1000, 10000, 10000):
+        histogram.record(value)
+    histogram.save(tmp_path / "latency.hdr")
+    loaded = HdrHistogram.load(tmp_path / "latency.hdr")
+    assert list(loaded.counts) == list(histogram.counts)
+    assert (loaded.total_count, loaded.min_value, loaded.max_value) == (6, 1, 10000)
+
+def test_empty_histogram_summary():
+    histogram = HdrHistogram.decode(HdrHistogram().encode())
+    assert histogram.min_value is None
+    assert histogram.value_at_percentile(99) == 0
+    assert histogram.mean() == 0.0
@@ -0,0 +1,29 @@
+from collections import Counter
+
+import pytest
+
+from harness.interleave import interleaved_order
+
+TARGETS = ["rest", "native", "layered"]
+
+def rounds_of(order):
+    rounds = {}
+    for round_index, target in order:
+        rounds.setdefault(round_index, []).append(target)
+    return rounds
+
+def test_abba_alternates_forward_and_reversed():
+    rounds = rounds_of(interleaved_order(TARGETS, 4))
+    assert rounds == {0: TARGETS, 1: TARGETS[::-1], 2: TARGETS, 3: TARGETS[::-1]}
+
+def test_random_sends_every_target_once_per_round():
+    order = list(interleaved_order(TARGETS, 50, "random", seed=7))
+    assert order == list(interleaved_order(TARGETS, 50, "random", seed=7))
+    rounds = rounds_of(order)
+    assert all(sorted(targets) == sorted(TARGETS) for targets in rounds.values())
+    # Every target leads some rounds
+    assert set(Counter(targets[0] for targets in rounds.values())) == set(TARGETS)
+
+def test_unknown_design():
+    with pytest.raises(ValueError):
+        list(interleaved_order(TARGETS, 1, "latin"))
@@ -0,0 +1,106 @@
+import asyncio
+import socket
+import struct
+import time
+
+import pytest
+
+from standins import network_proxy
+
+async def start_echo_server(closed):
+    """Echo server that sets `closed` once the proxy's upstream connection ends."""
+    async def echo(reader, writer):
+        try:
+            while data := await reader.read(1024):
+                writer.write(data)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            closed.set()
+            writer.close()
+    return await asyncio.start_server(echo, "127.0.0.1", 0)
+
+async def start_proxy(upstream, handlers):
+    port = upstream.sockets[0].getsockname()[1]
+
+    async def handle(reader, writer):
+        handlers.append(asyncio.current_task())
+        await network_proxy.handle(reader, writer, "127.0.0.1", port)
+    return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+def run_through_proxy(client):
+    """Run `client(proxy_port)` against an echo server behind the proxy; returns (result, upstream closed, handlers)"""
+    async def run():
+        closed = asyncio.Event()
+        handlers = []
+        upstream = await start_echo_server(closed)
+        proxy = await start_proxy(upstream, handlers)
+        try:
+            result = await client(proxy.sockets[0].getsockname()[1])
+            await asyncio.wait_for(closed.wait(), 2)
+            await asyncio.wait_for(asyncio.gather(*handlers), 2)
+            return result, closed.is_set(), handlers
+        finally:
+            proxy.close()
+            upstream.close()
+    return asyncio.run(run())
+
+@pytest.fixture(autouse=True)
+def network(monkeypatch):
+    for name, value in {"DELAY_MS": 0.0, "JITTER_MS": 0.0, "BANDWIDTH_KBPS": 0.0, "DROP_RATE": 0.0,
+                        "RESET_RATE": 0.0}.items():
+        monkeypatch.setattr(network_proxy, name, value)
+    monkeypatch.setattr(network_proxy, "stats", dict.fromkeys(network_proxy.stats, 0))
+
+def test_client_reset_closes_both_connections():
+    async def client(port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"hello")
+        assert await reader.readexactly(5) == b"hello"
+        # Abort with a RST, as a crashed or timed-out client would
+        writer.get_extra_info("socket").setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+        writer.transport.abort()
+
+    _, upstream_closed, handlers = run_through_proxy(client)
+    assert upstream_closed
+    assert all(handler.done() for handler in handlers)
+
+def test_injected_reset_at_byte_offset(monkeypatch):
+    monkeypatch.setattr(network_proxy, "RESET_RATE", 1.0)
+    monkeypatch.setattr(network_proxy, "RESET_WINDOW_BYTES", 100)
+
+    async def client(port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        received = b""
+        try:
+            for _ in range(20):
+                writer.write(b"x" * 50)
+                await writer.drain()
+                received += await reader.read(1024)
+        except ConnectionError:
+            pass
+        writer.close()
+        return received
+
+    received, upstream_closed, _ = run_through_proxy(client)
+    assert upstream_closed
+    assert network_proxy.stats["reset"] == 1
+    # Cut within the first RESET_WINDOW_BYTES forwarded in both directions
+    assert len(received) < 100
+
+def test_delay_applies_to_connect_and_each_direction(monkeypatch):
+    monkeypatch.setattr(network_proxy, "DELAY_MS", 30.0)
+
+    async def client(port):
+        start = time.perf_counter()
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"ping")
+        await reader.readexactly(4)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        writer.close()
+        return elapsed_ms
+
+    elapsed_ms, _, _ = run_through_proxy(client)
+    # One round trip for the upstream connect, one for the exchange
+    assert elapsed_ms >= 4 * 30
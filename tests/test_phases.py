@@ -0,0 +1,61 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from harness.phases import PHASE_HEADERS, PhaseTimedClient
+
+BODY = b"x" * 1000
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    received = []
+
+    def do_GET(self):
+        Handler.received.append((self.path, dict(self.headers), self.client_address[1]))
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server_url():
+    Handler.received = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+def test_phases_add_up_to_total(server_url):
+    client = PhaseTimedClient(server_url)
+    row, size = client.get("/modelcard/1", {"traceparent": "00-abc-def-01"})
+    phases = dict(zip(PHASE_HEADERS, row))
+    assert size == len(BODY)
+    assert all(value >= 0 for value in row)
+    assert phases['tcp_connect'] > 0
+    assert phases['total_time'] == pytest.approx(sum(row[1:-2]))
+    path, headers, _ = Handler.received[0]
+    assert path == "/modelcard/1"
+    assert headers["Connection"] == "close"
+    assert headers["traceparent"] == "00-abc-def-01"
+
+def test_keep_alive_reuses_the_connection(server_url):
+    client = PhaseTimedClient(server_url, keep_alive=True)
+    first, _ = client.get("/a")
+    second, _ = client.get("/b")
+    client.close()
+    assert dict(zip(PHASE_HEADERS, first))['tcp_connect'] > 0
+    # Only the first request pays for connection setup
+    assert dict(zip(PHASE_HEADERS, second))['tcp_connect'] == 0
+    assert Handler.received[0][2] == Handler.received[1][2]
+
+def test_new_connection_per_request(server_url):
+    client = PhaseTimedClient(server_url)
+    client.get("/a")
+    client.get("/b")
+    assert Handler.received[0][2] != Handler.received[1][2]
@@ -0,0 +1,37 @@
+import json
+
+import pytest
+
+from harness.replay import TraceRecord, read_trace, trace_schedule
+
+def write_trace(path, lines):
+    path.write_text("\n".join(line if isinstance(line, str) else json.dumps(line) for line in lines) + "\n")
+
+def test_read_trace_skips_and_reports_invalid_lines(tmp_path):
+    trace = tmp_path / "trace.jsonl"
+    write_trace(trace, [
+        {"timestamp": 10, "protocol": "rest", "operation": "get_modelcard", "mc_id": "a-mc"},
+        "",
+        "not json",
+        {"timestamp": 11, "protocol": "grpc", "operation": "get_modelcard", "mc_id": "a-mc"},
+        {"timestamp": 12, "protocol": "native", "operation": "search_modelcards"},
+        {"timestamp": 13.5, "protocol": "layered", "operation": "search_modelcards", "query": "AlexNet"},
+    ])
+    invalid = []
+    records = list(read_trace(trace, lambda line_number, reason: invalid.append(line_number)))
+    assert records == [TraceRecord(10.0, "rest", "get_modelcard", "a-mc"),
+                       TraceRecord(13.5, "layered", "search_modelcards", "AlexNet")]
+    assert invalid == [3, 4, 5]
+
+def test_schedule_keeps_gaps_relative_to_first_record():
+    records = [TraceRecord(t, "rest", "get_modelcard", "a-mc") for t in (100.0, 100.5, 102.0)]
+    assert [offset for offset, _ in trace_schedule(records)] == [0.0, 0.5, 2.0]
+    assert [offset for offset, _ in trace_schedule(records, speed=2.0)] == [0.0, 0.25, 1.0]
+
+def test_schedule_sends_records_before_the_first_immediately():
+    records = [TraceRecord(t, "rest", "get_modelcard", "a-mc") for t in (5.0, 4.0, 6.0)]
+    assert [offset for offset, _ in trace_schedule(records)] == [0.0, 0.0, 1.0]
+
+def test_schedule_rejects_non_positive_speed():
+    with pytest.raises(ValueError):
+        list(trace_schedule([], speed=0))
@@ -0,0 +1,68 @@
+import json
+from array import array
+
+import pytest
+
+from harness.schema import NpyWriter, convert_csv, load_columns, read_npy, schema_path, unified_columns
+
+def test_unified_columns():
+    assert unified_columns(['sequence', 'response_time_ms']) == [('sequence', 'sequence', 'id'),
+                                                                 ('response_time_ms', 'response_time_ms', 'ms')]
+    assert unified_columns(['total_time'], {'total_time': 's'}) == [('total_time', 'total_time_s', 's')]
+    with pytest.raises(ValueError):
+        unified_columns(['total_time'])
+    with pytest.raises(ValueError):
+        unified_columns(['total_time'], {'total_time': 'minutes'})
+
+@pytest.mark.parametrize("names", [["a_ms"], ["a_ms", "b_kb", "c_s"], [f"column_{i}_ms" for i in range(40)]])
+@pytest.mark.parametrize("rows", [0, 1, 1234567])
+def test_npy_header_aligned(tmp_path, names, rows):
+    path = tmp_path / "results.npy"
+    writer = NpyWriter(path, names, ["ms"] * len(names))
+    writer.rows = rows
+    writer.close()
+    data = path.read_bytes()
+    header_length = int.from_bytes(data[8:10], "little")
+    # The version 1.0 format requires the data to start on a 64-byte boundary
+    assert (10 + header_length) % 64 == 0
+    assert data[10 + header_length - 1:10 + header_length] == b"\n"
+    assert f"'shape': ({rows},)".encode() in data
+
+def test_write_and_read_back(tmp_path):
+    path = tmp_path / "results.npy"
+    writer = NpyWriter(path, ["response_time_ms", "response_size_kb"], ["ms", "kb"], {'protocol': 'rest'})
+    writer.write(array('d', [1.5, 2.0, 3.5, 4.0]))
+    writer.write(array('d', [5.5, 6.0]))
+    writer.close()
+    names, values = read_npy(path)
+    assert names == ["response_time_ms", "response_size_kb"]
+    assert list(values) == [1.5, 2.0, 3.5, 4.0, 5.5, 6.0]
+    schema = json.loads(schema_path(path).read_text())
+    assert schema['metadata']['protocol'] == 'rest'
+    assert [column['unit'] for column in schema['columns']] == ["ms", "kb"]
+
+def test_numpy_loads_written_file(tmp_path):
+    np = pytest.importorskip("numpy")
+    path = tmp_path / "results.npy"
+    writer = NpyWriter(path, ["a_ms", "b_kb"], ["ms", "kb"])
+    writer.write(array('d', [1.0, 2.0, 3.0, 4.0]))
+    writer.close()
+    loaded = np.load(path)
+    assert loaded.shape == (2,)
+    assert list(loaded["b_kb"]) == [2.0, 4.0]
+
+def test_convert_headerless_csv(tmp_path):
+    csv_path = tmp_path / "get_modelcard.csv"
+    csv_path.write_text("0.5\n0.25\n")
+    npy_path = convert_csv(csv_path, units={'total_time': 's'}, headers=['total_time'])
+    assert list(load_columns(npy_path)['total_time_s']) == [0.5, 0.25]
+
+def test_convert_to_another_directory(tmp_path):
+    csv_path = tmp_path / "results" / "get_modelcard.csv"
+    csv_path.parent.mkdir()
+    csv_path.write_text("total_time\n2.0\n")
+    npy_path = convert_csv(csv_path, units={'total_time': 'ms'}, npy_path=tmp_path / "cache.npy")
+    assert npy_path == tmp_path / "cache.npy"
+    assert schema_path(npy_path).exists()
+    assert sorted(path.name for path in csv_path.parent.iterdir()) == ["get_modelcard.csv"]
+    assert list(load_columns(npy_path)['total_time_ms']) == [2.0]
@@ -0,0 +1,52 @@
+import csv
+
+import pytest
+
+from harness.schema import load_columns
+from harness.sink import ResultSink, merge_parts, part_path
+
+HEADERS = ['response_time_ms', 'response_size_kb']
+
+def read_rows(path):
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        assert next(reader) == HEADERS
+        return [[float(value) for value in row] for row in reader]
+
+@pytest.mark.parametrize("buffer_rows", [None, 1, 3, 7, 100])
+def test_every_row_written_in_order(tmp_path, buffer_rows):
+    path = tmp_path / "results.csv"
+    # Capacity below the row count makes the unbounded buffer grow
+    with ResultSink(path, HEADERS, capacity=2, buffer_rows=buffer_rows) as sink:
+        for i in range(20):
+            sink.record(i + 0.5, i)
+    expected = [[i + 0.5, float(i)] for i in range(20)]
+    assert read_rows(path) == expected
+    columns = load_columns(path.with_suffix(".npy"))
+    assert list(columns['response_time_ms']) == [row[0] for row in expected]
+    assert sink.count == 20
+    assert sink.histogram.total_count == 20
+
+def test_empty_sink_writes_header_only(tmp_path):
+    path = tmp_path / "results.csv"
+    ResultSink(path, HEADERS, buffer_rows=4).close()
+    assert read_rows(path) == []
+    assert len(load_columns(path.with_suffix(".npy"))['response_time_ms']) == 0
+
+def test_latency_scaled_into_histogram(tmp_path):
+    with ResultSink(tmp_path / "phases.csv", ['total_time'], latency_column='total_time', latency_to_us=1e6,
+                    units={'total_time': 's'}) as sink:
+        sink.record(0.25)
+    assert sink.histogram.max_value == 250000
+
+def test_merge_parts(tmp_path):
+    path = tmp_path / "results.csv"
+    parts = [part_path(path, worker) for worker in range(3)]
+    for worker, part in enumerate(parts):
+        with ResultSink(part, HEADERS, buffer_rows=2) as sink:
+            for i in range(5):
+                sink.record(worker * 10 + i, 1)
+    merge_parts(path, parts)
+    assert [row[0] for row in read_rows(path)] == [w * 10.0 + i for w in range(3) for i in range(5)]
+    assert len(load_columns(path.with_suffix(".npy"))['response_time_ms']) == 15
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["results.csv", "results.npy", "results.schema.json"]
@@ -0,0 +1,55 @@
+import csv
+
+import pytest
+
+from harness.tracing import SpanLog, TraceContext, breakdown, join_spans, load_spans, trace_id_from
+
+def test_breakdown_charges_each_hop_minus_the_hop_below():
+    row = breakdown(20.0, {"layered_mcp": 15.0, "rest": 9.0, "db": 4.0})
+    assert row == {'network_ms': 5.0, 'native_mcp_ms': None, 'layered_mcp_ms': 6.0, 'rest_ms': 5.0, 'db_ms': 4.0}
+
+def test_breakdown_without_spans_is_all_network():
+    assert breakdown(3.0, {})['network_ms'] == 3.0
+
+def test_traceparent_round_trip():
+    context = TraceContext("0123456789abcdef")
+    assert trace_id_from(context.traceparent(42)) == context.trace_id(42) == "0123456789abcdef" + f"{42:016x}"
+    assert trace_id_from("garbage") is None
+    assert trace_id_from(None) is None
+
+def write_results(path, headers, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        writer.writerows(rows)
+
+@pytest.fixture
+def spans(tmp_path):
+    context = TraceContext("0123456789abcdef")
+    log_path = tmp_path / "spans.jsonl"
+    rest, db = SpanLog(log_path, "rest"), SpanLog(log_path, "db")
+    for sequence in (0, 1):
+        rest.record(context.traceparent(sequence), 6.0)
+        db.record(context.traceparent(sequence), 2.0)
+    # Spans from other runs and requests without a traceparent are ignored
+    rest.record(TraceContext("f" * 16).traceparent(0), 99.0)
+    rest.record(None, 99.0)
+    rest.close()
+    db.close()
+    return load_spans([log_path])
+
+def test_join_spans_by_sequence(tmp_path, spans):
+    results = tmp_path / "get_modelcard.csv"
+    # Sequence 2 has no spans and is left out
+    write_results(results, ['sequence', 'response_time_ms', 'response_size_kb'],
+                  [[0.0, 10.0, 1.0], [1.0, 8.0, 1.0], [2.0, 9.0, 1.0]])
+    rows = join_spans(results, "0123456789abcdef", spans)
+    assert [row['sequence'] for row in rows] == [0, 1]
+    assert [(row['network_ms'], row['rest_ms'], row['db_ms']) for row in rows] == [(4.0, 4.0, 2.0), (2.0, 4.0, 2.0)]
+
+def test_join_spans_reads_phase_totals_in_seconds(tmp_path, spans):
+    results = tmp_path / "get_modelcard.csv"
+    write_results(results, ['sequence', 'total_time'], [[0.0, 0.01]])
+    [row] = join_spans(results, "0123456789abcdef", spans)
+    assert row['total_ms'] == pytest.approx(10.0)
+    assert row['network_ms'] == pytest.approx(4.0)
@@ -0,0 +1,80 @@
+import asyncio
+import http.client
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# harness.wire needs httpx
+httpx = pytest.importorskip("httpx")
+
+from harness.wire import CountingSocket, WireCounter, counting_transport, response_wire_bytes
+
+BODY = b"x" * 5000
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server_port():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+def test_counting_socket_counts_buffered_reads():
+    left, right = socket.socketpair()
+    wire = WireCounter()
+    counted = CountingSocket(left, wire)
+    counted.sendall(b"ping")
+    assert right.recv(4) == b"ping"
+    right.sendall(b"line one\nline two\n")
+    right.close()
+    with counted.makefile("rb") as f:
+        assert f.readline() == b"line one\n"
+        assert f.read() == b"line two\n"
+    counted.close()
+    assert (wire.bytes_sent, wire.bytes_received) == (4, 18)
+    assert wire.take() == (4, 18)
+    assert wire.take() == (0, 0)
+
+def test_counting_socket_under_http_client(server_port):
+    wire = WireCounter()
+    conn = http.client.HTTPConnection("127.0.0.1", server_port)
+    conn.sock = CountingSocket(socket.create_connection(("127.0.0.1", server_port)), wire)
+    conn.request("GET", "/modelcard/1")
+    response = conn.getresponse()
+    assert response.read() == BODY
+    conn.close()
+    # Status line and headers come on top of the body
+    assert wire.bytes_received > len(BODY)
+    assert wire.bytes_sent > len("GET /modelcard/1 HTTP/1.1\r\n")
+
+def test_response_wire_bytes_per_request(server_port):
+    shared = WireCounter()
+
+    async def run():
+        transport = counting_transport(shared)
+        async with httpx.AsyncClient(transport=transport) as client:
+            sizes = []
+            for _ in range(3):
+                response = await client.get(f"http://127.0.0.1:{server_port}/modelcard/1")
+                sizes.append(response_wire_bytes(response))
+            return sizes
+
+    sizes = asyncio.run(run())
+    # One kept-alive connection; each response is attributed its own bytes
+    assert len(set(sizes)) == 1
+    assert sizes[0][1] > len(BODY)
+    assert (shared.bytes_sent, shared.bytes_received) == tuple(sum(side) for side in zip(*sizes))